@@ -3,17 +3,41 @@ from tkinter import messagebox, simpledialog, scrolledtext, filedialog, ttk
 import math
 import os
 import json 
-import subprocess
-import tempfile
-from collections import deque
+import threading
+
+from flow_engine import (AUTO_SOLVER, SOLVERS, FlowNetwork, ResidualGraph, bipartite_unit_structure,
+                         choose_solver, decompose_flow, format_statistics, get_solver, min_cut,
+                         min_cut_from_flows, network_statistics, solve_steps)
+from project_io import (BINARY_EXTENSION, CSV_EXTENSION, DIMACS_EXTENSIONS, MATRIX_MARKET_EXTENSION,
+                        load_project_network, parse_capacity, save_project, write_incidence_matrix)
+from flow_reduction import reduce_network
+from flow_sensitivity import ALL_CUTS, arc_sensitivity
+from graph_layout import LAYOUTS, apply_layout
+from result_cache import ResultCache, cache_key, cache_path_for, cut_entry, cut_from_entry
+from result_log import ResultLog
+from solver_stats import Profiler, SolverStats
+from lp_backends import LP_BACKENDS, GlpsolBackend, LPSolverError, get_lp_backend, solution_path_for, write_mathprog_model
+
+# PIL se importa recién al usar el modo con fotos (ver load_pil)
+PIL_MODULES = None
+
+
+def load_pil():
+    """(Image, ImageDraw, ImageFont) de PIL, o None si no está instalado"""
+    global PIL_MODULES
+    if PIL_MODULES is None:
+        try:
+            from PIL import Image, ImageDraw, ImageFont
+            PIL_MODULES = (Image, ImageDraw, ImageFont)
+        except ImportError:
+            PIL_MODULES = False
+    return PIL_MODULES or None
 
-try:
-    from PIL import Image, ImageDraw, ImageFont
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
 
 class NetworkEditor:
+    RENDER_CHUNK = 2000  # elementos dibujados por bloque al cargar proyectos grandes
+    LOG_FLUSH_MS = 100   # intervalo para volcar al panel las líneas registradas
+
     def __init__(self, root):
         self.root = root
         self.root.title("Editor de Redes")
@@ -22,9 +46,12 @@ class NetworkEditor:
         # --- Estado del Grafo ---
         self.nodes = []
         self.edges = []
+        self.node_by_id = {}  # índice id -> nodo (evita búsquedas lineales)
         self.node_counter = 1
         self.source_node_id = None
         self.sink_node_id = None
+        self.load_job = None  # id del after() del dibujo por bloques
+        self.layout_job = None  # id del after() que espera la distribución automática
         
         # --- Variables para Arrastrar Nodos ---
         self.drag_data = {"item": None, "x": 0, "y": 0, "node": None}
@@ -35,7 +62,35 @@ class NetworkEditor:
         self.total_max_flow = 0
         self.found_routes = [] 
         self.save_folder = None 
-        self.selected_algorithm = "GREEDY"  # Algoritmo por defecto
+        self.selected_algorithm = AUTO_SOLVER  # Algoritmo por defecto
+        self.running_algorithm = None
+        self.run_cache_tag = None  # clave de caché de la ejecución (algoritmo + reducción)
+        self.step_network = None   # FlowNetwork de la ejecución en curso
+        self.reduction = None      # ReducedNetwork si se resuelve la red reducida
+        self.residual = None       # ResidualGraph de la ejecución en curso
+        self.step_iterator = None  # generador de aumentos del motor
+        self.step_edges = []       # arcos del editor en el orden del motor
+        self.node_flow_edges = []  # (nodo con capacidad, arcos que cuentan su flujo)
+        self.step_job = None       # id del after() del próximo paso
+        self.solver_stats = None   # contadores y tiempos de la ejecución en curso
+        self.profiler = None       # cProfile/tracemalloc si está activo "Perfilar"
+        self.lp_timeout = 30  # segundos máximos para el backend LP
+        self.last_cut = None  # MinCut del último análisis de cuellos de botella
+        self.last_sensitivity = None  # SensitivityReport del último análisis de sensibilidad
+        self.flow_decomposition = None  # caminos y ciclos del último flujo calculado
+
+        # --- Estado de Renderizado (cambios agrupados en un solo idle) ---
+        self.dirty_edges = {}         # id(arco) -> arco pendiente de redibujar
+        self.pending_highlight = None # camino a resaltar en el próximo render
+        self.highlight_items = []     # líneas de resaltado reutilizables
+        self.render_pending = None    # id del callback after_idle programado
+
+        # --- Registro de resultados (archivo opcional + últimas líneas en el panel) ---
+        self.results = ResultLog()
+        self.log_job = None
+
+        # --- Caché de resultados por contenido de la red (y archivo junto al proyecto) ---
+        self.result_cache = ResultCache()
 
         self.setup_ui()
 
@@ -72,6 +127,13 @@ class NetworkEditor:
                                  bg="#2C3E50", fg="white", relief=tk.RAISED)
         self.btn_edge.pack(side=tk.LEFT, padx=2)
 
+        # Distribución automática (se calcula en segundo plano)
+        self.layout_var = tk.StringVar(value="CAPAS")
+        ttk.Combobox(mode_frame, textvariable=self.layout_var,
+                     values=list(LAYOUTS), state="readonly", width=9).pack(side=tk.LEFT, padx=(8, 2))
+        tk.Button(mode_frame, text="🧭 Ordenar", command=self.auto_layout,
+                  bg="#2C3E50", fg="white").pack(side=tk.LEFT, padx=2)
+
         # Separador
         tk.Frame(tools_frame, width=2, height=40, bg="#34495E").pack(side=tk.LEFT, padx=10, pady=10)
 
@@ -81,13 +143,29 @@ class NetworkEditor:
         tk.Label(algo_frame, text="Algoritmo:", bg="#2C3E50", fg="#BDC3C7", font=("Arial", 8)).pack(side=tk.TOP, anchor="w")
         
         # Combobox para seleccionar algoritmo
-        self.algo_var = tk.StringVar(value="GREEDY")
+        self.algo_var = tk.StringVar(value=self.selected_algorithm)
         algo_combo = ttk.Combobox(algo_frame, textvariable=self.algo_var, 
-                                 values=["GREEDY", "FORD_FULKERSON_DFS", "EDMONDS_KARP_BFS"], 
+                                 values=list(SOLVERS), 
                                  state="readonly", width=18)
         algo_combo.pack(side=tk.LEFT, padx=2)
         algo_combo.bind('<<ComboboxSelected>>', self.on_algorithm_change)
 
+        # Combobox para seleccionar el backend de programación lineal
+        tk.Label(algo_frame, text="LP:", bg="#2C3E50", fg="#BDC3C7", font=("Arial", 8)).pack(side=tk.LEFT, padx=(6, 0))
+        self.lp_backend_var = tk.StringVar(value="glpsol")
+        ttk.Combobox(algo_frame, textvariable=self.lp_backend_var,
+                     values=list(LP_BACKENDS), state="readonly", width=8).pack(side=tk.LEFT, padx=2)
+
+        # Reducción opcional (poda, arcos paralelos, cadenas en serie) antes de resolver
+        self.reduce_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(algo_frame, text="Reducir", variable=self.reduce_var, bg="#2C3E50", fg="#BDC3C7",
+                       selectcolor="#2C3E50", activebackground="#2C3E50").pack(side=tk.LEFT, padx=(6, 0))
+
+        # Perfilado opcional (cProfile + tracemalloc) de los pasos del algoritmo
+        self.profile_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(algo_frame, text="Perfilar", variable=self.profile_var, bg="#2C3E50", fg="#BDC3C7",
+                       selectcolor="#2C3E50", activebackground="#2C3E50").pack(side=tk.LEFT, padx=(6, 0))
+
         # Separador
         tk.Frame(tools_frame, width=2, height=40, bg="#34495E").pack(side=tk.LEFT, padx=10, pady=10)
 
@@ -109,6 +187,9 @@ class NetworkEditor:
         
         tk.Button(run_frame, text="Ver Cuellos de Botella", bg="#8E44AD", fg="white", height=2,
                  font=("Arial", 9, "bold"), command=self.highlight_bottlenecks).pack(side=tk.LEFT, padx=2)
+
+        tk.Button(run_frame, text="Sensibilidad", bg="#C0392B", fg="white", height=2,
+                 font=("Arial", 9, "bold"), command=self.show_sensitivity).pack(side=tk.LEFT, padx=2)
         
         tk.Button(run_frame, text="Matriz Incidencia", bg="#16A085", fg="white", height=2,
                  font=("Arial", 9, "bold"), command=self.show_incidence_matrix).pack(side=tk.LEFT, padx=2)
@@ -144,6 +225,8 @@ class NetworkEditor:
         
         log_frame = tk.LabelFrame(right_frame, text="📝 Resultados", font=("Arial", 10, "bold"), padx=10, pady=10)
         log_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tk.Button(log_frame, text="💾 Registro a archivo", font=("Arial", 8),
+                  command=self.save_log_to_file).pack(side=tk.BOTTOM, anchor="e")
         self.log_text = scrolledtext.ScrolledText(log_frame, height=20, bg="#F8F9FA", font=("Courier New", 10))
         self.log_text.pack(fill=tk.BOTH, expand=True)
 
@@ -155,12 +238,8 @@ class NetworkEditor:
         algorithm = self.algo_var.get()
         self.log(f"\n🔧 Algoritmo cambiado a: {algorithm}")
         
-        if algorithm == "GREEDY":
-            self.log("   - Busca el camino con mayor capacidad disponible en cada paso")
-        elif algorithm == "FORD_FULKERSON_DFS":
-            self.log("   - Usa DFS para encontrar caminos aumentantes")
-        elif algorithm == "EDMONDS_KARP_BFS":
-            self.log("   - Usa BFS para encontrar caminos aumentantes (óptimo)")
+        for line in get_solver(algorithm)['description']:
+            self.log(f"   - {line}")
 
     # =========================================
     #    NUEVOS ALGORITMOS DE FLUJO MÁXIMO
@@ -169,290 +248,152 @@ class NetworkEditor:
     def run_algorithm(self):
         """Ejecuta el algoritmo seleccionado"""
         self.is_animating = True
-        algorithm = self.algo_var.get()
-        
-        if algorithm == "GREEDY":
-            self.find_paths_iteratively()
-        elif algorithm == "FORD_FULKERSON_DFS":
-            self.ford_fulkerson_dfs()
-        elif algorithm == "EDMONDS_KARP_BFS":
-            self.edmonds_karp_bfs()
-
-    def ford_fulkerson_dfs(self):
-        """Implementación de Ford-Fulkerson usando DFS"""
-        if not self.is_animating:
-            return
-            
-        # Crear grafo residual
-        residual_graph = self.build_residual_graph()
-        
-        # Encontrar camino aumentante con DFS
-        path, min_capacity = self.find_augmenting_path_dfs(residual_graph, self.source_node_id, self.sink_node_id)
-        
-        if path and min_capacity > 0:
-            self.current_step += 1
-            self.found_routes.append((path, min_capacity))
-            self.highlight_algorithm_step(path)
-            self.update_capacities_along_path(path, min_capacity)
-            self.total_max_flow += min_capacity
-            
-            path_str = " → ".join([self.get_node_label(nid) for nid in path])
-            self.log(f"\n[Paso {self.current_step}] Camino aumentante (DFS):\n {path_str}")
-            self.log(f" Flujo enviado: {min_capacity}")
-            
-            if self.save_folder:
-                filename = os.path.join(self.save_folder, f"{self.current_step:02d}_DFS_Ruta_{min_capacity}.png")
-                self.create_snapshot(filename, highlight_path=path)
-            
-            # Continuar recursivamente
-            self.root.after(1200, self.ford_fulkerson_dfs)
-        else:
-            self.finalize_algorithm()
+        self.algorithm_step()
 
-    def find_augmenting_path_dfs(self, graph, start, end, path=None, visited=None):
-        """Encuentra un camino aumentante usando DFS"""
-        if path is None:
-            path = []
-        if visited is None:
-            visited = set()
-            
-        path = path + [start]
-        visited.add(start)
-        
-        if start == end:
-            # Calcular capacidad mínima del camino
-            min_capacity = float('inf')
-            for i in range(len(path) - 1):
-                u, v = path[i], path[i+1]
-                min_capacity = min(min_capacity, graph[u][v])
-            return path, min_capacity
-            
-        if start in graph:
-            for neighbor, capacity in graph[start].items():
-                if capacity > 0 and neighbor not in visited:
-                    new_path, new_capacity = self.find_augmenting_path_dfs(graph, neighbor, end, path, visited.copy())
-                    if new_path:
-                        return new_path, new_capacity
-                        
-        return None, 0
-
-    def edmonds_karp_bfs(self):
-        """Implementación de Edmonds-Karp usando BFS"""
+    def algorithm_step(self):
+        """Aplica un aumento del motor de flujo y programa el siguiente paso"""
+        self.step_job = None
         if not self.is_animating:
             return
             
-        # Crear grafo residual
-        residual_graph = self.build_residual_graph()
-        
-        # Encontrar camino aumentante con BFS
-        path, min_capacity = self.find_augmenting_path_bfs(residual_graph, self.source_node_id, self.sink_node_id)
-        
-        if path and min_capacity > 0:
+        # Solo se perfila el paso, no la espera entre animaciones
+        if self.profiler:
+            self.profiler.resume()
+        step = next(self.step_iterator, None)
+        if self.profiler:
+            self.profiler.pause()
+        
+        if step:
+            arcs, min_capacity = step
+            solver = get_solver(self.running_algorithm)
+            # Con la red reducida las cadenas contraídas no aparecen en el camino
+            network = self.residual.network
+            path = [network.node_ids[i] for i in self.residual.path_nodes(arcs, network.source_index)]
+            
             self.current_step += 1
             self.found_routes.append((path, min_capacity))
-            self.highlight_algorithm_step(path)
-            self.update_capacities_along_path(path, min_capacity)
+            self.highlight_algorithm_step(arcs)
+            self.update_capacities_along_path(arcs, min_capacity)
             self.total_max_flow += min_capacity
             
             path_str = " → ".join([self.get_node_label(nid) for nid in path])
-            self.log(f"\n[Paso {self.current_step}] Camino aumentante (BFS):\n {path_str}")
+            self.log(f"\n[Paso {self.current_step}] {solver['step_title']}:\n {path_str}")
             self.log(f" Flujo enviado: {min_capacity}")
             
             if self.save_folder:
-                filename = os.path.join(self.save_folder, f"{self.current_step:02d}_BFS_Ruta_{min_capacity}.png")
-                self.create_snapshot(filename, highlight_path=path)
+                filename = os.path.join(self.save_folder, f"{self.current_step:02d}_{solver['tag']}_Ruta_{min_capacity}.png")
+                self.create_snapshot(filename, highlight_path=path, highlight_arcs=self.step_path_arcs(arcs))
             
-            # Continuar recursivamente
-            self.root.after(1200, self.edmonds_karp_bfs)
+            # Continuar con el siguiente paso
+            self.step_job = self.root.after(1200, self.algorithm_step)
         else:
             self.finalize_algorithm()
 
-    def find_augmenting_path_bfs(self, graph, start, end):
-        """Encuentra un camino aumentante usando BFS"""
-        visited = set()
-        queue = deque()
-        queue.append((start, [start], float('inf')))  # (nodo_actual, camino, capacidad_mínima)
-        visited.add(start)
-        
-        while queue:
-            current, path, min_cap = queue.popleft()
-            
-            if current == end:
-                return path, min_cap
-                
-            if current in graph:
-                for neighbor, capacity in graph[current].items():
-                    if capacity > 0 and neighbor not in visited:
-                        visited.add(neighbor)
-                        new_min_cap = min(min_cap, capacity)
-                        queue.append((neighbor, path + [neighbor], new_min_cap))
-                        
-        return None, 0
-
-    def build_residual_graph(self):
-        """Construye el grafo residual basado en las capacidades actuales"""
-        graph = {}
-        
-        # Inicializar todos los nodos
-        for node in self.nodes:
-            graph[node['id']] = {}
-        
-        # Agregar arcos con capacidades residuales
-        for edge in self.edges:
-            u, v = edge['u'], edge['v']
-            if u not in graph:
-                graph[u] = {}
-            graph[u][v] = edge['remaining_capacity']
-            
-        return graph
-
     # =========================================
     #    MATRIZ DE INCIDENCIA
     # =========================================
 
     def show_incidence_matrix(self):
-        """Muestra la matriz de incidencia y capacidades"""
+        """Muestra la matriz de incidencia dispersa en una vista paginada"""
         if not self.nodes or not self.edges:
             messagebox.showwarning("Error", "No hay nodos o arcos en la red.")
             return
-            
-        # Crear ventana para mostrar la matriz
-        matrix_window = tk.Toplevel(self.root)
-        matrix_window.title("Matriz de Incidencia y Capacidades")
-        matrix_window.geometry("800x600")
-        
-        # Frame para la matriz
-        matrix_frame = tk.Frame(matrix_window)
-        matrix_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Text area para mostrar la matriz
-        text_area = scrolledtext.ScrolledText(matrix_frame, wrap=tk.NONE, font=("Courier New", 10))
-        text_area.pack(fill=tk.BOTH, expand=True)
-        
-        # Generar y mostrar la matriz
-        matrix_text = self.generate_incidence_matrix()
-        text_area.insert(tk.END, matrix_text)
-        text_area.config(state=tk.DISABLED)
-        
-        # Botón para exportar
-        export_btn = tk.Button(matrix_frame, text="📋 Exportar Matriz", 
-                              command=lambda: self.export_matrix_to_file(matrix_text))
-        export_btn.pack(pady=5)
-
-    def generate_incidence_matrix(self):
-        """Genera la representación textual de la matriz de incidencia"""
-        # Ordenar nodos por ID
-        sorted_nodes = sorted(self.nodes, key=lambda x: x['id'])
-        sorted_edges = sorted(self.edges, key=lambda x: (x['u'], x['v']))
-        
-        # Encabezado
-        result = "MATRIZ DE INCIDENCIA Y CAPACIDADES\n"
-        result += "=" * 80 + "\n\n"
-        
-        # Información de nodos
-        result += "NODOS:\n"
-        result += "ID  | Label | Tipo      | Coordenadas\n"
-        result += "-" * 40 + "\n"
-        for node in sorted_nodes:
-            node_type = "Fuente" if node['id'] == self.source_node_id else "Sumidero" if node['id'] == self.sink_node_id else "Intermedio"
-            result += f"{node['id']:3} | {node['label']:5} | {node_type:9} | ({node['x']}, {node['y']})\n"
-        result += "\n"
-        
-        # Matriz de incidencia
-        result += "MATRIZ DE INCIDENCIA (Nodos × Arcos):\n"
-        
-        # Encabezado de arcos
-        arc_headers = []
-        for edge in sorted_edges:
-            u_label = self.get_node_label(edge['u'])
-            v_label = self.get_node_label(edge['v'])
-            arc_headers.append(f"{u_label}→{v_label}")
-        
-        # Construir matriz
-        header = "Nodo\\Arco | " + " | ".join(f"{arc:8}" for arc in arc_headers) + " |"
-        result += header + "\n"
-        result += "-" * len(header) + "\n"
-        
-        for node in sorted_nodes:
-            row = f"{self.get_node_label(node['id']):10} | "
-            for edge in sorted_edges:
-                if edge['u'] == node['id']:
-                    value = "-1"  # Saliente
-                elif edge['v'] == node['id']:
-                    value = "1"   # Entrante
-                else:
-                    value = "0"   # No incidente
-                row += f"{value:>8} | "
-            result += row + "\n"
-        
-        result += "\n"
-        
-        # Tabla de capacidades
-        result += "CAPACIDADES DE ARCOS:\n"
-        result += "Desde | Hasta | Capacidad | Flujo Actual | Capacidad Residual\n"
-        result += "-" * 65 + "\n"
-        for edge in sorted_edges:
-            u_label = self.get_node_label(edge['u'])
-            v_label = self.get_node_label(edge['v'])
-            result += f"{u_label:5} | {v_label:5} | {edge['capacity']:9} | {edge['current_flow']:12} | {edge['remaining_capacity']:17}\n"
-        
-        return result
+        IncidenceMatrixViewer(self, self.build_flow_network().incidence_matrix())
 
-    def export_matrix_to_file(self, matrix_text):
-        """Exporta la matriz a un archivo de texto"""
+    def export_incidence_matrix(self, matrix):
+        """Exporta la matriz en formato disperso (Matrix Market o tripletas CSV)"""
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
+            defaultextension=MATRIX_MARKET_EXTENSION,
+            filetypes=[("Matrix Market", f"*{MATRIX_MARKET_EXTENSION}"),
+                       ("Tripletas CSV", f"*{CSV_EXTENSION}"), ("Todos los archivos", "*.*")],
             title="Guardar matriz de incidencia"
         )
         
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(matrix_text)
+                write_incidence_matrix(matrix, file_path)
                 messagebox.showinfo("Éxito", f"Matriz guardada en:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo guardar: {e}")
 
-    # =========================================
-    #    MÉTODOS MODIFICADOS PARA SOPORTAR NUEVOS ALGORITMOS
-    # =========================================
-
     def start_algorithm(self):
         """Inicia el algoritmo seleccionado"""
         if self.source_node_id is None or self.sink_node_id is None:
             messagebox.showwarning("Error", "Define Fuente y Sumidero primero.")
             return
             
-        algorithm = self.algo_var.get()
+        algorithm = self.resolve_algorithm()
         self.save_folder = None
         self.reset_algorithm()
+        if not self.profile_var.get() and self.replay_cached_run(algorithm):
+            return
         
+        # Se guardan las líneas de la ejecución para repetirlas desde la caché
+        self.results.start_capture()
         self.log("\n" + "="*50)
         self.log(f" INICIANDO ALGORITMO: {algorithm}")
         self.log("="*50)
-        
-        if algorithm == "GREEDY":
-            self.log("🔧 Algoritmo Greedy: Selecciona el camino con mayor capacidad en cada paso")
-        elif algorithm == "FORD_FULKERSON_DFS":
-            self.log("🔧 Ford-Fulkerson (DFS): Usa búsqueda en profundidad")
-        elif algorithm == "EDMONDS_KARP_BFS":
-            self.log("🔧 Edmonds-Karp (BFS): Usa búsqueda en amplitud (óptimo)")
+        self.log(f"🔧 {get_solver(algorithm)['summary']}")
             
-        self.prepare_algorithm()
+        self.prepare_algorithm(algorithm)
         self.run_algorithm()
 
+    def resolve_algorithm(self):
+        """Algoritmo elegido en el combo; con AUTO, el que sugieren las estadísticas de la red"""
+        algorithm = self.algo_var.get()
+        if algorithm != AUTO_SOLVER:
+            return algorithm
+        network = self.build_flow_network()
+        statistics = network_statistics(network)
+        algorithm, reason = choose_solver(network, statistics)
+        self.log(f"\n🤖 AUTO: {format_statistics(statistics)}")
+        self.log(f"   → {algorithm}: {reason}")
+        return algorithm
+
+    @staticmethod
+    def cache_tag(algorithm, reduced):
+        """Etiqueta de caché: las ejecuciones sobre la red reducida se guardan aparte"""
+        return f"{algorithm}+reducir" if reduced else algorithm
+
+    def replay_cached_run(self, algorithm):
+        """Muestra el resultado guardado si la red no cambió desde que se calculó"""
+        network = self.build_flow_network()
+        tag = self.cache_tag(algorithm, self.reduce_var.get())
+        entry = self.result_cache.get(cache_key(network, tag))
+        if entry is None:
+            return False
+        self.running_algorithm = algorithm
+        self.run_cache_tag = tag
+        self.step_edges = list(self.edges)
+        self.step_network = network
+        for edge, flow in zip(self.edges, entry['arc_flows']):
+            edge['current_flow'] = flow
+            edge['remaining_capacity'] = edge['capacity'] - flow
+            self.update_edge_display(edge)
+        self.refresh_node_flows(rebuild=True)
+        self.total_max_flow = entry['max_flow']
+        self.found_routes = [(path, flow) for path, flow in entry['routes']]
+        self.current_step = len(self.found_routes)
+        self.log("\n♻️ Red sin cambios: resultado tomado de la caché")
+        for line in entry['log']:
+            self.log(line)
+        self.flush_log()
+        messagebox.showinfo("Fin", f"Algoritmo completado (caché).\nFlujo máximo: {self.total_max_flow}")
+        return True
+
     def start_algorithm_with_photos(self):
         """Inicia el algoritmo seleccionado con captura de fotos"""
         if self.source_node_id is None or self.sink_node_id is None:
             messagebox.showwarning("Error", "Define Fuente y Sumidero primero.")
             return
             
-        algorithm = self.algo_var.get()
+        algorithm = self.resolve_algorithm()
         
-        if PIL_AVAILABLE:
+        if load_pil():
             self.save_folder = filedialog.askdirectory(title="Carpeta para guardar imágenes")
             if not self.save_folder: return 
+            # El registro completo de la ejecución queda junto a las imágenes
+            self.results.open_file(os.path.join(self.save_folder, "registro.txt"), include_tail=False)
         else:
             messagebox.showwarning("Advertencia", "PIL no disponible. No se guardarán imágenes.")
             self.save_folder = None
@@ -463,10 +404,10 @@ class NetworkEditor:
         self.log(f" INICIANDO ALGORITMO: {algorithm} (CON FOTOS)")
         self.log("="*50)
         
-        self.prepare_algorithm()
+        self.prepare_algorithm(algorithm)
         self.run_algorithm()
 
-    def prepare_algorithm(self):
+    def prepare_algorithm(self, algorithm):
         """Prepara el estado inicial para cualquier algoritmo"""
         for edge in self.edges:
             edge['current_flow'] = 0
@@ -475,8 +416,31 @@ class NetworkEditor:
         self.total_max_flow = 0
         self.current_step = 0
         self.found_routes = []
+        # El motor trabaja sobre arreglos; step_edges mapea arco -> dict del editor
+        self.running_algorithm = algorithm
+        self.step_edges = list(self.edges)
+        self.refresh_node_flows(rebuild=True)
+        self.step_network = self.build_flow_network()
+        if self.running_algorithm != "HOPCROFT_KARP" and bipartite_unit_structure(self.step_network):
+            self.log("💡 Red de asignación (bipartita, capacidades 1): HOPCROFT_KARP la resuelve en O(E·√V)")
+        solved_network = self.step_network
+        self.reduction = None
+        if self.reduce_var.get():
+            self.reduction = reduce_network(self.step_network)
+            solved_network = self.reduction.network
+            self.log("\n🧹 Red reducida antes de resolver:")
+            for line in self.reduction.summary_lines():
+                self.log(f" {line}")
+        self.run_cache_tag = self.cache_tag(algorithm, self.reduction is not None)
+        self.stop_profiler()
+        self.solver_stats = SolverStats()
+        self.profiler = Profiler().start() if self.profile_var.get() else None
+        self.residual = ResidualGraph(solved_network, self.solver_stats)
+        if self.profiler:
+            self.profiler.pause()
+        self.step_iterator = solve_steps(self.residual, self.running_algorithm)
         if self.save_folder:
-            algorithm_name = self.algo_var.get().lower()
+            algorithm_name = algorithm.lower()
             self.create_snapshot(os.path.join(self.save_folder, f"00_{algorithm_name}_inicio.png"), show_initial_only=True)
 
     # =========================================
@@ -545,23 +509,138 @@ class NetworkEditor:
         node_id = node['id']
         for edge in self.edges:
             if edge['u'] == node_id or edge['v'] == node_id:
-                u = next(n for n in self.nodes if n['id'] == edge['u'])
-                v = next(n for n in self.nodes if n['id'] == edge['v'])
-                coords = self.get_arrow_coords(u, v)
-                self.canvas.coords(edge['canvas_id'], coords['start'][0], coords['start'][1], coords['end'][0], coords['end'][1])
-                self.update_edge_text_position(edge, coords)
+                self.move_edge(edge)
+
+    def move_edge(self, edge):
+        """Reubica la flecha y la etiqueta de un arco según sus nodos"""
+        u = self.node_by_id[edge['u']]
+        v = self.node_by_id[edge['v']]
+        coords = self.get_arrow_coords(u, v)
+        self.canvas.coords(edge['canvas_id'], coords['start'][0], coords['start'][1], coords['end'][0], coords['end'][1])
+        self.update_edge_text_position(edge, coords)
+
+    def move_node(self, node, r=20):
+        oval_id, text_id = node['canvas_ids']
+        self.canvas.coords(oval_id, node['x'] - r, node['y'] - r, node['x'] + r, node['y'] + r)
+        self.canvas.coords(text_id, node['x'], node['y'])
+        if node.get('cap_id') is not None:
+            self.canvas.coords(node['cap_id'], node['x'], node['y'] + 30)
 
     def update_info(self, message):
         self.info_text.delete('1.0', tk.END)
         self.info_text.insert(tk.END, message)
 
     def log(self, message):
-        self.log_text.insert(tk.END, message + "\n")
+        """Registra un mensaje; el panel se actualiza por lotes cada LOG_FLUSH_MS"""
+        self.results.write(message)
+        if self.log_job is None:
+            self.log_job = self.root.after(self.LOG_FLUSH_MS, self.flush_log)
+
+    def flush_log(self):
+        """Vuelca al panel las líneas pendientes y recorta lo que excede la cola"""
+        if self.log_job is not None:
+            self.root.after_cancel(self.log_job)
+            self.log_job = None
+        lines, reset = self.results.take_pending()
+        if reset:
+            self.log_text.delete('1.0', tk.END)
+            lines = list(self.results.tail)
+        if not lines:
+            return
+        self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - self.results.tail_lines
+        if excess > 0:
+            self.log_text.delete('1.0', f"{excess + 1}.0")
         self.log_text.see(tk.END)
 
+    def clear_log(self):
+        if self.log_job is not None:
+            self.root.after_cancel(self.log_job)
+            self.log_job = None
+        self.results.clear()
+        self.log_text.delete('1.0', tk.END)
+
+    def save_log_to_file(self):
+        """Vuelca el registro a un archivo y sigue escribiendo en él"""
+        file_path = filedialog.asksaveasfilename(defaultextension=".txt",
+                                                 filetypes=[("Archivos de texto", "*.txt")],
+                                                 title="Guardar registro de resultados")
+        if not file_path: return
+        try:
+            self.results.open_file(file_path)
+            messagebox.showinfo("Registro", f"Se guardan las últimas {len(self.results.tail)} líneas "
+                                            f"y todo lo que se registre desde ahora en:\n{file_path}")
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo abrir el archivo: {e}")
+
+    # =========================================
+    #    RENDERIZADO AGRUPADO DEL CANVAS
+    # =========================================
+
+    def schedule_render(self):
+        """Programa un único pase de renderizado para el próximo ciclo ocioso"""
+        if self.render_pending is None:
+            self.render_pending = self.root.after_idle(self.flush_render)
+
+    def flush_render(self):
+        """Aplica al canvas todos los cambios acumulados desde el último pase"""
+        self.render_pending = None
+        dirty = list(self.dirty_edges.values())
+        self.dirty_edges.clear()
+        for edge in dirty:
+            self.render_edge(edge)
+        if self.pending_highlight is not None:
+            path = self.pending_highlight
+            self.pending_highlight = None
+            self.render_highlight(path)
+
+    def edge_label_text(self, edge):
+        if edge['current_flow'] == 0:
+            return str(edge['capacity'])
+        txt = f"{edge['current_flow']}/{edge['capacity']}"
+        if edge['remaining_capacity'] < edge['capacity']: 
+            txt += f" ({edge['remaining_capacity']})"
+        return txt
+
+    def render_edge(self, edge):
+        """Redibuja la etiqueta de un arco solo si su texto cambió"""
+        if edge['text_id'] is None:
+            return  # todavía no se dibujó; tomará el texto actual al dibujarse
+        txt = self.edge_label_text(edge)
+        if edge.get('display_text') == txt:
+            return
+        edge['display_text'] = txt
+        self.canvas.itemconfig(edge['text_id'], text=txt)
+        self.update_edge_background(edge['bg_id'], edge['text_id'])
+
+    def render_highlight(self, path_arcs):
+        """Reutiliza las líneas de resaltado existentes en lugar de recrearlas"""
+        segments = []
+        for edge, backward in path_arcs:
+            c = self.canvas.coords(edge['canvas_id'])
+            if not c: continue
+            # Un arco inverso (deshace flujo) se resalta en sentido contrario
+            segments.append(c[2:] + c[:2] if backward else c)
+        for i, c in enumerate(segments):
+            if i < len(self.highlight_items):
+                item = self.highlight_items[i]
+                self.canvas.coords(item, *c)
+                self.canvas.itemconfig(item, state=tk.NORMAL)
+            else:
+                item = self.canvas.create_line(c, width=5, fill="#E67E22", arrow=tk.LAST, tags="algorithm_highlight")
+                self.highlight_items.append(item)
+        for item in self.highlight_items[len(segments):]:
+            self.canvas.itemconfig(item, state=tk.HIDDEN)
+        self.canvas.tag_raise("algorithm_highlight")
+
+    def hide_algorithm_highlight(self):
+        """Oculta el resaltado del paso actual sin destruir las líneas"""
+        self.pending_highlight = None
+        self.canvas.itemconfig("algorithm_highlight", state=tk.HIDDEN)
+
     def get_node_label(self, node_id):
-        for node in self.nodes:
-            if node['id'] == node_id: return node['label']
+        node = self.node_by_id.get(node_id)
+        if node: return node['label']
         return str(node_id)
 
     def on_right_click(self, event):
@@ -571,6 +650,7 @@ class NetworkEditor:
         if clicked_node:
             menu = tk.Menu(self.root, tearoff=0)
             menu.add_command(label="✎ Renombrar", command=lambda: self.rename_node(clicked_node))
+            menu.add_command(label="Capacidad del nodo", command=lambda: self.change_node_capacity(clicked_node))
             menu.add_separator()
             menu.add_command(label="Definir FUENTE", command=lambda: self.set_node_type(clicked_node, 'source'))
             menu.add_command(label="Definir SUMIDERO", command=lambda: self.set_node_type(clicked_node, 'sink'))
@@ -588,47 +668,99 @@ class NetworkEditor:
         if not forced_id: self.node_counter += 1
         label = forced_label if forced_label else str(node_id)
         
-        r = 20
-        fill_c = "#ECF0F1"
-        if forced_type == 'source': fill_c = "#27AE60"
-        if forced_type == 'sink': fill_c = "#E74C3C"
-
-        oval_id = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=fill_c, outline="#2C3E50", width=2, tags=f"node_{node_id}")
-        text_id = self.canvas.create_text(x, y, text=label, font=("Arial", 12, "bold"), tags=f"node_{node_id}")
-        
-        new_node = {'id': node_id, 'label': label, 'x': x, 'y': y, 'canvas_ids': (oval_id, text_id), 'type': forced_type}
+        new_node = {'id': node_id, 'label': label, 'x': x, 'y': y, 'canvas_ids': (None, None), 'type': forced_type,
+                    'capacity': None, 'flow': 0, 'cap_id': None}
+        self.draw_node(new_node)
         self.nodes.append(new_node)
+        self.node_by_id[node_id] = new_node
         
         if forced_type == 'source': self.source_node_id = node_id
         if forced_type == 'sink': self.sink_node_id = node_id
 
+    def draw_node(self, node):
+        """Crea los elementos del canvas de un nodo ya registrado"""
+        x, y, node_id = node['x'], node['y'], node['id']
+        r = 20
+        fill_c = "#ECF0F1"
+        if node['type'] == 'source': fill_c = "#27AE60"
+        if node['type'] == 'sink': fill_c = "#E74C3C"
+
+        oval_id = self.canvas.create_oval(x-r, y-r, x+r, y+r, fill=fill_c, outline="#2C3E50", width=2, tags=f"node_{node_id}")
+        text_id = self.canvas.create_text(x, y, text=node['label'], font=("Arial", 12, "bold"), tags=f"node_{node_id}")
+        node['canvas_ids'] = (oval_id, text_id)
+        node['cap_id'] = None
+        if node.get('capacity') is not None:
+            self.draw_node_capacity(node)
+
+    def draw_node_capacity(self, node):
+        """Etiqueta bajo el nodo con su capacidad propia"""
+        node['cap_id'] = self.canvas.create_text(node['x'], node['y'] + 30, text=self.node_capacity_text(node),
+                                                 fill="#8E44AD", font=("Arial", 9, "bold"), tags=f"node_{node['id']}")
+
+    def node_capacity_text(self, node):
+        """'≤ capacidad', o 'flujo/capacidad' si el nodo ya lleva flujo"""
+        if node.get('flow'):
+            return f"{node['flow']}/{node['capacity']}"
+        return f"≤ {node['capacity']}"
+
+    def refresh_node_flows(self, rebuild=False):
+        """Actualiza el flujo que atraviesa cada nodo con capacidad propia.
+
+        Con ``rebuild`` se vuelve a armar la lista de arcos de cada nodo: los
+        de salida, o los de entrada en el sumidero (como en el motor).
+        """
+        if rebuild:
+            limited = {n['id']: (n, []) for n in self.nodes if n.get('capacity') is not None}
+            if limited:
+                for e in self.edges:
+                    if e['u'] in limited and e['u'] != self.sink_node_id:
+                        limited[e['u']][1].append(e)
+                    if e['v'] == self.sink_node_id and e['v'] in limited:
+                        limited[e['v']][1].append(e)
+            self.node_flow_edges = list(limited.values())
+        for node, edges in self.node_flow_edges:
+            node['flow'] = sum(e['current_flow'] for e in edges)
+            if node.get('cap_id') is not None:
+                self.canvas.itemconfig(node['cap_id'], text=self.node_capacity_text(node))
+
     def add_edge(self, u_node, v_node, capacity=None):
         if capacity is None:
             capacity = simpledialog.askinteger("Capacidad", f"Capacidad {u_node['label']} → {v_node['label']}:", minvalue=1, initialvalue=5)
         
         if capacity is not None:
-            coords = self.get_arrow_coords(u_node, v_node)
-            line_id = self.canvas.create_line(coords['start'], coords['end'], arrow=tk.LAST, width=3, fill="#2980B9", tags="edge")
-            
-            text_x = coords['mid_x'] + coords['off_x']
-            text_y = coords['mid_y'] + coords['off_y']
-            
-            bg_padding = 5
-            bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="#2C3E50", width=1, tags="edge_bg")
-            text_id = self.canvas.create_text(text_x, text_y, text=str(capacity), 
-                                            fill="#2C3E50", font=("Arial", 10, "bold"), tags="edge_text")
-            self.update_edge_background(bg_id, text_id, bg_padding)
-            
-            self.edges.append({
-                'u': u_node['id'], 
-                'v': v_node['id'], 
-                'capacity': capacity, 
-                'current_flow': 0, 
-                'remaining_capacity': capacity, 
-                'canvas_id': line_id, 
-                'text_id': text_id,
-                'bg_id': bg_id
-            })
+            edge = self.new_edge(u_node['id'], v_node['id'], capacity)
+            self.draw_edge(edge, u_node, v_node)
+            self.edges.append(edge)
+
+    def new_edge(self, u_id, v_id, capacity):
+        """Crea el diccionario de un arco (sin elementos de canvas todavía)"""
+        return {
+            'u': u_id, 
+            'v': v_id, 
+            'capacity': capacity, 
+            'current_flow': 0, 
+            'remaining_capacity': capacity, 
+            'canvas_id': None, 
+            'text_id': None,
+            'bg_id': None,
+            'display_text': None
+        }
+
+    def draw_edge(self, edge, u_node, v_node):
+        """Crea la flecha, la etiqueta y su fondo para un arco ya registrado"""
+        coords = self.get_arrow_coords(u_node, v_node)
+        line_id = self.canvas.create_line(coords['start'], coords['end'], arrow=tk.LAST, width=3, fill="#2980B9", tags="edge")
+        
+        text_x = coords['mid_x'] + coords['off_x']
+        text_y = coords['mid_y'] + coords['off_y']
+        
+        bg_padding = 5
+        txt = self.edge_label_text(edge)
+        bg_id = self.canvas.create_rectangle(0, 0, 0, 0, fill="white", outline="#2C3E50", width=1, tags="edge_bg")
+        text_id = self.canvas.create_text(text_x, text_y, text=txt, 
+                                        fill="#2C3E50", font=("Arial", 10, "bold"), tags="edge_text")
+        self.update_edge_background(bg_id, text_id, bg_padding)
+        edge.update({'canvas_id': line_id, 'text_id': text_id, 'bg_id': bg_id, 'display_text': txt})
 
     def update_edge_background(self, bg_id, text_id, padding=5):
         bbox = self.canvas.bbox(text_id)
@@ -673,6 +805,30 @@ class NetworkEditor:
             node['label'] = new_label
             self.canvas.itemconfig(node['canvas_ids'][1], text=new_label)
 
+    def change_node_capacity(self, node):
+        """Fija o quita el límite de flujo que puede atravesar el nodo"""
+        current = node.get('capacity')
+        text = simpledialog.askstring("Capacidad del nodo", "Flujo máximo que atraviesa el nodo (vacío = sin límite):",
+                                      initialvalue="" if current is None else str(current))
+        if text is None:
+            return
+        text = text.strip()
+        try:
+            capacity = parse_capacity(text) if text else None
+        except ValueError:
+            messagebox.showerror("Error", f"Capacidad inválida: {text}")
+            return
+        if capacity is not None and capacity < 0:
+            messagebox.showerror("Error", "La capacidad no puede ser negativa.")
+            return
+        node['capacity'] = capacity
+        if node.get('cap_id') is not None:
+            self.canvas.delete(node['cap_id'])
+            node['cap_id'] = None
+        if capacity is not None:
+            self.draw_node_capacity(node)
+        self.refresh_node_flows(rebuild=True)
+
     def change_edge_capacity(self, edge):
         new_c = simpledialog.askinteger("Capacidad", "Valor:", initialvalue=edge['capacity'])
         if new_c:
@@ -681,14 +837,9 @@ class NetworkEditor:
             self.update_edge_display(edge)
 
     def update_edge_display(self, edge):
-        if edge['current_flow'] == 0:
-            txt = str(edge['capacity'])
-        else:
-            txt = f"{edge['current_flow']}/{edge['capacity']}"
-            if edge['remaining_capacity'] < edge['capacity']: 
-                txt += f" ({edge['remaining_capacity']})"
-        self.canvas.itemconfig(edge['text_id'], text=txt)
-        self.update_edge_background(edge['bg_id'], edge['text_id'])
+        """Marca el arco como sucio; el texto se actualiza en el próximo render"""
+        self.dirty_edges[id(edge)] = edge
+        self.schedule_render()
 
     def highlight_node(self, node, color):
         self.canvas.delete("highlight")
@@ -708,6 +859,7 @@ class NetworkEditor:
         nid = node['id']
         edges_to_remove = [e for e in self.edges if e['u'] == nid or e['v'] == nid]
         for edge in edges_to_remove:
+            self.dirty_edges.pop(id(edge), None)
             self.canvas.delete(edge['canvas_id'])
             self.canvas.delete(edge['text_id'])
             self.canvas.delete(edge['bg_id'])
@@ -715,125 +867,232 @@ class NetworkEditor:
         if self.source_node_id == nid: self.source_node_id = None
         if self.sink_node_id == nid: self.sink_node_id = None
         self.nodes.remove(node)
+        self.node_by_id.pop(nid, None)
         self.canvas.delete(f"node_{nid}")
 
     def delete_edge(self, edge):
+        self.dirty_edges.pop(id(edge), None)
         self.canvas.delete(edge['canvas_id'])
         self.canvas.delete(edge['text_id'])
         self.canvas.delete(edge['bg_id'])
         self.edges.remove(edge)
 
     def clear_canvas(self):
+        if self.load_job is not None:
+            self.root.after_cancel(self.load_job)
+            self.load_job = None
+        if self.layout_job is not None:
+            self.root.after_cancel(self.layout_job)
+            self.layout_job = None
         self.canvas.delete("all")
+        self.dirty_edges.clear()
+        self.pending_highlight = None
+        self.highlight_items = []
         self.nodes = []
         self.edges = []
+        self.node_by_id = {}
         self.node_counter = 1
         self.source_node_id = None
         self.sink_node_id = None
         self.reset_algorithm()
-        self.log_text.delete('1.0', tk.END)
+        self.result_cache.unbind_file()
+        self.clear_log()
 
     def save_project_json(self):
         if not self.nodes:
             messagebox.showwarning("Vacío", "No hay nada que guardar.")
             return
         file_path = filedialog.asksaveasfilename(defaultextension=".json", 
-                                               filetypes=[("Archivos JSON", "*.json")])
+                                               filetypes=[("Archivos JSON", "*.json"),
+                                                          ("Proyecto binario", f"*{BINARY_EXTENSION}"),
+                                                          ("DIMACS max-flow", " ".join(f"*{ext}" for ext in DIMACS_EXTENSIONS)),
+                                                          ("Lista de arcos CSV", f"*{CSV_EXTENSION}")])
         if not file_path: return
-        data = {
-            "node_counter": self.node_counter,
-            "source_id": self.source_node_id,
-            "sink_id": self.sink_node_id,
-            "nodes": [{"id": n['id'], "label": n['label'], "x": n['x'], "y": n['y'], "type": n['type']} for n in self.nodes],
-            "edges": [{"u": e['u'], "v": e['v'], "capacity": e['capacity']} for e in self.edges]
-        }
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=4)
+            # El formato se elige por extensión; el JSON se escribe por bloques
+            # y el binario compacto incluye además el flujo actual
+            network = self.build_flow_network()
+            network.node_counter = self.node_counter
+            network.flows = [e['current_flow'] for e in self.edges]
+            save_project(network, file_path)
+            self.result_cache.bind_file(cache_path_for(file_path), network)
             messagebox.showinfo("Guardado", "Proyecto guardado exitosamente.")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo guardar: {e}")
 
     def load_project_json(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Archivos JSON", "*.json")])
+        dimacs_patterns = " ".join(f"*{ext}" for ext in DIMACS_EXTENSIONS)
+        file_path = filedialog.askopenfilename(filetypes=[("Proyectos", f"*.json *{BINARY_EXTENSION}"),
+                                                          ("Archivos JSON", "*.json"),
+                                                          ("Proyecto binario", f"*{BINARY_EXTENSION}"),
+                                                          ("DIMACS max-flow", dimacs_patterns),
+                                                          ("Lista de arcos CSV", f"*{CSV_EXTENSION}")])
         if not file_path: return
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            # Binario por cabecera; DIMACS/CSV por extensión
+            network = load_project_network(file_path)
             self.clear_canvas()
-            self.node_counter = data.get("node_counter", 1)
-            for n_data in data["nodes"]:
-                self.add_node(n_data['x'], n_data['y'], 
-                             forced_id=n_data['id'], 
-                             forced_label=n_data['label'], 
-                             forced_type=n_data['type'])
-            for e_data in data["edges"]:
-                u = next((n for n in self.nodes if n['id'] == e_data['u']), None)
-                v = next((n for n in self.nodes if n['id'] == e_data['v']), None)
-                if u and v:
-                    self.add_edge(u, v, capacity=e_data['capacity'])
-            self.source_node_id = data.get("source_id")
-            self.sink_node_id = data.get("sink_id")
+            self.result_cache.bind_file(cache_path_for(file_path))
+            if network.xs is None or network.ys is None:
+                # Las instancias importadas no traen posiciones: se distribuyen por capas
+                self.start_layout(network, "CAPAS", self.populate_from_network)
+            else:
+                self.populate_from_network(network)
             messagebox.showinfo("Cargado", "Proyecto cargado correctamente.")
         except Exception as e:
             messagebox.showerror("Error", f"Archivo corrupto o inválido: {e}")
 
-    def find_paths_iteratively(self):
-        """Algoritmo Greedy original (para mantener compatibilidad)"""
-        if not self.is_animating: return
-        path_ids, bottleneck = self.find_path_with_max_capacity()
-        if path_ids:
-            self.current_step += 1
-            self.found_routes.append((path_ids, bottleneck))
-            self.highlight_algorithm_step(path_ids)
-            self.update_capacities_along_path(path_ids, bottleneck)
-            self.total_max_flow += bottleneck
-            path_str = " → ".join([self.get_node_label(nid) for nid in path_ids])
-            self.log(f"\n[Paso {self.current_step}] Ruta encontrada:\n {path_str}")
-            self.log(f" Flujo enviado: {bottleneck}")
-            if self.save_folder:
-                filename = os.path.join(self.save_folder, f"{self.current_step:02d}_Iteracion_Ruta_{bottleneck}.png")
-                self.create_snapshot(filename, highlight_path=path_ids)
-            self.root.after(1200, self.find_paths_iteratively)
+    def populate_from_network(self, network):
+        """Crea en bloque los nodos y arcos del editor y los dibuja por partes.
+
+        Primero se arma el modelo y el índice de nodos (sin tocar el canvas);
+        el dibujo se reparte en bloques de RENDER_CHUNK elementos.
+        """
+        node_ids = network.node_ids
+        types = network.node_types or ['transship'] * network.num_nodes
+        node_caps = network.node_capacities or [None] * network.num_nodes
+        for i, node_id in enumerate(node_ids):
+            node = {'id': node_id, 'label': network.get_label(node_id),
+                    'x': network.xs[i], 'y': network.ys[i], 'canvas_ids': (None, None), 'type': types[i],
+                    'capacity': node_caps[i], 'flow': 0, 'cap_id': None}
+            self.nodes.append(node)
+            self.node_by_id[node_id] = node
+        for a in range(network.num_arcs):
+            edge = self.new_edge(node_ids[network.tails[a]], node_ids[network.heads[a]], network.capacities[a])
+            if network.flows is not None:
+                edge['current_flow'] = network.flows[a]
+                edge['remaining_capacity'] = edge['capacity'] - edge['current_flow']
+            self.edges.append(edge)
+        if network.node_counter is not None:
+            self.node_counter = network.node_counter
         else:
-            self.finalize_algorithm()
+            self.node_counter = max(node_ids, default=0) + 1
+        self.source_node_id = network.source
+        self.sink_node_id = network.sink
+        self.refresh_node_flows(rebuild=True)
+        self.draw_pending_chunk(0)
+
+    def draw_pending_chunk(self, start, move=False):
+        """Dibuja un bloque de nodos/arcos pendientes y programa el siguiente.
+
+        Con ``move`` los elementos ya dibujados se reubican en su posición
+        actual (tras una distribución automática).
+        """
+        self.load_job = None
+        nodes, edges = self.nodes, self.edges
+        total = len(nodes) + len(edges)
+        end = min(start + self.RENDER_CHUNK, total)
+        for k in range(start, end):
+            if k < len(nodes):
+                node = nodes[k]
+                if node['canvas_ids'][0] is None:
+                    self.draw_node(node)
+                elif move:
+                    self.move_node(node)
+            else:
+                edge = edges[k - len(nodes)]
+                if edge['canvas_id'] is None:
+                    self.draw_edge(edge, self.node_by_id[edge['u']], self.node_by_id[edge['v']])
+                elif move:
+                    self.move_edge(edge)
+        if end < total:
+            self.update_info(f"Dibujando red... {end}/{total} elementos")
+            self.load_job = self.root.after(1, self.draw_pending_chunk, end, move)
+        elif total:
+            self.update_info(f"Red cargada: {len(nodes)} nodos, {len(edges)} arcos.")
+
+    def auto_layout(self):
+        """Reubica todos los nodos con la distribución seleccionada"""
+        if not self.nodes:
+            messagebox.showwarning("Vacío", "No hay nodos para ordenar.")
+            return
+        if self.layout_job is not None:
+            return  # ya hay una distribución en curso
+        self.start_layout(self.build_flow_network(), self.layout_var.get(), self.apply_node_positions)
 
-    def find_path_with_max_capacity(self):
-        visited = set()
-        def dfs(curr, path, flow):
-            if curr == self.sink_node_id: return path, flow
-            visited.add(curr)
-            candidates = []
-            for edge in self.edges:
-                if edge['u'] == curr and edge['v'] not in visited:
-                    if edge['remaining_capacity'] > 0:
-                        candidates.append((edge['v'], edge['remaining_capacity']))
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            for node_v, cap in candidates:
-                new_flow = min(flow, cap)
-                res_path, res_flow = dfs(node_v, path + [node_v], new_flow)
-                if res_path: return res_path, res_flow
-            return None, 0
-        return dfs(self.source_node_id, [self.source_node_id], float('inf'))
-
-    def update_capacities_along_path(self, path, flow):
-        for i in range(len(path)-1):
-            u, v = path[i], path[i+1]
-            edge = next(e for e in self.edges if e['u']==u and e['v']==v)
-            edge['remaining_capacity'] -= flow
-            edge['current_flow'] += flow
-            self.update_edge_display(edge)
+    def start_layout(self, network, name, on_done):
+        """Calcula la distribución en un hilo aparte y espera el resultado con after().
 
-    def highlight_algorithm_step(self, path):
-        self.canvas.delete("algorithm_highlight")
-        for i in range(len(path)-1):
-            u, v = path[i], path[i+1]
-            edge = next(e for e in self.edges if e['u']==u and e['v']==v)
-            c = self.canvas.coords(edge['canvas_id'])
-            if c: self.canvas.create_line(c, width=5, fill="#E67E22", arrow=tk.LAST, tags="algorithm_highlight")
+        El hilo solo trabaja sobre la FlowNetwork; el canvas se modifica
+        únicamente desde el hilo de Tk, en ``on_done(network)``.
+        """
+        outcome = {}
+
+        def work():
+            try:
+                apply_layout(network, name)
+            except Exception as e:
+                outcome['error'] = e
+
+        worker = threading.Thread(target=work, daemon=True)
+        worker.start()
+        self.update_info(f"Calculando distribución {name} ({network.num_nodes} nodos)...")
+        self.layout_job = self.root.after(50, self.poll_layout, worker, network, outcome, on_done)
+
+    def poll_layout(self, worker, network, outcome, on_done):
+        if worker.is_alive():
+            self.layout_job = self.root.after(50, self.poll_layout, worker, network, outcome, on_done)
+            return
+        self.layout_job = None
+        if 'error' in outcome:
+            messagebox.showerror("Error", f"No se pudo calcular la distribución: {outcome['error']}")
+            return
+        on_done(network)
+
+    def apply_node_positions(self, network):
+        """Copia las coordenadas calculadas a los nodos y los reubica por bloques"""
+        for i, node_id in enumerate(network.node_ids):
+            node = self.node_by_id.get(node_id)
+            if node is not None:
+                node['x'], node['y'] = network.xs[i], network.ys[i]
+        if self.load_job is not None:
+            self.root.after_cancel(self.load_job)
+        self.hide_algorithm_highlight()
+        self.draw_pending_chunk(0, move=True)
+
+    def step_arc_flows(self):
+        """Flujo por arco del editor en la ejecución en curso (expandido si se redujo la red)"""
+        flows = self.residual.arc_flows()
+        return self.reduction.expand_flows(flows) if self.reduction else flows
+
+    def update_capacities_along_path(self, arcs, flow):
+        """Refleja en los arcos del editor un aumento sobre arcos residuales"""
+        if self.reduction:
+            # Cada arco reducido reparte el cambio entre los arcos originales
+            changes = self.reduction.expand_step(arcs, flow, lambda a: self.step_edges[a]['current_flow'])
+            for a, delta in changes.items():
+                edge = self.step_edges[a]
+                edge['remaining_capacity'] -= delta
+                edge['current_flow'] += delta
+                self.update_edge_display(edge)
+            self.refresh_node_flows()
+            return
+        for r in arcs:
+            if r >> 1 >= len(self.step_edges):
+                continue  # arco interno de un nodo con capacidad propia
+            edge = self.step_edges[r >> 1]
+            sign = -1 if r & 1 else 1  # arco residual inverso: se deshace flujo
+            edge['remaining_capacity'] -= sign * flow
+            edge['current_flow'] += sign * flow
+            self.update_edge_display(edge)
+        self.refresh_node_flows()
+
+    def step_path_arcs(self, arcs):
+        """Arcos residuales del camino → (arco del editor, es_inverso)"""
+        if self.reduction:
+            return [(self.step_edges[a], r & 1) for r in arcs
+                    for a in self.reduction.original_arcs(r >> 1)]
+        # Los arcos internos de los nodos con capacidad no tienen arco en el editor
+        return [(self.step_edges[r >> 1], r & 1) for r in arcs
+                if r >> 1 < len(self.step_edges)]
+
+    def highlight_algorithm_step(self, arcs):
+        """Programa el resaltado del camino; se dibuja junto al resto del paso"""
+        self.pending_highlight = self.step_path_arcs(arcs)
+        self.schedule_render()
 
     def finalize_algorithm(self):
-        algorithm = self.algo_var.get()
+        algorithm = self.running_algorithm
         self.log("\n" + "="*50)
         self.log(f" RESULTADOS FINALES - {algorithm}")
         self.log("="*50)
@@ -843,76 +1102,224 @@ class NetworkEditor:
             self.log(f"Ruta {i} : {' → '.join(p_lbls)} = {flow}")
         self.log("-" * 40)
         self.log(f"FLUJO MÁXIMO TOTAL: {self.total_max_flow}")
-        
+
+        # Las rutas aumentantes pueden solaparse o cancelarse: se muestra
+        # además la descomposición del flujo final en caminos y ciclos
+        self.log_flow_decomposition(self.step_network, self.step_arc_flows(),
+                                    snapshot_tag=get_solver(algorithm)['tag'] if self.save_folder else None)
+        
+        # Contadores del motor y, si se pidió, el perfil de los pasos
+        self.log("\n📊 Estadísticas del motor:")
+        for line in self.solver_stats.format_lines():
+            self.log(f" {line}")
+        if self.profiler:
+            self.profiler.stop()
+            self.log("\n⏱ Perfil (pasos del algoritmo):")
+            for line in self.profiler.format_lines():
+                self.log(f" {line}")
+            self.profiler = None
+
         # Información adicional según el algoritmo
-        if algorithm == "GREEDY":
-            self.log("\n💡 El algoritmo Greedy no siempre encuentra el óptimo global")
-        elif algorithm == "FORD_FULKERSON_DFS":
-            self.log("\n💡 Ford-Fulkerson con DFS puede ser lento en algunos casos")
-        elif algorithm == "EDMONDS_KARP_BFS":
-            self.log("\n💡 Edmonds-Karp (BFS) garantiza el óptimo en tiempo polinomial")
+        self.log(f"\n💡 {get_solver(algorithm)['note']}")
             
         self.is_animating = False
+        if self.results.capture is not None:
+            self.store_run_in_cache()
+        self.flush_log()
+        self.results.flush()
         if self.save_folder: 
             messagebox.showinfo("Fin", f"Imágenes guardadas en:\n{self.save_folder}")
         else:
             messagebox.showinfo("Fin", f"Algoritmo completado.\nFlujo máximo: {self.total_max_flow}")
 
+    def store_run_in_cache(self):
+        """Guarda flujo, rutas, corte y registro de la ejecución terminada"""
+        flows = list(self.step_arc_flows())
+        cut = min_cut_from_flows(self.step_network, flows) if self.reduction else min_cut(self.residual)
+        entry = {'algorithm': self.running_algorithm, 'max_flow': self.total_max_flow, 'arc_flows': flows,
+                 'routes': self.found_routes, 'cut': cut_entry(cut), 'log': self.results.stop_capture()}
+        try:
+            self.result_cache.put(cache_key(self.step_network, self.run_cache_tag), entry)
+        except OSError as e:
+            self.log(f"⚠️ No se pudo guardar la caché de resultados: {e}")
+
+    def log_flow_decomposition(self, network, arc_flows, snapshot_tag=None):
+        """Registra la descomposición de un flujo por arco en caminos s-t y ciclos.
+
+        Con ``snapshot_tag`` guarda además una imagen por camino en la
+        carpeta de fotos. Devuelve la descomposición (o None si el flujo no
+        se conserva).
+        """
+        try:
+            decomposition = decompose_flow(network, arc_flows)
+        except ValueError as e:
+            self.log(f"⚠️ No se pudo descomponer el flujo: {e}")
+            return None
+        self.flow_decomposition = decomposition
+        self.log("\n🧩 Descomposición del flujo (caminos y ciclos):")
+        for i, (p_ids, flow) in enumerate(decomposition['paths'], 1):
+            self.log(f"Camino {i} : {' → '.join(self.get_node_label(nid) for nid in p_ids)} = {flow}")
+        for i, (c_ids, flow) in enumerate(decomposition['cycles'], 1):
+            self.log(f"Ciclo {i} : {' → '.join(self.get_node_label(nid) for nid in c_ids)} = {flow}")
+        if not decomposition['cycles']:
+            self.log("(sin ciclos)")
+        if snapshot_tag and self.save_folder:
+            for i, (p_ids, flow) in enumerate(decomposition['paths'], 1):
+                filename = os.path.join(self.save_folder, f"{snapshot_tag}_Descomposicion_{i:02d}_{flow}.png")
+                self.create_snapshot(filename, highlight_path=p_ids)
+        return decomposition
+
     def highlight_bottlenecks(self):
         if self.total_max_flow == 0:
             messagebox.showinfo("Aviso", "Ejecuta el algoritmo primero.")
             return
-        reachable = set()
-        stack = [self.source_node_id]
-        reachable.add(self.source_node_id)
-        while stack:
-            u = stack.pop()
-            for edge in self.edges:
-                if edge['u'] == u and edge['v'] not in reachable and edge['remaining_capacity'] > 0:
-                    reachable.add(edge['v'])
-                    stack.append(edge['v'])
-        min_cut_edges = []
-        capacity_sum = 0
+        network = self.build_flow_network()
+        flows = [e['current_flow'] for e in self.edges]
+        # Si el flujo es el de una ejecución guardada, su corte ya está calculado
+        entry = self.result_cache.get(cache_key(network, self.run_cache_tag)) if self.run_cache_tag else None
+        if entry is not None and entry['arc_flows'] == flows:
+            cut = cut_from_entry(network, entry['cut'])
+        else:
+            # Un BFS sobre el residual del flujo actual (incluye arcos inversos)
+            cut = min_cut_from_flows(network, flows)
+        self.last_cut = cut
         self.canvas.delete("bottleneck_highlight")
         self.log("\n" + "="*50)
         self.log(" ANÁLISIS DE CORTE MÍNIMO (CUELLOS DE BOTELLA)")
         self.log("="*50)
-        for edge in self.edges:
-            if edge['u'] in reachable and edge['v'] not in reachable:
-                min_cut_edges.append(edge)
-                capacity_sum += edge['capacity']
-                coords = self.canvas.coords(edge['canvas_id'])
-                if coords:
-                    self.canvas.create_line(coords, width=7, fill="#9B59B6", 
-                                          dash=(10, 5), tags="bottleneck_highlight")
-                u_lbl = self.get_node_label(edge['u'])
-                v_lbl = self.get_node_label(edge['v'])
-                self.log(f" 🔒 CUELLO DE BOTELLA: {u_lbl} → {v_lbl} (Cap: {edge['capacity']})")
-        self.log(f"\n Capacidad del Corte: {capacity_sum}")
+        for a in cut.cut_arcs:
+            edge = self.edges[a]
+            coords = self.canvas.coords(edge['canvas_id'])
+            if coords:
+                self.canvas.create_line(coords, width=7, fill="#9B59B6", 
+                                      dash=(10, 5), tags="bottleneck_highlight")
+            u_lbl = self.get_node_label(edge['u'])
+            v_lbl = self.get_node_label(edge['v'])
+            self.log(f" 🔒 CUELLO DE BOTELLA: {u_lbl} → {v_lbl} (Cap: {edge['capacity']})")
+        for node_id, capacity in cut.cut_node_list():
+            node = self.node_by_id[node_id]
+            self.canvas.create_oval(node['x'] - 27, node['y'] - 27, node['x'] + 27, node['y'] + 27, outline="#9B59B6",
+                                    width=5, dash=(6, 3), tags="bottleneck_highlight")
+            self.log(f" 🔒 NODO CUELLO DE BOTELLA: {node['label']} (Cap: {capacity})")
+        self.log(f"\n Lado S: {len(cut.source_nodes())} nodos | Lado T: {len(cut.sink_nodes())} nodos")
+        self.log(f" Capacidad del Corte: {cut.capacity}")
         self.log(f" Flujo Máximo: {self.total_max_flow}")
-        if capacity_sum == self.total_max_flow:
+        if cut.verify(self.total_max_flow):
             self.log(" ✅ TEOREMA VERIFICADO: Flujo Máx == Corte Mín")
-            messagebox.showinfo("Teorema Verificado", f"El algoritmo es correcto.\nSuma de cuellos de botella: {capacity_sum}\nFlujo Total: {self.total_max_flow}")
+            messagebox.showinfo("Teorema Verificado", f"El algoritmo es correcto.\nSuma de cuellos de botella: {cut.capacity}\nFlujo Total: {self.total_max_flow}")
         else:
-            algorithm = self.algo_var.get()
-            if algorithm == "GREEDY":
+            if not cut.separates:
+                self.log(" ⚠️ El sumidero sigue alcanzable en el residual: el flujo no es máximo")
+            algorithm = self.running_algorithm or self.algo_var.get()
+            if not get_solver(algorithm)['exact']:
                 self.log(" ⚠️ El algoritmo Greedy no siempre garantiza el óptimo global")
             else:
                 self.log(" ⚠️ Puede haber un error en la implementación")
 
+    # =========================================
+    #    SENSIBILIDAD (ARCOS MÁS VITALES)
+    # =========================================
+
+    def show_sensitivity(self):
+        """Pérdida por falla y márgenes de cada arco, en tabla y sobre el canvas"""
+        if self.total_max_flow == 0:
+            messagebox.showinfo("Aviso", "Ejecuta el algoritmo primero.")
+            return
+        try:
+            report = arc_sensitivity(self.build_flow_network(), [e['current_flow'] for e in self.edges])
+        except ValueError as e:
+            messagebox.showwarning("Aviso", f"{e}.\nUsa un algoritmo exacto o GLPK.")
+            return
+        self.last_sensitivity = report
+        self.draw_sensitivity_overlay(report)
+        self.log("\n" + "="*50)
+        self.log(" ANÁLISIS DE SENSIBILIDAD (ARCOS MÁS VITALES)")
+        self.log("="*50)
+        for line in report.summary_lines():
+            self.log(f" {line}")
+        SensitivityViewer(self, report)
+
+    def draw_sensitivity_overlay(self, report):
+        """Arcos y nodos cuya falla reduce el flujo: grosor según la pérdida"""
+        self.canvas.delete("sensitivity_overlay")
+        worst = max(report.loss, default=0)
+        if worst <= 0:
+            return
+        for x in report.ranked():
+            loss = report.loss[x]
+            if loss <= 0:
+                break
+            width = 3 + 9 * loss / worst
+            color = "#C0392B" if report.cut_class[x] == ALL_CUTS else "#E67E22"
+            if report.is_node(x):
+                node = self.node_by_id[report.network.node_ids[report.limited[x - report.num_arcs]]]
+                r = 24 + width
+                self.canvas.create_oval(node['x'] - r, node['y'] - r, node['x'] + r, node['y'] + r,
+                                        outline=color, width=width / 2, tags="sensitivity_overlay")
+                self.canvas.create_text(node['x'], node['y'] - r - 8, text=f"-{loss:g}", fill=color,
+                                        font=("Arial", 9, "bold"), tags="sensitivity_overlay")
+                continue
+            coords = self.canvas.coords(self.edges[x]['canvas_id'])
+            if not coords:
+                continue
+            self.canvas.create_line(coords, width=width, fill=color, stipple="gray50",
+                                    tags="sensitivity_overlay")
+            mx, my = (coords[0] + coords[2]) / 2, (coords[1] + coords[3]) / 2
+            self.canvas.create_text(mx, my - 16, text=f"-{loss:g}", fill=color,
+                                    font=("Arial", 9, "bold"), tags="sensitivity_overlay")
+        self.canvas.tag_lower("sensitivity_overlay")
+
+    def focus_sensitivity_element(self, x):
+        """Resalta en el canvas el arco o nodo elegido en la tabla"""
+        self.canvas.delete("sensitivity_focus")
+        report = self.last_sensitivity
+        if report is None:
+            return
+        if report.is_node(x):
+            node = self.node_by_id[report.network.node_ids[report.limited[x - report.num_arcs]]]
+            self.canvas.create_oval(node['x'] - 30, node['y'] - 30, node['x'] + 30, node['y'] + 30,
+                                    outline="#2980B9", width=4, tags="sensitivity_focus")
+            return
+        coords = self.canvas.coords(self.edges[x]['canvas_id'])
+        if coords:
+            self.canvas.create_line(coords, width=6, fill="#2980B9", arrow=tk.LAST, tags="sensitivity_focus")
+
+    def stop_profiler(self):
+        """Detiene un perfil pendiente de una ejecución interrumpida"""
+        if self.profiler:
+            self.profiler.stop()
+            self.profiler = None
+
     def reset_algorithm(self):
         self.is_animating = False
+        if self.step_job is not None:
+            self.root.after_cancel(self.step_job)
+            self.step_job = None
+        self.stop_profiler()
+        self.results.stop_capture()
+        self.step_iterator = None
         self.current_step = 0
         self.total_max_flow = 0
         self.found_routes = []
-        self.canvas.delete("algorithm_highlight")
+        self.hide_algorithm_highlight()
+        self.canvas.delete("sensitivity_overlay", "sensitivity_focus")
+        self.last_sensitivity = None
         for edge in self.edges:
             edge['current_flow'] = 0
             edge['remaining_capacity'] = edge['capacity']
             self.update_edge_display(edge)
-
-    def create_snapshot(self, filepath, highlight_path=None, show_initial_only=False):
-        if not PIL_AVAILABLE or not self.nodes: return
+        self.refresh_node_flows(rebuild=True)
+
+    def create_snapshot(self, filepath, highlight_path=None, show_initial_only=False, highlight_arcs=None):
+        """Guarda una imagen de la red.
+
+        ``highlight_path`` resalta los nodos (y los arcos entre nodos
+        consecutivos); ``highlight_arcs`` son pares (arco, es_inverso) como
+        los de ``render_highlight``: un arco inverso se dibuja al revés.
+        """
+        pil = load_pil()
+        if not pil or not self.nodes: return
+        Image, ImageDraw, ImageFont = pil
         scale = 4 
         margin = 100
         max_x = max(n['x'] for n in self.nodes) + margin
@@ -923,11 +1330,12 @@ class NetworkEditor:
             font = ImageFont.truetype("arial.ttf", 12 * scale)
             font_bold = ImageFont.truetype("arialbd.ttf", 12 * scale)
         except: font = font_bold = ImageFont.load_default()
+        highlighted = {id(edge): backward for edge, backward in highlight_arcs or ()}
         for edge in self.edges:
-            u = next(n for n in self.nodes if n['id'] == edge['u'])
-            v = next(n for n in self.nodes if n['id'] == edge['v'])
-            is_hl = False
-            if highlight_path:
+            u = self.node_by_id[edge['u']]
+            v = self.node_by_id[edge['v']]
+            is_hl = id(edge) in highlighted
+            if highlight_path and highlight_arcs is None:
                 for k in range(len(highlight_path)-1):
                     if highlight_path[k] == edge['u'] and highlight_path[k+1] == edge['v']: is_hl = True; break
             l_col = "#E67E22" if is_hl else "#2980B9"
@@ -939,9 +1347,12 @@ class NetworkEditor:
             ep = (ex - r * math.cos(ang), ey - r * math.sin(ang))
             draw.line([sp, ep], fill=l_col, width=l_wid)
             al, aa = 15 * scale, math.pi / 6
-            p1 = (ep[0] - al * math.cos(ang - aa), ep[1] - al * math.sin(ang - aa))
-            p2 = (ep[0] - al * math.cos(ang + aa), ep[1] - al * math.sin(ang + aa))
-            draw.polygon([ep, p1, p2], fill=l_col)
+            tip, head = ep, ang
+            if is_hl and highlighted.get(id(edge)):
+                tip, head = sp, ang + math.pi  # arco inverso (deshace flujo): flecha hacia el origen
+            p1 = (tip[0] - al * math.cos(head - aa), tip[1] - al * math.sin(head - aa))
+            p2 = (tip[0] - al * math.cos(head + aa), tip[1] - al * math.sin(head + aa))
+            draw.polygon([tip, p1, p2], fill=l_col)
             mx, my = (sp[0]+ep[0])/2, (sp[1]+ep[1])/2
             ox, oy = -20*scale*math.sin(ang), 20*scale*math.cos(ang)
             txt = str(edge['capacity']) if show_initial_only else f"{edge['current_flow']}/{edge['capacity']}"
@@ -966,6 +1377,8 @@ class NetworkEditor:
             draw.ellipse([nx-r, ny-r, nx+r, ny+r], fill=fill, outline=out, width=wid)
             t_col = "white" if node['type'] != 'transship' else "black"
             draw.text((nx, ny), str(node['label']), fill=t_col, font=font_bold, anchor="mm")
+            if node.get('capacity') is not None:
+                draw.text((nx, ny + 30 * scale), self.node_capacity_text(node), fill="#8E44AD", font=font, anchor="mm")
         try:
             bbox = img.getbbox()
             if bbox: img = img.crop((bbox[0]-50, bbox[1]-50, bbox[2]+50, bbox[3]+50))
@@ -973,11 +1386,11 @@ class NetworkEditor:
         except: pass
 
     # =========================================
-    #    FUNCIONALIDAD GLPK (sin cambios)
+    #    PROGRAMACIÓN LINEAL (BACKENDS GLPK / HiGHS)
     # =========================================
 
     def solve_with_glpk(self):
-        """Exporta y resuelve el problema con GLPK"""
+        """Resuelve el problema con el backend LP seleccionado (glpsol o en proceso)"""
         if self.source_node_id is None or self.sink_node_id is None:
             messagebox.showwarning("Error", "Define Fuente y Sumidero primero.")
             return
@@ -986,204 +1399,105 @@ class NetworkEditor:
             messagebox.showwarning("Error", "No hay arcos en la red.")
             return
 
-        # Primero verificar si GLPK está instalado
-        if not self.is_glpk_available():
-            self.show_glpk_installation_help()
-            return
+        backend = get_lp_backend(self.lp_backend_var.get())
 
-        # Crear archivo .mod para GLPK
-        mod_content = self.generate_glpk_model()
-        
-        # Preguntar donde guardar
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".mod",
-            filetypes=[("GLPK Model Files", "*.mod"), ("All files", "*.*")],
-            title="Guardar modelo GLPK"
-        )
-        
-        if not file_path:
+        # Verificar que el backend esté disponible (resultado cacheado)
+        if not backend.is_available():
+            if isinstance(backend, GlpsolBackend):
+                self.show_glpk_installation_help()
+            else:
+                messagebox.showwarning("Backend no disponible",
+                                       f"{backend.description} requiere scipy instalado.")
             return
+
+        network = self.build_flow_network()
+        key = cache_key(network, f"LP:{backend.name}")
+        cached = self.result_cache.get(key)
+
+        file_path = None
+        if backend.uses_model_file:
+            # Preguntar donde guardar (también con resultado en caché: escribir el modelo es barato)
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".mod",
+                filetypes=[("GLPK Model Files", "*.mod"), ("All files", "*.*")],
+                title="Guardar modelo GLPK"
+            )
+            
+            if not file_path:
+                return
         
         try:
-            # Guardar archivo .mod
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(mod_content)
-            
             self.log("\n" + "="*50)
-            self.log(" RESOLVIENDO CON GLPK")
+            self.log(f" RESOLVIENDO CON {backend.description.upper()}")
             self.log("="*50)
-            self.log(f"Archivo guardado: {file_path}")
             
-            # Intentar resolver con GLPK
-            result = self.run_glpk_solver(file_path)
+            if cached is not None:
+                self.log("♻️ Red sin cambios: resultado tomado de la caché")
+                result = cached
+                if file_path:
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        write_mathprog_model(network, f, solution_path_for(file_path))
+                    self.log(f"   (modelo escrito sin ejecutar {backend.name})")
+            else:
+                try:
+                    result = backend.solve(network, model_path=file_path, timeout=self.lp_timeout)
+                except LPSolverError as e:
+                    self.log(f"❌ {e}")
+                    result = None
+                if result:
+                    self.store_lp_result(key, result)
+            
+            if file_path:
+                self.log(f"Archivo guardado: {file_path}")
             
             if result:
-                self.log("✅ Solución óptima encontrada con GLPK")
-                self.log(f"📊 Flujo máximo (GLPK): {result['max_flow']}")
+                self.log(f"✅ Solución óptima encontrada con {backend.name}")
+                self.log(f"📊 Flujo máximo ({backend.name}): {result['max_flow']}")
                 self.log("\n🔍 Comparación:")
                 self.log(f"   Nuestro algoritmo: {self.total_max_flow}")
-                self.log(f"   GLPK (óptimo):     {result['max_flow']}")
+                self.log(f"   LP (óptimo):       {result['max_flow']}")
                 
                 if abs(self.total_max_flow - result['max_flow']) < 1e-6:
                     self.log("✅ ¡Nuestro algoritmo encontró el óptimo!")
                 else:
                     self.log("⚠️  Nuestro algoritmo no encontró el óptimo")
-                    algorithm = self.algo_var.get()
-                    if algorithm == "GREEDY":
+                    algorithm = self.running_algorithm or self.algo_var.get()
+                    if not get_solver(algorithm)['exact']:
                         self.log("   (esto es normal para Greedy, no siempre es óptimo)")
                     else:
                         self.log("   (revisa la implementación del algoritmo)")
                 
                 # Mostrar flujos por arco
-                self.log("\n📈 Flujos por arco (GLPK):")
+                self.log(f"\n📈 Flujos por arco ({backend.name}):")
                 for edge_data in result['flows']:
                     u_label = self.get_node_label(edge_data['from'])
                     v_label = self.get_node_label(edge_data['to'])
                     self.log(f"   {u_label} → {v_label}: {edge_data['flow']}/{edge_data['capacity']}")
+
+                # El LP solo da flujos por arco: las rutas salen de la descomposición
+                self.log_flow_decomposition(network, result['arc_flows'])
                     
             else:
-                self.log("❌ No se pudo resolver con GLPK")
-                self.log("💡 Puedes resolver manualmente con:")
-                self.log(f"   glpsol --math \"{file_path}\"")
+                self.log(f"❌ No se pudo resolver con {backend.name}")
+                if file_path:
+                    self.log("💡 Puedes resolver manualmente con:")
+                    self.log(f"   glpsol --math \"{file_path}\"")
                 
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo generar/resolver: {e}")
             self.log(f"❌ Error: {e}")
 
-    def generate_glpk_model(self):
-        """Genera el modelo MathProg para GLPK en el formato correcto"""
-        
-        # Mapear IDs a índices para GLPK
-        node_ids = sorted([node['id'] for node in self.nodes])
-        node_to_index = {node_id: i+1 for i, node_id in enumerate(node_ids)}
-        
-        source_idx = node_to_index[self.source_node_id]
-        sink_idx = node_to_index[self.sink_node_id]
-        
-        # Construir el modelo en el formato correcto
-        model = f"""/* --- SECCIÓN DEL MODELO --- */
-
-set NODES;
-param source, in NODES;
-param sink, in NODES;
-
-/* El set ARCS solo contiene pares (origen, destino) */
-set ARCS, within NODES cross NODES;
-
-/* La capacidad es un parámetro indexado por los arcos */
-param capacity{{ARCS}};
-
-/* Variables de flujo */
-var x{{(i,j) in ARCS}}, >= 0;
-
-/* Función objetivo: maximizar flujo saliente de la fuente */
-maximize flujo_max: sum{{(source,j) in ARCS}} x[source,j];
-
-/* Restricciones de conservación de flujo (todo lo que entra sale, excepto en fuente y sumidero) */
-s.t. conservacion{{i in NODES diff {{source, sink}}}}:
-   sum{{(j,i) in ARCS}} x[j,i] = sum{{(i,j) in ARCS}} x[i,j];
-
-/* Restricciones de capacidad */
-s.t. limite_cap{{(i,j) in ARCS}}: x[i,j] <= capacity[i,j];
-
-solve;
-
-/* --- REPORTE DE RESULTADOS --- */
-printf "\\n=== SOLUCIÓN ÓPTIMA GLPK ===\\n";
-printf "Flujo máximo total: %g\\n\\n", flujo_max;
-printf "Detalle de arcos utilizados:\\n";
-printf "%-10s %-10s %-10s %-10s\\n", "Desde", "Hasta", "Flujo", "Capacidad";
-printf "--------------------------------------------\\n";
-
-/* Iteramos sobre los arcos para imprimir solo los que tienen flujo > 0 */
-for {{(i,j) in ARCS: x[i,j] > 0}} {{
-    printf "%-10s %-10s %-10g %-10g\\n", i, j, x[i,j], capacity[i,j];
-}}
-
-printf "--------------------------------------------\\n";
-
-
-/* --- SECCIÓN DE DATOS --- */
-data;
-
-set NODES :="""
-        
-        # Agregar nodos
-        nodes_str = " ".join(str(node_to_index[node_id]) for node_id in node_ids)
-        model += f" {nodes_str};\n\n"
-        
-        model += f"param source := {source_idx};\n"
-        model += f"param sink := {sink_idx};\n\n"
-        
-        model += "/* Formato: Origen Destino Capacidad */\n"
-        model += "param : ARCS : capacity :=\n"
-        
-        # Agregar arcos
-        arcs_lines = []
-        for edge in self.edges:
-            from_idx = node_to_index[edge['u']]
-            to_idx = node_to_index[edge['v']]
-            arcs_lines.append(f"  {from_idx} {to_idx} {edge['capacity']}")
-        
-        model += "\n".join(arcs_lines) + "\n;\n\n"
-        
-        model += "end;"
-        
-        return model
-
-    def parse_glpk_output(self, output):
-        """Parsea la salida de GLPK para extraer resultados del nuevo formato"""
-        lines = output.split('\n')
-        max_flow = 0
-        flows = []
-        
-        in_flows_section = False
-        
-        for line in lines:
-            # Buscar flujo máximo en el nuevo formato
-            if 'Flujo máximo total:' in line:
-                try:
-                    parts = line.split(':')
-                    if len(parts) > 1:
-                        max_flow = float(parts[1].strip())
-                except:
-                    pass
-            
-            # Buscar sección de flujos en el nuevo formato
-            if 'Detalle de arcos utilizados:' in line:
-                in_flows_section = True
-                # Saltar las siguientes 3 líneas (encabezados y separador)
-                continue
-                
-            if in_flows_section and line.strip() and '---' not in line and 'Desde' not in line:
-                parts = line.split()
-                if len(parts) >= 4:
-                    try:
-                        from_node = int(parts[0])
-                        to_node = int(parts[1])
-                        flow = float(parts[2])
-                        capacity = float(parts[3])
-                        
-                        if flow > 0:
-                            flows.append({
-                                'from': from_node,
-                                'to': to_node,
-                                'flow': flow,
-                                'capacity': capacity
-                            })
-                    except:
-                        continue
-        
-        return {'max_flow': max_flow, 'flows': flows}
-
-    def is_glpk_available(self):
-        """Verifica si GLPK está instalado y disponible"""
+    def store_lp_result(self, key, result):
+        entry = {'max_flow': result['max_flow'], 'flows': result['flows'],
+                 'arc_flows': [float(f) for f in result['arc_flows']]}
         try:
-            result = subprocess.run(['glpsol', '--version'], 
-                                  capture_output=True, text=True, timeout=10)
-            return result.returncode == 0
-        except (subprocess.SubprocessError, FileNotFoundError, TimeoutError):
-            return False
+            self.result_cache.put(key, entry)
+        except OSError as e:
+            self.log(f"⚠️ No se pudo guardar la caché de resultados: {e}")
+
+    def build_flow_network(self):
+        """Crea la representación compacta (sin canvas) de la red actual"""
+        return FlowNetwork.from_editor(self.nodes, self.edges, self.source_node_id, self.sink_node_id)
 
     def show_glpk_installation_help(self):
         """Muestra ayuda para instalar GLPK"""
@@ -1223,8 +1537,6 @@ brew install glpk
             messagebox.showwarning("Error", "Define Fuente y Sumidero primero.")
             return
         
-        mod_content = self.generate_glpk_model()
-        
         file_path = filedialog.asksaveasfilename(
             defaultextension=".mod",
             filetypes=[("GLPK Model Files", "*.mod"), ("All files", "*.*")],
@@ -1233,8 +1545,9 @@ brew install glpk
         
         if file_path:
             try:
+                network = self.build_flow_network()
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(mod_content)
+                    write_mathprog_model(network, f, solution_path_for(file_path))
                 
                 self.log(f"\n💾 Modelo guardado: {file_path}")
                 self.log("🔧 Para resolver manualmente, ejecuta:")
@@ -1248,28 +1561,182 @@ brew install glpk
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo guardar: {e}")
 
-    def run_glpk_solver(self, mod_file):
-        """Ejecuta GLPK para resolver el modelo"""
+class IncidenceMatrixViewer:
+    """Ventana de la matriz de incidencia con desplazamiento virtual.
+
+    Solo se dibujan las filas (nodos) y columnas (arcos) que entran en el
+    canvas; las barras de desplazamiento mueven la primera fila/columna
+    visible y cada celda se consulta en O(1) a la matriz dispersa.
+
+    La ventana no es modal: muestra la red tal como estaba al abrirla
+    (matriz, capacidades y flujos), aunque después se editen los arcos.
+    """
+    CELL_W = 72
+    CELL_H = 22
+    HEADER_W = 110
+    HEADER_H = 40
+
+    def __init__(self, editor, matrix):
+        self.editor = editor
+        self.matrix = matrix
+        network = matrix.network
+        self.network = network
+        # Flujos del momento de abrir la ventana, alineados con los arcos de la matriz
+        self.flows = [edge['current_flow'] for edge in editor.edges]
+        # Columnas ordenadas por (desde, hasta) como en la tabla original
+        self.columns = sorted(range(matrix.num_cols), key=lambda a: (network.tails[a], network.heads[a]))
+        self.first_row = 0
+        self.first_col = 0
+
+        self.window = tk.Toplevel(editor.root)
+        self.window.title("Matriz de Incidencia y Capacidades")
+        self.window.geometry("800x600")
+
+        top = tk.Frame(self.window)
+        top.pack(fill=tk.X, padx=10, pady=(10, 0))
+        rows, cols = matrix.shape
+        tk.Label(top, text=f"{rows} nodos × {cols} arcos — {matrix.nnz} celdas no nulas   "
+                           f"(-1: sale del nodo, 1: llega al nodo; encabezado: flujo/capacidad)",
+                 font=("Arial", 9)).pack(side=tk.LEFT)
+        tk.Button(top, text="📋 Exportar Matriz",
+                  command=lambda: editor.export_incidence_matrix(matrix)).pack(side=tk.RIGHT)
+
+        grid = tk.Frame(self.window)
+        grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.vbar = tk.Scrollbar(grid, orient=tk.VERTICAL, command=self.scroll_rows)
+        self.vbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.hbar = tk.Scrollbar(grid, orient=tk.HORIZONTAL, command=self.scroll_cols)
+        self.hbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.canvas = tk.Canvas(grid, bg="white")
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda event: self.render())
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", lambda event: self.on_wheel(event, horizontal=True))
+        self.render()
+
+    def visible_size(self):
+        rows = max(1, (self.canvas.winfo_height() - self.HEADER_H) // self.CELL_H)
+        cols = max(1, (self.canvas.winfo_width() - self.HEADER_W) // self.CELL_W)
+        return rows, cols
+
+    @staticmethod
+    def scroll_target(args, first, page, total):
+        """Traduce un comando de Scrollbar (moveto/scroll) a la nueva primera posición"""
+        if args[0] == 'moveto':
+            first = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            first += int(args[1]) * (page if args[2] == 'pages' else 1)
+        return max(0, min(first, total - page))
+
+    def scroll_rows(self, *args):
+        page = self.visible_size()[0]
+        self.first_row = self.scroll_target(args, self.first_row, page, self.matrix.num_rows)
+        self.render()
+
+    def scroll_cols(self, *args):
+        page = self.visible_size()[1]
+        self.first_col = self.scroll_target(args, self.first_col, page, self.matrix.num_cols)
+        self.render()
+
+    def on_wheel(self, event, horizontal=False):
+        step = -3 if event.delta > 0 else 3
+        if horizontal:
+            self.scroll_cols('scroll', step, 'units')
+        else:
+            self.scroll_rows('scroll', step, 'units')
+
+    def render(self):
+        """Redibuja solo la porción visible de la matriz"""
+        canvas, network, matrix = self.canvas, self.network, self.matrix
+        canvas.delete("cell")
+        rows, cols = self.visible_size()
+        last_row = min(self.first_row + rows, matrix.num_rows)
+        last_col = min(self.first_col + cols, matrix.num_cols)
+        cw, ch, hw, hh = self.CELL_W, self.CELL_H, self.HEADER_W, self.HEADER_H
+        node_ids = network.node_ids
+
+        for k, a in enumerate(self.columns[self.first_col:last_col]):
+            x = hw + k * cw + cw / 2
+            arc = f"{network.get_label(node_ids[network.tails[a]])}→{network.get_label(node_ids[network.heads[a]])}"
+            canvas.create_text(x, hh / 2 - 8, text=arc, font=("Courier New", 9, "bold"), tags="cell")
+            canvas.create_text(x, hh / 2 + 8, text=f"{self.flows[a]}/{network.capacities[a]}",
+                               font=("Courier New", 8), fill="#7F8C8D", tags="cell")
+        for k, i in enumerate(range(self.first_row, last_row)):
+            y = hh + k * ch + ch / 2
+            node_id = node_ids[i]
+            kind = " (F)" if node_id == network.source else " (S)" if node_id == network.sink else ""
+            canvas.create_text(8, y, text=f"{network.get_label(node_id)}{kind}", anchor=tk.W,
+                               font=("Courier New", 9, "bold"), tags="cell")
+            for c, a in enumerate(self.columns[self.first_col:last_col]):
+                value = matrix.value(i, a)
+                canvas.create_text(hw + c * cw + cw / 2, y, text=str(value) if value else "·",
+                                   fill="#E74C3C" if value < 0 else "#27AE60" if value > 0 else "#BDC3C7",
+                                   font=("Courier New", 10), tags="cell")
+        canvas.create_line(hw - 4, 0, hw - 4, hh + (last_row - self.first_row) * ch, fill="#BDC3C7", tags="cell")
+        canvas.create_line(0, hh - 2, hw + (last_col - self.first_col) * cw, hh - 2, fill="#BDC3C7", tags="cell")
+
+        if matrix.num_rows:
+            self.vbar.set(self.first_row / matrix.num_rows, last_row / matrix.num_rows)
+        if matrix.num_cols:
+            self.hbar.set(self.first_col / matrix.num_cols, last_col / matrix.num_cols)
+
+
+class SensitivityViewer:
+    """Tabla de sensibilidad ordenada por pérdida; al elegir una fila se resalta el arco"""
+
+    def __init__(self, editor, report):
+        self.editor = editor
+        self.report = report
+        self.order = report.ranked()
+
+        self.window = tk.Toplevel(editor.root)
+        self.window.title("Sensibilidad de Arcos")
+        self.window.geometry("760x480")
+
+        top = tk.Frame(self.window)
+        top.pack(fill=tk.X, padx=10, pady=(10, 0))
+        tk.Label(top, text="\n".join(report.summary_lines()), justify=tk.LEFT,
+                 font=("Arial", 9)).pack(side=tk.LEFT)
+        tk.Button(top, text="📋 Exportar JSON", command=self.export).pack(side=tk.RIGHT)
+        tk.Label(self.window, text="Pérdida: cuánto baja el flujo si el arco falla | Baja/Sube: margen de "
+                                   "capacidad sin que cambie el flujo | Ganancia: con el arco ilimitado",
+                 font=("Arial", 8), fg="#7F8C8D").pack(fill=tk.X, padx=10)
+
+        lines = report.format_lines()
+        tk.Label(self.window, text=lines[0], font=("Courier New", 9, "bold"), anchor=tk.W).pack(fill=tk.X, padx=10)
+        frame = tk.Frame(self.window)
+        frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        bar = tk.Scrollbar(frame, orient=tk.VERTICAL)
+        bar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.rows = tk.Listbox(frame, font=("Courier New", 9), yscrollcommand=bar.set, activestyle="none")
+        self.rows.pack(fill=tk.BOTH, expand=True)
+        bar.config(command=self.rows.yview)
+        self.rows.insert(tk.END, *lines[1:])
+        self.rows.bind("<<ListboxSelect>>", self.on_select)
+        self.window.bind("<Destroy>", self.on_close)
+
+    def on_select(self, event):
+        selection = self.rows.curselection()
+        if selection:
+            self.editor.focus_sensitivity_element(self.order[selection[0]])
+
+    def on_close(self, event):
+        if event.widget is self.window:
+            self.editor.canvas.delete("sensitivity_focus")
+
+    def export(self):
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")],
+                                                 title="Exportar sensibilidad")
+        if not file_path:
+            return
         try:
-            # Ejecutar GLPK con timeout
-            cmd = ['glpsol', '--math', mod_file]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                self.log("✅ GLPK ejecutado correctamente")
-                return self.parse_glpk_output(result.stdout)
-            else:
-                self.log(f"❌ Error ejecutando GLPK (código: {result.returncode})")
-                if result.stderr:
-                    self.log(f"   Error: {result.stderr.strip()}")
-                return None
-                
-        except subprocess.TimeoutExpired:
-            self.log("❌ GLPK tardó demasiado tiempo (timeout)")
-            return None
-        except Exception as e:
-            self.log(f"❌ Error ejecutando GLPK: {e}")
-            return None
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report.to_dict(), f, indent=4)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo guardar: {e}")
+            return
+        self.editor.log(f"📋 Sensibilidad exportada a {os.path.basename(file_path)}")
+
 
 if __name__ == '__main__':
     root = tk.Tk()
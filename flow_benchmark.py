@@ -0,0 +1,204 @@
+"""Pruebas de rendimiento de los algoritmos registrados en ``SOLVERS``.
+
+Para cada generador y tamaño se arma una instancia con semilla fija y se
+corre cada algoritmo dos veces: una para medir tiempo (sin trazas) y otra
+con ``tracemalloc`` para el pico de memoria. Los resultados se guardan en
+JSON para comparar versiones con ``compare_benchmarks``.
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from flow_engine import AUTO_SOLVER, SOLVERS, ResidualGraph, choose_solver, solve_steps
+from network_generators import GENERATORS, generate_network
+from solver_stats import SolverStats
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+# Arranque en frío: segundos máximos para importar cada módulo en un intérprete nuevo
+STARTUP_BUDGETS = {'flow_engine': 0.02, 'flow_cli': 0.06, 'Def3': 0.1}
+# Módulos de interfaz que el motor y la CLI no deben cargar
+GUI_MODULES = ('tkinter', 'PIL', 'numpy')
+GUI_FREE = ('flow_engine', 'flow_cli')
+
+
+def run_solver(network, algorithm, time_limit=None):
+    """Resuelve contando aumentos, nodos visitados y arcos examinados.
+
+    Corta si se supera ``time_limit`` segundos.
+    """
+    start = time.perf_counter()
+    stats = SolverStats()
+    res = ResidualGraph(network, stats)
+    total = 0
+    augmentations = 0
+    status = 'ok'
+    for _, amount in solve_steps(res, algorithm):
+        total += amount
+        augmentations += 1
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            status = 'timeout'
+            break
+    return {'max_flow': total, 'augmentations': augmentations,
+            'node_visits': stats.counters['node_visits'], 'arc_scans': stats.counters['arc_scans'],
+            'seconds': time.perf_counter() - start, 'status': status}
+
+
+def measure_peak_memory(network, algorithm, time_limit=None):
+    """Pico de memoria (KiB) asignado durante la resolución"""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        run_solver(network, algorithm, time_limit)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmarks(generators=None, sizes=DEFAULT_SIZES, algorithms=None, seed=0,
+                   time_limit=30.0, measure_memory=True, progress=None):
+    """Corre todos los algoritmos sobre todas las instancias.
+
+    Un algoritmo que supera ``time_limit`` en un tamaño no se prueba en los
+    tamaños siguientes del mismo generador (quedan como 'skipped').
+    """
+    import platform
+    generators = list(generators or GENERATORS)
+    algorithms = list(algorithms or SOLVERS)
+    rows = []
+    for name in generators:
+        timed_out = set()
+        for size in sizes:
+            network = generate_network(name, size, seed)
+            for algorithm in algorithms:
+                row = {'generator': name, 'size': size, 'seed': seed, 'nodes': network.num_nodes,
+                       'arcs': network.num_arcs, 'algorithm': algorithm, 'max_flow': None,
+                       'augmentations': None, 'node_visits': None, 'arc_scans': None, 'seconds': None,
+                       'peak_memory_kb': None, 'status': 'skipped'}
+                if algorithm == AUTO_SOLVER:
+                    row['chosen'] = choose_solver(network)[0]
+                if algorithm not in timed_out:
+                    row.update(run_solver(network, algorithm, time_limit))
+                    if row['status'] == 'timeout':
+                        timed_out.add(algorithm)
+                    elif measure_memory:
+                        row['peak_memory_kb'] = round(measure_peak_memory(network, algorithm, time_limit), 1)
+                rows.append(row)
+                if progress:
+                    progress(row)
+    return {'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'seed': seed, 'time_limit': time_limit, 'results': rows}
+
+
+def measure_startup(module, runs=5):
+    """Importa ``module`` en ``runs`` intérpretes nuevos.
+
+    Devuelve el menor tiempo de importación (segundos) y los módulos de
+    ``GUI_MODULES`` que quedaron cargados.
+    """
+    import subprocess
+    code = ("import sys, time; start = time.perf_counter(); import {}; "
+            "print(time.perf_counter() - start); print(' '.join(m for m in {!r} if m in sys.modules))"
+            ).format(module, GUI_MODULES)
+    here = os.path.dirname(os.path.abspath(__file__))
+    best, loaded = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        seconds, modules = (out.stdout.splitlines() + [""])[:2]
+        best = float(seconds) if best is None else min(best, float(seconds))
+        loaded = modules.split()
+    return best, loaded
+
+
+def check_startup(budgets=None, runs=5):
+    """Mide el arranque de cada módulo contra su presupuesto.
+
+    Devuelve las líneas del reporte y si todo está dentro del presupuesto
+    (y los módulos de ``GUI_FREE`` no cargaron la interfaz).
+    """
+    import subprocess
+    lines, ok = [], True
+    for module, budget in (budgets or STARTUP_BUDGETS).items():
+        try:
+            seconds, loaded = measure_startup(module, runs)
+        except subprocess.CalledProcessError as e:
+            lines.append(f" ❌ {module}: no se pudo importar ({e.stderr.strip().splitlines()[-1:]})")
+            ok = False
+            continue
+        problems = []
+        if seconds > budget:
+            problems.append("supera el presupuesto")
+        if module in GUI_FREE and loaded:
+            problems.append("carga " + ", ".join(loaded))
+        ok = ok and not problems
+        lines.append(f" {'❌' if problems else '✅'} {module:12} {seconds * 1000:7.1f} ms "
+                     f"(presupuesto {budget * 1000:.0f} ms) {'; '.join(problems)}")
+    return lines, ok
+
+
+def save_benchmarks(report, file_path):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+
+
+def load_benchmarks(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def format_benchmark_row(row):
+    if row['status'] == 'skipped':
+        return f"{row['generator']:14} {row['size']:>7} {row['algorithm']:20} (omitido)"
+    memory = f"{row['peak_memory_kb']:>10.1f} KiB" if row['peak_memory_kb'] is not None else " " * 14
+    return (f"{row['generator']:14} {row['size']:>7} {row['algorithm']:20} "
+            f"flujo={row['max_flow']:<10} aumentos={row['augmentations']:<7} "
+            f"{row['seconds']:9.4f} s {memory} {'' if row['status'] == 'ok' else row['status']}")
+
+
+def auto_choice_lines(report):
+    """Para cada instancia, el tiempo de AUTO (elección incluida) frente al más rápido medido.
+
+    Sirve para recalibrar los umbrales de ``flow_engine.choose_solver``.
+    """
+    instances = {}
+    for row in report['results']:
+        instances.setdefault((row['generator'], row['size']), []).append(row)
+    lines = []
+    for (generator, size), rows in instances.items():
+        auto = next((r for r in rows if r['algorithm'] == AUTO_SOLVER), None)
+        timed = [r for r in rows if r['algorithm'] != AUTO_SOLVER and r['status'] == 'ok']
+        if auto is None or not timed:
+            continue
+        best = min(timed, key=lambda r: r['seconds'])
+        label = f"{generator:14} {size:>7} AUTO → {auto.get('chosen') or '?':18}"
+        if auto['status'] != 'ok':
+            lines.append(f" ⚠️ {label} {auto['status']} | más rápido {best['algorithm']} {best['seconds']:.4f} s")
+            continue
+        ratio = auto['seconds'] / best['seconds'] if best['seconds'] > 0 else 1.0
+        lines.append(f" {'✅' if ratio <= 1.5 else '⚠️'} {label} {auto['seconds']:.4f} s | "
+                     f"más rápido {best['algorithm']:18} {best['seconds']:.4f} s (x{ratio:.2f})")
+    return lines
+
+
+def compare_benchmarks(previous, current, threshold=1.25):
+    """Compara dos reportes y devuelve las líneas de las filas más lentas.
+
+    Se marca como regresión toda fila cuyo tiempo crece más de ``threshold``
+    veces o cuyo flujo máximo cambió respecto del reporte anterior.
+    """
+    key = lambda r: (r['generator'], r['size'], r['seed'], r['algorithm'])
+    before = {key(r): r for r in previous['results']}
+    lines = []
+    for row in current['results']:
+        old = before.get(key(row))
+        if old is None or row['seconds'] is None or old['seconds'] is None:
+            continue
+        ratio = row['seconds'] / old['seconds'] if old['seconds'] > 0 else float('inf')
+        if row['max_flow'] != old['max_flow']:
+            lines.append(f" ❌ {key(row)}: flujo {old['max_flow']} → {row['max_flow']}")
+        elif ratio > threshold:
+            lines.append(f" ⚠️ {key(row)}: {old['seconds']:.4f} s → {row['seconds']:.4f} s (x{ratio:.2f})")
+    return lines
@@ -0,0 +1,256 @@
+"""Uso del motor de flujo desde la línea de comandos (sin interfaz gráfica).
+
+Ejemplos:
+    python flow_cli.py solve proyecto.json --algorithm EDMONDS_KARP_BFS
+    python flow_cli.py verify proyectos/ --backend glpsol --workers 8
+    python flow_cli.py startup
+    python flow_cli.py serve --port 8765
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+from flow_benchmark import (DEFAULT_SIZES, auto_choice_lines, check_startup, compare_benchmarks,
+                            format_benchmark_row, load_benchmarks, run_benchmarks, save_benchmarks)
+from flow_engine import (AUTO_SOLVER, SOLVERS, decompose_flow, format_statistics, get_solver, max_flow,
+                         network_statistics)
+from flow_reduction import max_flow_reduced
+from flow_sensitivity import arc_sensitivity
+from graph_layout import LAYOUTS, apply_layout
+from network_generators import GENERATORS
+from lp_backends import LP_BACKENDS, LPSolverError, format_verification_report, verify_projects
+from project_io import PROJECT_EXTENSIONS, load_project_network, save_project
+from result_cache import CACHE_SUFFIX
+from solver_stats import Profiler, SolverStats
+
+
+def expand_project_paths(paths):
+    """Expande carpetas a los proyectos que contienen.
+
+    Se toman todos los formatos que abre ``load_project_network`` (JSON,
+    binario, DIMACS y CSV), sin las cachés de resultados.
+    """
+    result = []
+    for path in paths:
+        if os.path.isdir(path):
+            result.extend(sorted(p for p in glob.glob(os.path.join(path, "*"))
+                                 if os.path.splitext(p)[1].lower() in PROJECT_EXTENSIONS
+                                 and not p.endswith(CACHE_SUFFIX)))
+        else:
+            result.append(path)
+    return result
+
+
+def cmd_solve(args):
+    network = load_project_network(args.project)
+    if network.source is None or network.sink is None:
+        print("El proyecto no define fuente y sumidero.", file=sys.stderr)
+        return 2
+    stats = SolverStats() if args.stats else None
+    vectorize = False if args.no_numpy else None
+    profiler = Profiler() if args.profile else None
+    solve = max_flow_reduced if args.reduce else max_flow
+    if profiler:
+        with profiler:
+            result = solve(network, args.algorithm, stats, vectorize)
+    else:
+        result = solve(network, args.algorithm, stats, vectorize)
+    print(f"Red: {network.num_nodes} nodos, {network.num_arcs} arcos")
+    if args.reduce:
+        print("Red reducida:")
+        for line in result['reduction'].summary_lines():
+            print(f"  {line}")
+    if args.algorithm == AUTO_SOLVER:
+        solved = result['reduction'].network if args.reduce else network
+        print(f"Estadísticas: {format_statistics(network_statistics(solved))}")
+        print(f"Algoritmo: AUTO → {result['algorithm']} ({result['reason']})")
+    else:
+        print(f"Algoritmo: {args.algorithm}")
+    if args.routes:
+        for i, (path, flow) in enumerate(result['routes'], 1):
+            print(f"Ruta {i} : {' → '.join(network.get_label(nid) for nid in path)} = {flow}")
+    print(f"FLUJO MÁXIMO TOTAL: {result['max_flow']}")
+    if args.decompose:
+        decomposition = decompose_flow(network, result['arc_flows'])
+        if args.decompose == "-":
+            for i, (path, flow) in enumerate(decomposition['paths'], 1):
+                print(f"Camino {i} : {' → '.join(network.get_label(nid) for nid in path)} = {flow}")
+            for i, (cycle, flow) in enumerate(decomposition['cycles'], 1):
+                print(f"Ciclo {i} : {' → '.join(network.get_label(nid) for nid in cycle)} = {flow}")
+        else:
+            with open(args.decompose, 'w', encoding='utf-8') as f:
+                json.dump({'paths': [{'nodes': p, 'flow': fl} for p, fl in decomposition['paths']],
+                           'cycles': [{'nodes': c, 'flow': fl} for c, fl in decomposition['cycles']]}, f, indent=4)
+    cut = result['min_cut']
+    certified = cut.verify(result['max_flow'])
+    nodes = ""
+    if cut.cut_nodes:
+        nodes = ", ".join(f"{network.get_label(nid)} (cap {c})" for nid, c in cut.cut_node_list())
+        nodes = f", {len(cut.cut_nodes)} nodos: {nodes}"
+    print(f"Corte mínimo: {cut.capacity} ({len(cut.cut_arcs)} arcos{nodes}) — "
+          f"{'óptimo certificado' if certified else 'no certifica el óptimo'}")
+    if args.cut:
+        with open(args.cut, 'w', encoding='utf-8') as f:
+            json.dump(cut.to_dict(), f, indent=4)
+    if args.sensitivity:
+        try:
+            report = arc_sensitivity(network, result['arc_flows'])
+        except ValueError as e:
+            print(f"Sensibilidad: {e}", file=sys.stderr)
+        else:
+            if args.sensitivity == "-":
+                print("\n".join(report.summary_lines() + report.format_lines()))
+            else:
+                print("\n".join(report.summary_lines()))
+                with open(args.sensitivity, 'w', encoding='utf-8') as f:
+                    json.dump(report.to_dict(), f, indent=4)
+    if stats:
+        print("\n".join(stats.format_lines()))
+    if profiler:
+        print("\n".join(profiler.format_lines()))
+    return 0 if certified or not get_solver(args.algorithm)['exact'] else 1
+
+
+def cmd_verify(args):
+    paths = expand_project_paths(args.projects)
+    if not paths:
+        print("No se encontraron proyectos.", file=sys.stderr)
+        return 2
+    try:
+        rows = verify_projects(paths, args.backend, args.algorithm,
+                               max_workers=args.workers, timeout=args.timeout)
+    except LPSolverError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(format_verification_report(rows))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=4)
+    return 0 if all(r['status'] == 'ok' for r in rows) else 1
+
+
+def cmd_convert(args):
+    network = load_project_network(args.source)
+    if args.layout:
+        apply_layout(network, args.layout)
+    save_project(network, args.target)
+    print(f"{args.source} → {args.target}: {network.num_nodes} nodos, {network.num_arcs} arcos")
+    return 0
+
+
+def cmd_benchmark(args):
+    report = run_benchmarks(args.generators, args.sizes, args.algorithms, seed=args.seed,
+                            time_limit=args.time_limit, measure_memory=not args.no_memory,
+                            progress=lambda row: print(format_benchmark_row(row), flush=True))
+    if args.output:
+        save_benchmarks(report, args.output)
+    choices = auto_choice_lines(report)
+    if choices:
+        print("\nAUTO frente al más rápido:")
+        for line in choices:
+            print(line)
+    if args.compare:
+        regressions = compare_benchmarks(load_benchmarks(args.compare), report)
+        print(f"\nComparación con {args.compare}: {len(regressions)} regresiones")
+        for line in regressions:
+            print(line)
+        return 1 if regressions else 0
+    return 0
+
+
+def cmd_startup(args):
+    lines, ok = check_startup(runs=args.runs)
+    print("Arranque en frío (importación en un intérprete nuevo, mejor de "
+          f"{args.runs}):")
+    for line in lines:
+        print(line)
+    return 0 if ok else 1
+
+
+def cmd_serve(args):
+    # asyncio y el pool de procesos solo se importan si se pide el servicio
+    import asyncio
+    from flow_service import serve
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.threads,
+                          ready=lambda where: print(f"Servicio de flujo escuchando en {where}", flush=True)))
+    except KeyboardInterrupt:
+        pass
+    except (ValueError, OSError) as e:
+        print(f"No se pudo iniciar el servicio: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Motor de redes de flujo sin interfaz gráfica")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    solve = sub.add_parser("solve", help="Resuelve un proyecto sin abrir el editor")
+    solve.add_argument("project", help="Archivo de proyecto")
+    solve.add_argument("--algorithm", default="EDMONDS_KARP_BFS", choices=list(SOLVERS))
+    solve.add_argument("--routes", action="store_true", help="Muestra las rutas encontradas")
+    solve.add_argument("--cut", help="Guarda el corte mínimo (lados S/T y arcos) en JSON")
+    solve.add_argument("--decompose", nargs="?", const="-", metavar="ARCHIVO",
+                       help="Descompone el flujo en caminos y ciclos (en pantalla o en un JSON)")
+    solve.add_argument("--sensitivity", nargs="?", const="-", metavar="ARCHIVO",
+                       help="Pérdida si falla cada arco, márgenes de capacidad y arcos en los cortes mínimos "
+                            "(en pantalla o en un JSON)")
+    solve.add_argument("--stats", action="store_true",
+                       help="Muestra contadores (búsquedas, nodos visitados, arcos examinados) y tiempos por fase")
+    solve.add_argument("--profile", action="store_true", help="Perfila con cProfile y tracemalloc")
+    solve.add_argument("--no-numpy", action="store_true",
+                       help="BFS en Python puro aunque NumPy esté instalado y la red sea grande")
+    solve.add_argument("--reduce", action="store_true",
+                       help="Poda la red, funde arcos paralelos y contrae cadenas en serie antes de resolver")
+    solve.set_defaults(func=cmd_solve)
+
+    verify = sub.add_parser("verify", help="Compara el algoritmo propio con GLPK/LP en un lote de proyectos")
+    verify.add_argument("projects", nargs="+", help="Proyectos (.json, .rdfb, DIMACS, .csv) o carpetas")
+    verify.add_argument("--algorithm", default="EDMONDS_KARP_BFS", choices=list(SOLVERS))
+    verify.add_argument("--backend", default="glpsol", choices=list(LP_BACKENDS))
+    verify.add_argument("--workers", type=int, default=None, help="Subprocesos simultáneos (por defecto: CPUs)")
+    verify.add_argument("--timeout", type=float, default=None, help="Segundos máximos por modelo")
+    verify.add_argument("--report", help="Guarda el reporte completo en JSON")
+    verify.set_defaults(func=cmd_verify)
+
+    convert = sub.add_parser("convert", help="Convierte entre JSON, binario (.rdfb), DIMACS (.max) y CSV")
+    convert.add_argument("source", help="Archivo de entrada")
+    convert.add_argument("target", help="Archivo de salida (el formato se elige por extensión)")
+    convert.add_argument("--layout", choices=list(LAYOUTS), help="Recalcula las posiciones de los nodos")
+    convert.set_defaults(func=cmd_convert)
+
+    bench = sub.add_parser("benchmark", help="Mide los algoritmos sobre redes sintéticas")
+    bench.add_argument("--generators", nargs="+", choices=list(GENERATORS), help="Por defecto: todos")
+    bench.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Nodos aproximados")
+    bench.add_argument("--algorithms", nargs="+", choices=list(SOLVERS), help="Por defecto: todos")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--time-limit", type=float, default=30.0, help="Segundos máximos por ejecución")
+    bench.add_argument("--no-memory", action="store_true", help="No mide el pico de memoria (más rápido)")
+    bench.add_argument("--output", help="Guarda los resultados en JSON")
+    bench.add_argument("--compare", help="Reporte JSON anterior contra el que buscar regresiones")
+    bench.set_defaults(func=cmd_benchmark)
+
+    startup = sub.add_parser("startup", help="Mide el arranque en frío del motor, la CLI y el editor")
+    startup.add_argument("--runs", type=int, default=5, help="Intérpretes nuevos por módulo (se toma el mejor)")
+    startup.set_defaults(func=cmd_startup)
+
+    serve = sub.add_parser("serve", help="Servicio local JSON/HTTP que resuelve redes enviadas por otros programas")
+    serve.add_argument("--host", default="127.0.0.1", help="Solo direcciones locales")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--unix", metavar="RUTA", help="Escucha en un socket Unix en lugar de TCP")
+    serve.add_argument("--workers", type=int, default=None, help="Procesos de resolución (por defecto: CPUs)")
+    serve.add_argument("--threads", action="store_true", help="Usa hilos en lugar de procesos")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1478 @@
+"""Modelo compacto de redes de flujo, independiente de la interfaz gráfica.
+
+Este módulo no importa tkinter ni PIL: puede usarse desde scripts, desde la
+línea de comandos o desde los backends de programación lineal.
+"""
+import time
+from array import array
+from collections import deque
+
+# Tolerancia relativa para flujos float que llegan de afuera (LP, red
+# reducida): un residual de unos ulps se toma como arco saturado
+FLOW_TOLERANCE = 1e-9
+
+
+def as_sequence(values):
+    """Conserva listas, arrays y vistas de memoria (sin copiar); materializa iteradores"""
+    if isinstance(values, (list, array, memoryview)) or hasattr(values, '__array__'):
+        return values
+    return list(values)
+
+
+class FlowNetwork:
+    """Red de flujo guardada como arreglos paralelos de arcos.
+
+    Los nodos se identifican internamente por su índice (0..n-1) dentro de
+    ``node_ids``; el arco ``a`` va de ``tails[a]`` a ``heads[a]`` con
+    capacidad ``capacities[a]``. El orden de los arcos es el mismo que el de
+    la lista de arcos de la que se construyó la red.
+
+    Los arreglos de arcos pueden ser listas, ``array`` o vistas de memoria
+    (por ejemplo de un archivo binario mapeado con mmap); no se copian.
+
+    ``node_capacities`` (opcional, alineado con los nodos) limita el flujo
+    que atraviesa cada nodo; None en una posición significa sin límite.
+    Para la fuente y el sumidero limita lo que envían y reciben.
+    """
+
+    def __init__(self, node_ids, tails, heads, capacities, source=None, sink=None, labels=None,
+                 xs=None, ys=None, node_types=None, node_counter=None, flows=None, node_capacities=None):
+        self.node_ids = list(node_ids)
+        self.index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.tails = as_sequence(tails)
+        self.heads = as_sequence(heads)
+        self.capacities = as_sequence(capacities)
+        self.source = source  # ID del nodo fuente (no índice)
+        self.sink = sink      # ID del nodo sumidero (no índice)
+        self.labels = labels if labels is not None else {}
+        # Datos de dibujo opcionales, alineados con los índices de nodo
+        self.xs = xs
+        self.ys = ys
+        self.node_types = node_types
+        self.node_counter = node_counter
+        self.flows = flows  # flujo guardado por arco (opcional)
+        self.node_capacities = node_capacities
+
+    @classmethod
+    def from_editor(cls, nodes, edges, source_id=None, sink_id=None):
+        """Construye la red a partir de las listas de nodos y arcos del editor"""
+        nodes = sorted(nodes, key=lambda node: node['id'])
+        node_ids = [node['id'] for node in nodes]
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        tails = [index[edge['u']] for edge in edges]
+        heads = [index[edge['v']] for edge in edges]
+        capacities = [edge['capacity'] for edge in edges]
+        labels = {node['id']: node['label'] for node in nodes}
+        node_capacities = [node.get('capacity') for node in nodes]
+        return cls(node_ids, tails, heads, capacities, source_id, sink_id, labels,
+                   xs=[node.get('x', 0) for node in nodes], ys=[node.get('y', 0) for node in nodes],
+                   node_types=[node.get('type', 'transship') for node in nodes],
+                   node_capacities=node_capacities if any(c is not None for c in node_capacities) else None)
+
+    @property
+    def num_nodes(self):
+        return len(self.node_ids)
+
+    @property
+    def num_arcs(self):
+        return len(self.tails)
+
+    @property
+    def source_index(self):
+        return self.index[self.source]
+
+    @property
+    def sink_index(self):
+        return self.index[self.sink]
+
+    def get_label(self, node_id):
+        return str(self.labels.get(node_id, node_id))
+
+    def limited_nodes(self):
+        """Índices de los nodos con capacidad propia"""
+        if self.node_capacities is None:
+            return []
+        return [i for i, c in enumerate(self.node_capacities) if c is not None]
+
+    def arcs_by_node(self):
+        """Agrupa los índices de arco por nodo de salida y por nodo de llegada.
+
+        Usa ordenamiento por conteo (O(V+E)). Devuelve
+        ``(out_start, out_arcs, in_start, in_arcs)``: los arcos que salen del
+        nodo ``i`` son ``out_arcs[out_start[i]:out_start[i+1]]`` (idem entrada).
+        """
+        n = self.num_nodes
+        out_start = array('l', [0]) * (n + 1)
+        in_start = array('l', [0]) * (n + 1)
+        for u in self.tails:
+            out_start[u + 1] += 1
+        for v in self.heads:
+            in_start[v + 1] += 1
+        for i in range(n):
+            out_start[i + 1] += out_start[i]
+            in_start[i + 1] += in_start[i]
+        out_arcs = array('l', [0]) * self.num_arcs
+        in_arcs = array('l', [0]) * self.num_arcs
+        out_pos = out_start[:-1]
+        in_pos = in_start[:-1]
+        for a in range(self.num_arcs):
+            u, v = self.tails[a], self.heads[a]
+            out_arcs[out_pos[u]] = a
+            out_pos[u] += 1
+            in_arcs[in_pos[v]] = a
+            in_pos[v] += 1
+        return out_start, out_arcs, in_start, in_arcs
+
+    def incidence_matrix(self):
+        """Matriz de incidencia nodo×arco dispersa (ver ``IncidenceMatrix``)"""
+        return IncidenceMatrix(self)
+
+
+class IncidenceMatrix:
+    """Matriz de incidencia nodo×arco en formato disperso.
+
+    Convención: -1 en el nodo de salida y 1 en el de llegada de cada arco.
+    Las columnas son los arcos en el orden de la red. No se guarda ninguna
+    celda nula: la vista COO sale directo de ``tails``/``heads`` y la CSR
+    (por filas) se arma bajo demanda con un ordenamiento por conteo.
+    """
+
+    def __init__(self, network):
+        self.network = network
+        self.num_rows = network.num_nodes
+        self.num_cols = network.num_arcs
+        self._csr = None
+
+    @property
+    def shape(self):
+        return self.num_rows, self.num_cols
+
+    @property
+    def nnz(self):
+        return 2 * self.num_cols
+
+    def value(self, row, col):
+        """Celda (nodo, arco) en O(1), para vistas que solo muestran una parte"""
+        if self.network.tails[col] == row:
+            return -1
+        if self.network.heads[col] == row:
+            return 1
+        return 0
+
+    def coo(self):
+        """Devuelve (filas, columnas, valores) como arreglos de igual largo"""
+        m = self.num_cols
+        rows = array('q', self.network.tails)
+        rows.extend(self.network.heads)
+        cols = array('q', range(m)) * 2
+        vals = array('b', [-1]) * m + array('b', [1]) * m
+        return rows, cols, vals
+
+    def csr(self):
+        """Devuelve (row_start, cols, vals): la fila i es ``[row_start[i]:row_start[i+1]]``"""
+        if self._csr is None:
+            n, m = self.num_rows, self.num_cols
+            tails, heads = self.network.tails, self.network.heads
+            row_start = array('l', [0]) * (n + 1)
+            for a in range(m):
+                row_start[tails[a] + 1] += 1
+                row_start[heads[a] + 1] += 1
+            for i in range(n):
+                row_start[i + 1] += row_start[i]
+            cols = array('l', [0]) * (2 * m)
+            vals = array('b', [0]) * (2 * m)
+            pos = row_start[:-1]
+            # Recorrer los arcos en orden deja cada fila ordenada por columna
+            for a in range(m):
+                for row, value in ((tails[a], -1), (heads[a], 1)):
+                    cols[pos[row]] = a
+                    vals[pos[row]] = value
+                    pos[row] += 1
+            self._csr = (row_start, cols, vals)
+        return self._csr
+
+    def row(self, i):
+        """Pares (arco, valor) no nulos de la fila del nodo de índice ``i``"""
+        row_start, cols, vals = self.csr()
+        return list(zip(cols[row_start[i]:row_start[i + 1]], vals[row_start[i]:row_start[i + 1]]))
+
+    def iter_triplets(self):
+        """Genera (fila, columna, valor) recorriendo las filas en orden"""
+        row_start, cols, vals = self.csr()
+        for i in range(self.num_rows):
+            for k in range(row_start[i], row_start[i + 1]):
+                yield i, cols[k], vals[k]
+
+    def to_scipy(self):
+        """Convierte a ``scipy.sparse.csr_matrix`` (requiere scipy)"""
+        from scipy.sparse import csr_matrix
+        row_start, cols, vals = self.csr()
+        return csr_matrix((vals, cols, row_start), shape=self.shape)
+
+
+# =========================================
+#    GRAFO RESIDUAL
+# =========================================
+
+def saturated(capacity, flow):
+    """Residual ``capacity - flow``, en 0 si con floats solo difieren en unos ulps"""
+    residual = capacity - flow
+    if isinstance(residual, float) and abs(residual) <= FLOW_TOLERANCE * abs(capacity):
+        return 0.0
+    return residual
+
+
+class ResidualGraph:
+    """Grafo residual en formato CSR.
+
+    El arco ``a`` de la red genera dos arcos residuales: ``2a`` (directo,
+    capacidad residual inicial = capacidad) y ``2a+1`` (inverso, inicial 0).
+    Por eso ``r ^ 1`` es siempre el arco gemelo de ``r`` y el flujo del arco
+    ``a`` es la capacidad residual de ``2a+1``.
+
+    Los nodos con capacidad propia se dividen implícitamente: el nodo ``v``
+    (su mitad de entrada) se une con un arco interno de capacidad
+    ``node_capacities[v]`` a un índice nuevo ``n + j`` (su mitad de salida),
+    del que parten sus arcos. En el sumidero es al revés: sus arcos de
+    entrada llegan a ``n + j`` y el arco interno va de ahí al sumidero. Los
+    arcos internos son los arcos ``m + j``, después de los de la red, y los
+    nodos nuevos existen solo en estos arreglos; ``node_of`` da el nodo de
+    la red de cada índice.
+
+    ``stats`` es un ``solver_stats.SolverStats`` opcional que las búsquedas
+    y los aumentos van llenando. ``vectorize`` elige los BFS con NumPy
+    (``VectorResidual``): None los activa si NumPy está instalado y la red
+    tiene al menos ``VECTOR_MIN_ARCS`` arcos, y los abandona si las
+    fronteras del BFS resultan angostas. La copia NumPy se arma recién en
+    el primer BFS que la pide (``bfs_vector``), así que los algoritmos sin
+    BFS no la pagan.
+    """
+
+    def __init__(self, network, stats=None, vectorize=None):
+        start = time.perf_counter()
+        self.network = network
+        self.stats = stats
+        n, m = network.num_nodes, network.num_arcs
+        self.num_arcs = m
+        self.limited = network.limited_nodes()
+        k = len(self.limited)
+        self.num_nodes = n + k
+        self.head = array('l', [0]) * (2 * (m + k))
+        self.residual = [0] * (2 * (m + k))
+        if k:
+            self.split_nodes(network)
+        else:
+            self.node_of = None
+            for a in range(m):
+                self.head[2 * a] = network.heads[a]
+                self.head[2 * a + 1] = network.tails[a]
+                self.residual[2 * a] = network.capacities[a]
+
+        # Adyacencia CSR: arcos residuales agrupados por nodo de salida
+        total = 2 * (m + k)
+        n = self.num_nodes
+        self.adj_start = array('l', [0]) * (n + 1)
+        for r in range(total):
+            self.adj_start[self.head[r ^ 1] + 1] += 1
+        for i in range(n):
+            self.adj_start[i + 1] += self.adj_start[i]
+        self.adj = array('l', [0]) * total
+        pos = self.adj_start[:-1]
+        for r in range(total):
+            u = self.head[r ^ 1]
+            self.adj[pos[u]] = r
+            pos[u] += 1
+        self.vector = None
+        self.vector_pending = bool(vectorize or (vectorize is None and m >= VECTOR_MIN_ARCS))
+        self.vector_adaptive = not vectorize
+        if stats is not None:
+            stats.add_time('residual', time.perf_counter() - start)
+
+    def split_nodes(self, network):
+        """Arreglos con los nodos limitados divididos (ver la clase)"""
+        n, m = network.num_nodes, network.num_arcs
+        t = network.sink_index if network.sink in network.index else -1
+        out_half = array('l', range(n))
+        in_half = array('l', range(n))
+        self.node_of = array('l', range(n))
+        for j, v in enumerate(self.limited):
+            if v == t:
+                in_half[v] = n + j
+            else:
+                out_half[v] = n + j
+            self.node_of.append(v)
+        head, residual = self.head, self.residual
+        tails, heads, capacities = network.tails, network.heads, network.capacities
+        for a in range(m):
+            head[2 * a] = in_half[heads[a]]
+            head[2 * a + 1] = out_half[tails[a]]
+            residual[2 * a] = capacities[a]
+        for j, v in enumerate(self.limited):
+            r = 2 * (m + j)
+            head[r], head[r + 1] = (v, n + j) if v == t else (n + j, v)
+            residual[r] = network.node_capacities[v]
+
+    def tail(self, r):
+        return self.head[r ^ 1]
+
+    def bfs_vector(self):
+        """La copia NumPy para los BFS, armada en el primer uso (None si no corresponde)"""
+        if self.vector_pending:
+            # Su costo queda dentro del tiempo de la búsqueda que la pidió
+            self.vector_pending = False
+            self.vector = VectorResidual.build(self, adaptive=self.vector_adaptive)
+        return self.vector
+
+    def load_flows(self, flows):
+        """Reemplaza el estado por un flujo dado por arco (p. ej. del editor o de GLPK)"""
+        capacities = self.network.capacities
+        for a, f in enumerate(flows):
+            self.residual[2 * a] = saturated(capacities[a], f)
+            self.residual[2 * a + 1] = f
+        if self.limited:
+            # El arco interno lleva lo que sale del nodo (lo que entra, en el sumidero)
+            through = self.node_throughput(flows)
+            m = self.num_arcs
+            for j, v in enumerate(self.limited):
+                self.residual[2 * (m + j)] = saturated(self.network.node_capacities[v], through[v])
+                self.residual[2 * (m + j) + 1] = through[v]
+        if self.vector is not None:
+            self.vector.load_residual(self.residual)
+
+    def node_throughput(self, flows):
+        """Flujo que atraviesa cada nodo: lo que sale (lo que entra, en el sumidero)"""
+        network = self.network
+        through = [0] * network.num_nodes
+        tails, heads = network.tails, network.heads
+        t = network.sink_index if network.sink in network.index else -1
+        for a, f in enumerate(flows):
+            if f:
+                if tails[a] != t:
+                    through[tails[a]] += f
+                if heads[a] == t:
+                    through[t] += f
+        return through
+
+    def flow(self, a):
+        return self.residual[2 * a + 1]
+
+    def arc_flows(self):
+        """Flujo por arco de la red (sin los arcos internos de los nodos limitados)"""
+        return self.residual[1:2 * self.num_arcs:2]
+
+    def node_flows(self):
+        """Flujo por nodo limitado: {índice de nodo: flujo que lo atraviesa}"""
+        m = self.num_arcs
+        return {v: self.residual[2 * (m + j) + 1] for j, v in enumerate(self.limited)}
+
+    def augment(self, arcs, amount):
+        """Envía ``amount`` unidades por la secuencia de arcos residuales"""
+        residual = self.residual
+        for r in arcs:
+            residual[r] -= amount
+            residual[r ^ 1] += amount
+        if self.vector is not None:
+            self.vector.augment(arcs, amount)
+
+    def path_nodes(self, arcs, start):
+        """Convierte una secuencia de arcos residuales en índices de nodo"""
+        if self.node_of is None:
+            return [start] + [self.head[r] for r in arcs]
+        # Los arcos internos unen las dos mitades de un mismo nodo
+        node_of, limit = self.node_of, 2 * self.num_arcs
+        return [start] + [node_of[self.head[r]] for r in arcs if r < limit]
+
+    def trace_path(self, parent_arc, s, t):
+        """Reconstruye el camino s→t desde el arreglo de arcos padre"""
+        arcs = []
+        v = t
+        while v != s:
+            r = int(parent_arc[v])
+            arcs.append(r)
+            v = self.head[r ^ 1]
+        arcs.reverse()
+        return arcs, min(self.residual[r] for r in arcs)
+
+
+# =========================================
+#    BFS VECTORIZADO (NumPy, opcional)
+# =========================================
+
+# Debajo de este tamaño, o con fronteras de menos de VECTOR_MIN_WIDTH nodos
+# por nivel en promedio, el costo fijo de las llamadas a NumPy de cada nivel
+# supera lo que se ahorra frente al BFS en Python
+VECTOR_MIN_ARCS = 20000
+VECTOR_MIN_WIDTH = 32
+
+
+class VectorResidual:
+    """Copia NumPy del residual para BFS que expanden la frontera entera.
+
+    Cada nivel del BFS junta de una vez los arcos CSR de todos los nodos de
+    la frontera, descarta los de capacidad residual nula y los que llegan a
+    nodos ya visitados, y se queda con un arco padre por nodo nuevo. El
+    residual se mantiene sincronizado en ``ResidualGraph.augment``.
+
+    Con ``adaptive`` (la elección automática) ``vector_bfs`` descarta la
+    copia la primera vez que un BFS recorre niveles demasiado angostos.
+    """
+
+    def __init__(self, np, res, adaptive=False):
+        self.np = np
+        self.adaptive = adaptive
+        self.head = np.array(res.head, dtype=np.int64)
+        self.adj = np.array(res.adj, dtype=np.int64)
+        self.adj_start = np.array(res.adj_start, dtype=np.int64)
+        self.degree = np.diff(self.adj_start)
+        self.num_nodes = res.num_nodes
+        self.load_residual(res.residual)
+
+    @classmethod
+    def build(cls, res, adaptive=False):
+        """La copia vectorizada, o None si NumPy no está instalado (en modo automático)"""
+        try:
+            import numpy as np
+        except ImportError:
+            if not adaptive:
+                raise ValueError("El BFS vectorizado requiere NumPy")
+            return None
+        return cls(np, res, adaptive)
+
+    def load_residual(self, residual):
+        self.residual = self.np.array(residual)
+
+    def augment(self, arcs, amount):
+        arcs = self.np.array(arcs, dtype=self.np.int64)
+        self.residual[arcs] -= amount
+        self.residual[arcs ^ 1] += amount
+
+    def bfs(self, s, t=None):
+        """BFS por niveles desde ``s``; se detiene al alcanzar ``t`` (si se da).
+
+        Devuelve ``(level, parent_arc, visits, scans, depth)``: ``level`` es
+        -1 en los nodos no alcanzados, ``parent_arc`` el arco residual por el
+        que se llegó a cada nodo y ``depth`` la cantidad de niveles. Con ``t`` se completa el nivel de ``t``, como
+        necesita el grafo de niveles de Dinic.
+        """
+        np = self.np
+        level = np.full(self.num_nodes, -1, dtype=np.int64)
+        parent_arc = np.full(self.num_nodes, -1, dtype=np.int64)
+        level[s] = 0
+        frontier = np.array([s], dtype=np.int64)
+        visits = scans = 0
+        depth = 0
+        while frontier.size:
+            visits += frontier.size
+            counts = self.degree[frontier]
+            total = int(counts.sum())
+            scans += total
+            if total == 0:
+                break
+            # Posiciones CSR de todos los arcos de la frontera
+            offsets = np.repeat(self.adj_start[frontier] - (np.cumsum(counts) - counts), counts)
+            arcs = self.adj[offsets + np.arange(total)]
+            arcs = arcs[self.residual[arcs] > 0]
+            targets = self.head[arcs]
+            fresh = level[targets] < 0
+            arcs, targets = arcs[fresh], targets[fresh]
+            # Si varios arcos llegan al mismo nodo gana uno: el que quedó escrito
+            parent_arc[targets] = arcs
+            frontier = targets[parent_arc[targets] == arcs]
+            depth += 1
+            level[frontier] = depth
+            if t is not None and level[t] >= 0:
+                break
+        return level, parent_arc, visits, scans, depth
+
+
+def vector_bfs(res, s, t=None):
+    """``VectorResidual.bfs`` que vuelve a Python si la red resulta "profunda"
+
+    En modo automático, un BFS con menos de ``VECTOR_MIN_WIDTH`` nodos por
+    nivel en promedio desactiva la copia NumPy para las búsquedas siguientes.
+    """
+    vector = res.vector
+    level, parent_arc, visits, scans, depth = vector.bfs(s, t)
+    if vector.adaptive and visits < VECTOR_MIN_WIDTH * depth:
+        res.vector = None
+    return level, parent_arc, visits, scans
+
+
+# =========================================
+#    BÚSQUEDA DE CAMINOS AUMENTANTES
+# =========================================
+
+def report_search(res, visits, scans, found):
+    """Informa nodos visitados y arcos examinados si hay instrumentación"""
+    if res.stats is not None:
+        res.stats.record_search(visits, scans, found)
+
+
+def find_path_with_max_capacity(res, s, t):
+    """Greedy: DFS que prueba primero el arco directo de mayor capacidad.
+
+    Solo usa arcos directos (nunca deshace flujo), por eso no siempre
+    llega al óptimo global.
+    """
+    if s == t:
+        return None, 0
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    visited = bytearray(res.num_nodes)
+    counts = [0, 0]  # nodos visitados, arcos examinados
+
+    def candidates(u):
+        visited[u] = 1
+        counts[0] += 1
+        counts[1] += adj_start[u + 1] - adj_start[u]
+        arcs = [r for r in adj[adj_start[u]:adj_start[u + 1]]
+                if not (r & 1) and residual[r] > 0 and not visited[head[r]]]
+        arcs.sort(key=lambda r: residual[r], reverse=True)
+        return iter(arcs)
+
+    path = []
+    stack = [candidates(s)]
+    while stack:
+        r = next(stack[-1], None)
+        if r is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        v = head[r]
+        if visited[v]:
+            continue
+        path.append(r)
+        if v == t:
+            report_search(res, counts[0], counts[1], True)
+            return path, min(residual[r] for r in path)
+        stack.append(candidates(v))
+    report_search(res, counts[0], counts[1], False)
+    return None, 0
+
+
+def find_augmenting_path_dfs(res, s, t):
+    """Encuentra un camino aumentante usando DFS iterativo (O(V+E))"""
+    if s == t:
+        return None, 0
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    parent_arc = array('l', [-1]) * res.num_nodes
+    visited = bytearray(res.num_nodes)
+    visited[s] = 1
+    stack = [s]
+    visits = scans = 0
+    while stack:
+        u = stack.pop()
+        visits += 1
+        start, end = adj_start[u], adj_start[u + 1]
+        # Se apilan en orden inverso para explorar primero el primer arco
+        for k in range(end - 1, start - 1, -1):
+            r = adj[k]
+            if residual[r] > 0:
+                v = head[r]
+                if not visited[v]:
+                    visited[v] = 1
+                    parent_arc[v] = r
+                    if v == t:
+                        report_search(res, visits, scans + end - k, True)
+                        return res.trace_path(parent_arc, s, t)
+                    stack.append(v)
+        scans += end - start
+    report_search(res, visits, scans, False)
+    return None, 0
+
+
+def find_augmenting_path_bfs(res, s, t):
+    """Encuentra el camino aumentante más corto usando BFS con arreglo de padres"""
+    if s == t:
+        return None, 0
+    if res.bfs_vector() is not None:
+        return find_augmenting_path_bfs_vector(res, s, t)
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    parent_arc = array('l', [-1]) * res.num_nodes
+    visited = bytearray(res.num_nodes)
+    visited[s] = 1
+    queue = deque([s])
+    visits = scans = 0
+    while queue:
+        u = queue.popleft()
+        visits += 1
+        start, end = adj_start[u], adj_start[u + 1]
+        for k in range(start, end):
+            r = adj[k]
+            if residual[r] > 0:
+                v = head[r]
+                if not visited[v]:
+                    visited[v] = 1
+                    parent_arc[v] = r
+                    if v == t:
+                        report_search(res, visits, scans + k - start + 1, True)
+                        return res.trace_path(parent_arc, s, t)
+                    queue.append(v)
+        scans += end - start
+    report_search(res, visits, scans, False)
+    return None, 0
+
+
+def find_augmenting_path_bfs_vector(res, s, t):
+    """El mismo BFS de Edmonds-Karp con la frontera expandida en NumPy.
+
+    Devuelve un camino de largo mínimo, aunque con varios empates puede
+    elegir otro que la versión en Python.
+    """
+    level, parent_arc, visits, scans = vector_bfs(res, s, t)
+    found = bool(level[t] >= 0)
+    report_search(res, visits, scans, found)
+    if not found:
+        return None, 0
+    return res.trace_path(parent_arc, s, t)
+
+
+def level_graph(res, s, t):
+    """Niveles BFS desde ``s`` por arcos con residual positivo (-1 si no se alcanza).
+
+    La búsqueda termina al completar el nivel de ``t``: los nodos más
+    lejanos no pueden estar en un camino más corto hacia ``t``.
+    """
+    if res.bfs_vector() is not None:
+        level, _, visits, scans = vector_bfs(res, s, t)
+        level = level.tolist()
+    else:
+        head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+        level = [-1] * res.num_nodes
+        level[s] = 0
+        queue = deque([s])
+        visits = scans = 0
+        while queue:
+            u = queue.popleft()
+            if 0 <= level[t] <= level[u]:
+                break
+            visits += 1
+            start, end = adj_start[u], adj_start[u + 1]
+            for k in range(start, end):
+                r = adj[k]
+                if residual[r] > 0:
+                    v = head[r]
+                    if level[v] < 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            scans += end - start
+    report_search(res, visits, scans, level[t] >= 0)
+    return level
+
+
+def dinic(res, s, t):
+    """Dinic: por cada grafo de niveles se envía un flujo bloqueante.
+
+    Cada camino avanza solo a nodos del nivel siguiente, con un puntero de
+    "arco actual" por nodo que nunca retrocede dentro de la fase; al
+    bloquearse un nodo se vuelve un arco atrás. Hay a lo sumo V fases.
+    """
+    if s == t:
+        return
+    stats = res.stats
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    while True:
+        if stats is None:
+            level = level_graph(res, s, t)
+        else:
+            with stats.timer('búsqueda'):
+                level = level_graph(res, s, t)
+        if level[t] < 0:
+            return
+        current = array('l', adj_start)
+        path = []
+        u = s
+        while True:
+            if u == t:
+                amount = min(residual[r] for r in path)
+                if stats is None:
+                    res.augment(path, amount)
+                else:
+                    with stats.timer('aumento'):
+                        res.augment(path, amount)
+                    stats.record_augment(path, amount)
+                yield path, amount
+                path = []
+                u = s
+                continue
+            k, end = current[u], adj_start[u + 1]
+            next_level = level[u] + 1
+            while k < end and not (residual[adj[k]] > 0 and level[head[adj[k]]] == next_level):
+                k += 1
+            current[u] = k
+            if k < end:
+                path.append(adj[k])
+                u = head[adj[k]]
+            elif u == s:
+                break
+            else:
+                # Nodo bloqueado: se descarta el arco que llevaba a él
+                u = head[path.pop() ^ 1]
+                current[u] += 1
+
+
+def bipartite_unit_structure(network):
+    """Detecta redes de asignación: s → L → R → t con todas las capacidades 1.
+
+    Cada nodo de L recibe un único arco desde la fuente, cada nodo de R
+    tiene un único arco al sumidero, L y R son disjuntos y todos los demás
+    arcos van de L a R. Devuelve ``(source_arc, sink_arc, middle)``, con el
+    arco de la fuente de cada nodo de L y el del sumidero de cada nodo de R
+    (-1 si no corresponde) y la lista de arcos L→R; o None si la red no
+    tiene esa forma o tiene nodos con capacidad propia.
+    """
+    if network.source is None or network.sink is None or network.limited_nodes():
+        return None
+    n, s, t = network.num_nodes, network.source_index, network.sink_index
+    tails, heads, capacities = network.tails, network.heads, network.capacities
+    source_arc = array('l', [-1]) * n
+    sink_arc = array('l', [-1]) * n
+    for a in range(network.num_arcs):
+        if capacities[a] != 1:
+            return None
+        u, v = tails[a], heads[a]
+        if u == s:
+            if v == t or source_arc[v] >= 0:
+                return None
+            source_arc[v] = a
+        elif v == t:
+            if sink_arc[u] >= 0:
+                return None
+            sink_arc[u] = a
+    middle = []
+    for a in range(network.num_arcs):
+        u, v = tails[a], heads[a]
+        if u == s or v == t:
+            continue
+        if source_arc[u] < 0 or sink_arc[v] < 0:
+            return None
+        middle.append(a)
+    if any(source_arc[i] >= 0 and sink_arc[i] >= 0 for i in range(n)):
+        return None
+    return source_arc, sink_arc, middle
+
+
+def hopcroft_karp(res, s, t):
+    """Hopcroft-Karp para redes de asignación (ver ``bipartite_unit_structure``).
+
+    Cada fase hace un BFS desde los nodos libres de L por caminos
+    alternantes y luego busca, con DFS y punteros por nodo, caminos
+    disjuntos de largo mínimo: O(E·√V) en total. Cada camino se aplica
+    al residual como s → l → r (→ l' → r' …) → t, de modo que flujos,
+    rutas y corte quedan igual que con los demás algoritmos. Si la red no
+    es de asignación se resuelve con Dinic.
+    """
+    network = res.network
+    structure = bipartite_unit_structure(network)
+    if structure is None:
+        yield from dinic(res, s, t)
+        return
+    source_arc, sink_arc, middle = structure
+    stats = res.stats
+    tails, heads = network.tails, network.heads
+    n = network.num_nodes
+    left = [v for v in range(n) if source_arc[v] >= 0]
+    arcs_of = [[] for _ in range(n)]
+    for a in middle:
+        arcs_of[tails[a]].append(a)
+    # Emparejamiento inicial a partir del flujo que ya tenga el residual;
+    # match_left/match_right guardan el arco L→R elegido (-1 si está libre)
+    match_left = [-1] * n
+    match_right = [-1] * n
+    for a in middle:
+        if res.flow(a) > 0:
+            match_left[tails[a]] = a
+            match_right[heads[a]] = a
+
+    infinity = n + 1
+    dist = [infinity] * n
+    while True:
+        start = time.perf_counter()
+        queue = deque()
+        for l in left:
+            if match_left[l] < 0:
+                dist[l] = 0
+                queue.append(l)
+            else:
+                dist[l] = infinity
+        free_distance = infinity
+        visits = scans = 0
+        while queue:
+            l = queue.popleft()
+            visits += 1
+            if dist[l] >= free_distance:
+                continue
+            for a in arcs_of[l]:
+                scans += 1
+                m = match_right[heads[a]]
+                if m < 0:
+                    free_distance = min(free_distance, dist[l] + 1)
+                elif dist[tails[m]] == infinity:
+                    dist[tails[m]] = dist[l] + 1
+                    queue.append(tails[m])
+        report_search(res, visits, scans, free_distance < infinity)
+        if stats is not None:
+            stats.add_time('búsqueda', time.perf_counter() - start)
+        if free_distance == infinity:
+            return
+
+        pointer = [0] * n
+        for root in left:
+            if match_left[root] >= 0:
+                continue
+            stack, via = [root], []
+            while stack:
+                l = stack[-1]
+                candidates = arcs_of[l]
+                advanced = found = False
+                while pointer[l] < len(candidates):
+                    a = candidates[pointer[l]]
+                    pointer[l] += 1
+                    m = match_right[heads[a]]
+                    if m < 0:
+                        if dist[l] + 1 == free_distance:
+                            via.append(a)
+                            found = True
+                            break
+                    elif dist[tails[m]] == dist[l] + 1:
+                        via.append(a)
+                        stack.append(tails[m])
+                        advanced = True
+                        break
+                if found:
+                    # Camino residual: s → l0 → r0 ⇢ l1 → r1 … → t (⇢ deshace un emparejamiento)
+                    path = [2 * source_arc[root]]
+                    for a in via:
+                        path.append(2 * a)
+                        m = match_right[heads[a]]
+                        if m >= 0:
+                            path.append(2 * m + 1)
+                    path.append(2 * sink_arc[heads[via[-1]]])
+                    for a in via:
+                        match_left[tails[a]] = a
+                        match_right[heads[a]] = a
+                    if stats is None:
+                        res.augment(path, 1)
+                    else:
+                        with stats.timer('aumento'):
+                            res.augment(path, 1)
+                        stats.record_augment(path, 1)
+                    yield path, 1
+                    break
+                if not advanced:
+                    # Nodo sin salida en esta fase
+                    dist[l] = infinity
+                    stack.pop()
+                    if via:
+                        via.pop()
+
+
+FREE, TREE_S, TREE_T = 0, 1, 2
+ROOT = -2  # "arco padre" de la fuente y del sumidero en Boykov-Kolmogorov
+
+
+def boykov_kolmogorov(res, s, t):
+    """Boykov-Kolmogorov: dos árboles de búsqueda (desde s y hacia t) que se reutilizan.
+
+    Crecimiento: los nodos activos de cada árbol adoptan vecinos libres por
+    arcos con residual positivo hasta que un arco une ambos árboles.
+    Aumento: se envía el mínimo residual por el camino s → ... → t; los
+    nodos cuyo arco padre quedó saturado pasan a ser huérfanos.
+    Adopción: cada huérfano busca un nuevo padre en su árbol que siga
+    conectado a la raíz; si no lo hay queda libre y sus hijos se vuelven
+    huérfanos. Los árboles no se reconstruyen entre aumentos, por eso rinde
+    en grillas con millones de arcos cortos (segmentación de imágenes).
+    """
+    if s == t:
+        return
+    stats = res.stats
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    n = res.num_nodes
+    tree = bytearray(n)
+    parent = array('l', [-1]) * n
+    tree[s], tree[t] = TREE_S, TREE_T
+    parent[s] = parent[t] = ROOT
+    active = deque([s, t])
+    is_active = bytearray(n)
+    is_active[s] = is_active[t] = 1
+    # Próximo arco a examinar de cada nodo activo: al retomar un nodo no se
+    # recorren de nuevo los arcos ya usados (clave con fuentes de grado alto)
+    scan = adj_start[:-1]
+
+    def activate(v):
+        scan[v] = adj_start[v]
+        if not is_active[v]:
+            is_active[v] = 1
+            active.append(v)
+
+    def rooted(v):
+        """True si subiendo por los padres se llega a la raíz del árbol"""
+        while parent[v] != ROOT:
+            r = parent[v]
+            if r < 0:
+                return False
+            v = head[r ^ 1] if tree[v] == TREE_S else head[r]
+        return True
+
+    while True:
+        start = time.perf_counter()
+        # --- Crecimiento ---
+        meet = -1  # arco residual de un nodo de S a uno de T
+        visits = scans = 0
+        while active and meet < 0:
+            p = active[0]
+            if tree[p] == FREE:
+                active.popleft()
+                is_active[p] = 0
+                continue
+            visits += 1
+            side = tree[p]
+            end = adj_start[p + 1]
+            for k in range(scan[p], end):
+                scans += 1
+                r = adj[k]
+                # En S se crece por arcos p→q; en T por arcos q→p (el gemelo de r)
+                arc = r if side == TREE_S else r ^ 1
+                if residual[arc] <= 0:
+                    continue
+                q = head[r]
+                if tree[q] == FREE:
+                    tree[q] = side
+                    parent[q] = arc
+                    activate(q)
+                elif tree[q] != side:
+                    # p sigue activo y se retoma desde este arco
+                    meet = arc
+                    scan[p] = k
+                    break
+            if meet < 0:
+                scan[p] = end
+                active.popleft()
+                is_active[p] = 0
+        report_search(res, visits, scans, meet >= 0)
+        if stats is not None:
+            stats.add_time('búsqueda', time.perf_counter() - start)
+        if meet < 0:
+            return
+
+        # --- Aumento ---
+        path = []
+        v = head[meet ^ 1]
+        while v != s:
+            r = parent[v]
+            path.append(r)
+            v = head[r ^ 1]
+        path.reverse()
+        path.append(meet)
+        v = head[meet]
+        while v != t:
+            r = parent[v]
+            path.append(r)
+            v = head[r]
+        amount = min(residual[r] for r in path)
+        if stats is None:
+            res.augment(path, amount)
+        else:
+            with stats.timer('aumento'):
+                res.augment(path, amount)
+            stats.record_augment(path, amount)
+        orphans = deque()
+        for r in path:
+            if residual[r] <= 0:
+                v, u = head[r], head[r ^ 1]
+                if tree[v] == TREE_S and parent[v] == r:
+                    parent[v] = -1
+                    orphans.append(v)
+                elif tree[u] == TREE_T and parent[u] == r:
+                    parent[u] = -1
+                    orphans.append(u)
+        yield path, amount
+
+        # --- Adopción ---
+        start = time.perf_counter()
+        while orphans:
+            p = orphans.popleft()
+            side = tree[p]
+            new_parent = -1
+            for k in range(adj_start[p], adj_start[p + 1]):
+                r = adj[k]
+                q = head[r]
+                # Candidato en S: arco q→p (r ^ 1); en T: arco p→q (r)
+                arc = r ^ 1 if side == TREE_S else r
+                if tree[q] == side and residual[arc] > 0 and rooted(q):
+                    new_parent = arc
+                    break
+            if new_parent >= 0:
+                parent[p] = new_parent
+                continue
+            for k in range(adj_start[p], adj_start[p + 1]):
+                r = adj[k]
+                q = head[r]
+                if tree[q] != side:
+                    continue
+                arc = r ^ 1 if side == TREE_S else r
+                if residual[arc] > 0:
+                    activate(q)
+                # Los hijos de p (su arco padre sale de p en S o llega a p en T)
+                if parent[q] == (r if side == TREE_S else r ^ 1):
+                    parent[q] = -1
+                    orphans.append(q)
+            tree[p] = FREE
+        if stats is not None:
+            stats.add_time('búsqueda', time.perf_counter() - start)
+
+
+# =========================================
+#    REGISTRO DE ALGORITMOS
+# =========================================
+
+SOLVERS = {}
+
+
+def register_solver(name, iterate, description, summary, step_title, tag, note, exact=True):
+    """Registra un algoritmo para el editor y para los usos sin interfaz.
+
+    ``iterate(res, s, t)`` es un generador que aplica cada aumento sobre el
+    grafo residual y luego produce ``(arcos_residuales, cantidad)``.
+    """
+    SOLVERS[name] = {
+        'name': name,
+        'iterate': iterate,
+        'description': description,  # líneas mostradas al elegirlo
+        'summary': summary,          # línea mostrada al iniciar
+        'step_title': step_title,    # encabezado de cada paso en el log
+        'tag': tag,                  # etiqueta para nombres de archivo
+        'note': note,                # comentario en los resultados finales
+        'exact': exact,              # True si garantiza el óptimo
+    }
+    return SOLVERS[name]
+
+
+def augmenting_path_solver(find_path):
+    """Convierte una búsqueda de caminos en un generador de aumentos"""
+    def iterate(res, s, t):
+        stats = res.stats
+        while True:
+            if stats is None:
+                arcs, amount = find_path(res, s, t)
+            else:
+                with stats.timer('búsqueda'):
+                    arcs, amount = find_path(res, s, t)
+            if not arcs or amount <= 0:
+                return
+            if stats is None:
+                res.augment(arcs, amount)
+            else:
+                with stats.timer('aumento'):
+                    res.augment(arcs, amount)
+                stats.record_augment(arcs, amount)
+            yield arcs, amount
+    return iterate
+
+
+def get_solver(name):
+    try:
+        return SOLVERS[name]
+    except KeyError:
+        raise ValueError(f"Algoritmo desconocido: {name}")
+
+
+register_solver(
+    "GREEDY", augmenting_path_solver(find_path_with_max_capacity),
+    description=["Busca el camino con mayor capacidad disponible en cada paso"],
+    summary="Algoritmo Greedy: Selecciona el camino con mayor capacidad en cada paso",
+    step_title="Ruta encontrada", tag="Iteracion",
+    note="El algoritmo Greedy no siempre encuentra el óptimo global", exact=False)
+register_solver(
+    "FORD_FULKERSON_DFS", augmenting_path_solver(find_augmenting_path_dfs),
+    description=["Usa DFS para encontrar caminos aumentantes"],
+    summary="Ford-Fulkerson (DFS): Usa búsqueda en profundidad",
+    step_title="Camino aumentante (DFS)", tag="DFS",
+    note="Ford-Fulkerson con DFS puede ser lento en algunos casos")
+register_solver(
+    "EDMONDS_KARP_BFS", augmenting_path_solver(find_augmenting_path_bfs),
+    description=["Usa BFS para encontrar caminos aumentantes (óptimo)"],
+    summary="Edmonds-Karp (BFS): Usa búsqueda en amplitud (óptimo)",
+    step_title="Camino aumentante (BFS)", tag="BFS",
+    note="Edmonds-Karp (BFS) garantiza el óptimo en tiempo polinomial")
+register_solver(
+    "DINIC", dinic,
+    description=["Grafo de niveles (BFS) y flujo bloqueante por fase (óptimo)",
+                 "En redes grandes los BFS usan NumPy si está instalado"],
+    summary="Dinic: BFS por niveles y caminos bloqueantes en cada fase",
+    step_title="Camino en el grafo de niveles", tag="Dinic",
+    note="Dinic garantiza el óptimo con a lo sumo V fases de BFS")
+register_solver(
+    "HOPCROFT_KARP", hopcroft_karp,
+    description=["Emparejamiento bipartito: s → L → R → t con capacidades 1, en O(E·√V)",
+                 "Si la red no tiene esa forma se resuelve con Dinic"],
+    summary="Hopcroft-Karp: fases BFS y caminos alternantes disjuntos de largo mínimo",
+    step_title="Camino alternante", tag="HK",
+    note="Hopcroft-Karp encuentra el emparejamiento máximo en O(E·√V)")
+register_solver(
+    "BOYKOV_KOLMOGOROV", boykov_kolmogorov,
+    description=["Dos árboles de búsqueda (desde la fuente y hacia el sumidero)",
+                 "que se reutilizan entre aumentos; pensado para grillas"],
+    summary="Boykov-Kolmogorov: crecimiento, aumento y adopción de huérfanos",
+    step_title="Camino entre los árboles S y T", tag="BK",
+    note="Boykov-Kolmogorov garantiza el óptimo y rinde en grillas de segmentación")
+
+
+# =========================================
+#    SELECCIÓN AUTOMÁTICA (AUTO)
+# =========================================
+
+AUTO_SOLVER = "AUTO"
+
+# Umbrales calibrados con ``flow_cli.py benchmark --sizes 100 1000 10000``
+# (todos los generadores, Python puro). Dinic gana en grillas de
+# segmentación (BK tarda 2-2.5 veces más), en redes densas y desde unos
+# 20 000 arcos; Boykov-Kolmogorov gana en redes ralas más chicas y en
+# cadenas largas (familia AK: 3.5 veces más rápido que Edmonds-Karp), y
+# Hopcroft-Karp en redes de asignación. GREEDY y Ford-Fulkerson (DFS)
+# nunca resultaron los más rápidos.
+AUTO_LARGE_ARCS = 20000     # desde aquí, Dinic (y BFS vectorizados si hay NumPy)
+AUTO_SPARSE_DEGREE = 4.5    # grado medio máximo (arcos por nodo) para Boykov-Kolmogorov
+GRID_PAIRED_ARCS = 0.9      # fracción de arcos internos con su arco inverso
+GRID_MAX_DEGREE = 8         # vecinos por celda (4 u 8 conexa)
+GRID_TERMINAL_NODES = 0.5   # fracción de celdas ligadas a la fuente o al sumidero
+
+
+def grid_structure(network):
+    """True si la red parece una grilla de segmentación.
+
+    Los arcos entre nodos internos vienen de a pares u→v y v→u, cada nodo
+    tiene pocos vecinos y la mayoría está ligada a la fuente o al
+    sumidero (como las que arma ``network_generators.grid_network``).
+    """
+    n, s, t = network.num_nodes, network.source_index, network.sink_index
+    if n < 6:
+        return False
+    tails, heads = network.tails, network.heads
+    pairs = set()
+    degree = [0] * n
+    terminal = bytearray(n)
+    for a in range(network.num_arcs):
+        u, v = tails[a], heads[a]
+        if u == s or u == t:
+            terminal[v] = 1
+        elif v == s or v == t:
+            terminal[u] = 1
+        elif u != v:
+            pairs.add(u * n + v)
+            degree[u] += 1
+            if degree[u] > GRID_MAX_DEGREE:
+                return False
+    if not pairs:
+        return False
+    paired = sum(1 for key in pairs if (key % n) * n + key // n in pairs)
+    inner = n - 2
+    return (paired >= GRID_PAIRED_ARCS * len(pairs)
+            and sum(terminal) - terminal[s] - terminal[t] >= GRID_TERMINAL_NODES * inner)
+
+
+def network_statistics(network):
+    """Estadísticas baratas (una pasada por los arcos) para elegir el algoritmo"""
+    n, m = network.num_nodes, network.num_arcs
+    capacities = network.capacities
+    low = min(capacities) if m else 0
+    high = max(capacities) if m else 0
+    return {'nodes': n, 'arcs': m,
+            'density': m / (n * (n - 1)) if n > 1 else 0.0,
+            'average_degree': m / n if n else 0.0,
+            'min_capacity': low, 'max_capacity': high,
+            'unit_capacities': m > 0 and low == high == 1,
+            'limited_nodes': len(network.limited_nodes()),
+            'bipartite': bipartite_unit_structure(network) is not None,
+            'grid': grid_structure(network)}
+
+
+def format_statistics(statistics):
+    st = statistics
+    shape = "bipartita" if st['bipartite'] else "grilla" if st['grid'] else "general"
+    return (f"V={st['nodes']} E={st['arcs']} densidad={st['density']:.3f} grado medio={st['average_degree']:.1f} "
+            f"capacidades {st['min_capacity']:g}..{st['max_capacity']:g} | forma: {shape}")
+
+
+def choose_solver(network, statistics=None):
+    """Algoritmo exacto más rápido según las estadísticas de la red.
+
+    Devuelve ``(nombre, motivo)``; las reglas y umbrales salen de la
+    calibración descrita arriba.
+    """
+    st = statistics or network_statistics(network)
+    m = st['arcs']
+    if st['bipartite']:
+        return "HOPCROFT_KARP", f"red de asignación (bipartita, capacidades 1, {m} arcos)"
+    if st['grid']:
+        return "DINIC", "estructura de grilla: en la calibración Dinic supera a Boykov-Kolmogorov"
+    if m >= AUTO_LARGE_ARCS:
+        return "DINIC", f"red grande ({m} arcos ≥ {AUTO_LARGE_ARCS}): fases acotadas y BFS con NumPy si está instalado"
+    if st['unit_capacities']:
+        return "DINIC", "capacidades unitarias: Dinic termina en O(√E) fases"
+    if st['average_degree'] <= AUTO_SPARSE_DEGREE:
+        return "BOYKOV_KOLMOGOROV", (f"pocos arcos por nodo (grado medio {st['average_degree']:.1f} ≤ "
+                                     f"{AUTO_SPARSE_DEGREE}): los árboles de búsqueda se reutilizan entre aumentos")
+    return "DINIC", f"red densa (grado medio {st['average_degree']:.1f}): un flujo bloqueante por fase"
+
+
+def auto_solver(res, s, t):
+    """Delegado de AUTO: elige el algoritmo para la red del residual"""
+    yield from get_solver(choose_solver(res.network)[0])['iterate'](res, s, t)
+
+
+register_solver(
+    AUTO_SOLVER, auto_solver,
+    description=["Elige el algoritmo según la red: tamaño, densidad, capacidades,",
+                 "forma bipartita o de grilla (umbrales calibrados con el benchmark)"],
+    summary="AUTO: el algoritmo más rápido para esta red según sus estadísticas",
+    step_title="Camino aumentante", tag="AUTO",
+    note="AUTO elige siempre un algoritmo exacto")
+
+
+def solve_steps(res, algorithm):
+    """Generador de aumentos del algoritmo sobre un grafo residual ya creado"""
+    network = res.network
+    return get_solver(algorithm)['iterate'](res, network.source_index, network.sink_index)
+
+
+def max_flow(network, algorithm="EDMONDS_KARP_BFS", stats=None, vectorize=None):
+    """Resuelve la red sin interfaz gráfica.
+
+    Devuelve {'max_flow', 'arc_flows', 'routes', 'algorithm', 'min_cut'}; las
+    rutas son pares (IDs de nodo, flujo) como ``found_routes`` en el editor y
+    ``min_cut`` es el ``MinCut`` del residual final. ``stats`` es un
+    ``SolverStats`` opcional para contadores y tiempos por fase y
+    ``vectorize`` se pasa a ``ResidualGraph``. Con ``AUTO`` se resuelve con
+    el algoritmo de ``choose_solver``: 'algorithm' es el elegido y 'reason'
+    el motivo.
+    """
+    reason = None
+    if algorithm == AUTO_SOLVER:
+        algorithm, reason = choose_solver(network)
+    res = ResidualGraph(network, stats, vectorize)
+    s = network.source_index
+    total = 0
+    routes = []
+    for arcs, amount in solve_steps(res, algorithm):
+        total += amount
+        routes.append(([network.node_ids[i] for i in res.path_nodes(arcs, s)], amount))
+    result = {'max_flow': total, 'arc_flows': res.arc_flows(), 'routes': routes, 'algorithm': algorithm,
+              'min_cut': min_cut(res)}
+    if reason:
+        result['reason'] = reason
+    return result
+
+
+# =========================================
+#    CORTE MÍNIMO
+# =========================================
+
+class MinCut:
+    """Corte s-t obtenido del grafo residual de un flujo.
+
+    ``source_side[i]`` vale 1 si el nodo de índice ``i`` es alcanzable desde
+    la fuente en el residual (lado S). ``cut_arcs`` son los arcos S→T y
+    ``cut_nodes`` los nodos con capacidad propia saturados entre S y T
+    (su entrada en S y su salida en T); ``capacity`` es la suma de las
+    capacidades de ambos. Si el flujo era máximo, el sumidero queda del
+    lado T y ``capacity`` coincide con el flujo (teorema flujo máximo =
+    corte mínimo); ``verify`` lo comprueba.
+    """
+
+    def __init__(self, network, source_side, cut_arcs, capacity, cut_nodes=()):
+        self.network = network
+        self.source_side = source_side
+        self.cut_arcs = cut_arcs
+        self.capacity = capacity
+        self.cut_nodes = cut_nodes
+
+    @property
+    def separates(self):
+        """True si el sumidero no es alcanzable (el flujo no admite más aumentos)"""
+        return not self.source_side[self.network.sink_index]
+
+    def source_nodes(self):
+        return [node_id for node_id, side in zip(self.network.node_ids, self.source_side) if side]
+
+    def sink_nodes(self):
+        return [node_id for node_id, side in zip(self.network.node_ids, self.source_side) if not side]
+
+    def cut_edges(self):
+        """Arcos del corte como (ID origen, ID destino, capacidad)"""
+        node_ids, network = self.network.node_ids, self.network
+        return [(node_ids[network.tails[a]], node_ids[network.heads[a]], network.capacities[a])
+                for a in self.cut_arcs]
+
+    def cut_node_list(self):
+        """Nodos del corte como (ID, capacidad)"""
+        node_ids, capacities = self.network.node_ids, self.network.node_capacities
+        return [(node_ids[v], capacities[v]) for v in self.cut_nodes]
+
+    def verify(self, flow_value, tolerance=1e-9):
+        """Certifica la optimalidad: corte separador y capacidad == flujo"""
+        return self.separates and abs(self.capacity - flow_value) <= tolerance * max(1.0, abs(flow_value))
+
+    def to_dict(self):
+        """Representación serializable (JSON) del certificado"""
+        return {'capacity': self.capacity, 'separates': self.separates,
+                'source_side': self.source_nodes(), 'sink_side': self.sink_nodes(),
+                'cut_edges': [{'u': u, 'v': v, 'capacity': c} for u, v, c in self.cut_edges()],
+                'cut_nodes': [{'id': v, 'capacity': c} for v, c in self.cut_node_list()]}
+
+
+def min_cut(res):
+    """Corte a partir del estado actual de un ``ResidualGraph``.
+
+    Un único BFS desde la fuente sobre la adyacencia CSR marca el lado S,
+    usando todo arco residual con capacidad positiva (incluidos los
+    inversos, que permiten deshacer flujo). Luego un recorrido lineal de
+    los arcos junta los que cruzan de S a T: O(V + E) en total.
+    """
+    start = time.perf_counter()
+    network = res.network
+    s = network.source_index
+    # La copia NumPy se usa solo si algún BFS del algoritmo ya la armó
+    if res.vector is not None:
+        source_side, cut_arcs = min_cut_vector(res.vector, s)
+    else:
+        source_side, cut_arcs = min_cut_python(res, s)
+    capacities = network.capacities
+    cut_nodes = array('l')
+    if res.limited:
+        # Los arcos internos del corte son nodos saturados; el lado de cada
+        # nodo de la red es el de su índice original
+        m = res.num_arcs
+        cut_nodes = array('l', (res.limited[a - m] for a in cut_arcs if a >= m))
+        cut_arcs = array('l', (a for a in cut_arcs if a < m))
+        source_side = source_side[:network.num_nodes]
+    capacity = sum(capacities[a] for a in cut_arcs)
+    if cut_nodes:
+        capacity += sum(network.node_capacities[v] for v in cut_nodes)
+    if res.stats is not None:
+        res.stats.add_time('corte', time.perf_counter() - start)
+    return MinCut(network, source_side, cut_arcs, capacity, cut_nodes)
+
+
+def min_cut_python(res, s):
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    source_side = bytearray(res.num_nodes)
+    source_side[s] = 1
+    queue = deque([s])
+    while queue:
+        u = queue.popleft()
+        for k in range(adj_start[u], adj_start[u + 1]):
+            r = adj[k]
+            v = head[r]
+            if not source_side[v] and residual[r] > 0:
+                source_side[v] = 1
+                queue.append(v)
+
+    # Extremos de cada arco en el residual (con los nodos limitados divididos)
+    cut_arcs = array('l', (r >> 1 for r in range(0, len(head), 2)
+                           if source_side[head[r + 1]] and not source_side[head[r]]))
+    return source_side, cut_arcs
+
+
+def min_cut_vector(vector, s):
+    """Lado S y arcos del corte con el BFS y el filtrado en NumPy"""
+    np = vector.np
+    side = vector.bfs(s)[0] >= 0
+    # El arco a es el residual 2a (cabeza = heads[a]); su gemelo 2a+1 apunta a tails[a]
+    heads, tails = vector.head[0::2], vector.head[1::2]
+    cut_arcs = array('l', np.flatnonzero(side[tails] & ~side[heads]).tolist())
+    return bytearray(side.astype(np.uint8).tobytes()), cut_arcs
+
+
+def min_cut_from_flows(network, flows):
+    """Corte para un flujo por arco ya calculado (editor, GLPK/LP, archivo)"""
+    res = ResidualGraph(network)
+    res.load_flows(flows)
+    return min_cut(res)
+
+
+# =========================================
+#    DESCOMPOSICIÓN DEL FLUJO
+# =========================================
+
+def decompose_flow(network, arc_flows, tolerance=1e-9):
+    """Descompone un flujo por arco en caminos s-t y ciclos con su cantidad.
+
+    Sirve para cualquier origen del flujo (algoritmos propios, GLPK/LP o un
+    proyecto guardado). Se siguen arcos con flujo desde la fuente usando un
+    puntero de "arco actual" por nodo; si el recorrido repite un nodo se
+    extrae un ciclo, y al llegar al sumidero un camino. Cada extracción
+    anula al menos un arco, así que hay a lo sumo E piezas y el costo total
+    es O(V·E). Devuelve {'paths': [(IDs, cantidad)], 'cycles': [(IDs, cantidad)]}
+    donde cada ciclo repite al final su nodo inicial.
+    """
+    node_ids, heads = network.node_ids, network.heads
+    out_start, out_arcs, _, _ = network.arcs_by_node()
+    flow = list(arc_flows)
+    current = list(out_start[:-1])
+    paths, cycles = [], []
+
+    def next_arc(u):
+        k = current[u]
+        end = out_start[u + 1]
+        while k < end and flow[out_arcs[k]] <= tolerance:
+            k += 1
+        current[u] = k
+        return out_arcs[k] if k < end else -1
+
+    def extract(arcs, limit=None):
+        amount = min(flow[a] for a in arcs)
+        if limit is not None and limit < amount:
+            amount = limit
+        for a in arcs:
+            flow[a] -= amount
+        return amount
+
+    def walk(start, stop):
+        """Sigue el flujo desde ``start``; extrae ciclos al paso y termina en ``stop``"""
+        nodes, arcs = [start], []
+        position = {start: 0}
+        u = start
+        while True:
+            if u == stop and arcs:
+                amount = extract(arcs, remaining[0])
+                remaining[0] -= amount
+                paths.append(([node_ids[v] for v in nodes], amount))
+                return
+            a = next_arc(u)
+            if a < 0:
+                if not arcs:
+                    return
+                raise ValueError(f"El flujo no se conserva en el nodo {node_ids[u]}")
+            v = heads[a]
+            if v in position:
+                i = position[v]
+                cycle_arcs = arcs[i:] + [a]
+                amount = extract(cycle_arcs)
+                cycles.append(([node_ids[w] for w in nodes[i:]] + [node_ids[v]], amount))
+                for w in nodes[i + 1:]:
+                    del position[w]
+                del nodes[i + 1:]
+                del arcs[i:]
+                if stop is None and not arcs:
+                    return
+                u = v
+                continue
+            position[v] = len(nodes)
+            nodes.append(v)
+            arcs.append(a)
+            u = v
+
+    s, t = network.source_index, network.sink_index
+    # Solo se extraen caminos por el valor neto del flujo; un camino s→t
+    # que en realidad es parte de un ciclo por t y s queda como ciclo
+    tails = network.tails
+    remaining = [sum(flow[a] for a in range(len(flow)) if tails[a] == s)
+                 - sum(flow[a] for a in range(len(flow)) if heads[a] == s)]
+    while remaining[0] > tolerance and next_arc(s) >= 0:
+        walk(s, t)
+    # Lo que queda es circulación pura: solo ciclos
+    for u in range(network.num_nodes):
+        while next_arc(u) >= 0:
+            walk(u, None)
+    return {'paths': paths, 'cycles': cycles}
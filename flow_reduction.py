@@ -0,0 +1,262 @@
+"""Reducción de la red antes de resolver.
+
+Tres pasos que no cambian el flujo máximo:
+
+* Poda: se quitan los nodos que no son alcanzables desde la fuente o que
+  no llegan al sumidero, los arcos de capacidad nula, los lazos y los arcos
+  que entran a la fuente o salen del sumidero.
+* Arcos paralelos: los arcos u→v repetidos se funden en uno con la suma de
+  capacidades.
+* Cadenas en serie: un nodo con un único arco de entrada u→v y un único
+  arco de salida v→w se contrae en u→w con la capacidad mínima (incluida
+  la capacidad propia de ``v``, si la tiene).
+
+Cada arco de la red reducida guarda una "receta" de los arcos originales
+que representa, y con ella ``ReducedNetwork`` expande flujos (y por lo tanto
+cortes) sobre los arcos de la red original, en el mismo orden que los
+arcos del editor.
+"""
+from collections import deque
+
+from flow_engine import FlowNetwork, max_flow, min_cut_from_flows, saturated
+
+# Recetas: un entero es un arco original; ('S', capacidad, hijos) es una
+# cadena en serie y ('P', capacidad, hijos) un grupo de arcos paralelos
+SERIES, PARALLEL = 'S', 'P'
+
+
+class ReducedNetwork:
+    """Red reducida y la correspondencia con la red original"""
+
+    def __init__(self, original, network, recipes, pruned_nodes, contracted_nodes):
+        self.original = original
+        self.network = network
+        self.recipes = recipes  # receta de cada arco de ``network``
+        self.pruned_nodes = pruned_nodes
+        self.contracted_nodes = contracted_nodes
+
+    def capacity(self, recipe):
+        if isinstance(recipe, int):
+            return self.original.capacities[recipe]
+        return recipe[1]
+
+    def original_arcs(self, a):
+        """Arcos originales que representa el arco reducido ``a`` (ninguno si es interno)"""
+        arcs = []
+        stack = [self.recipes[a]] if a < len(self.recipes) else []
+        while stack:
+            recipe = stack.pop()
+            if isinstance(recipe, int):
+                arcs.append(recipe)
+            else:
+                stack.extend(reversed(recipe[2]))
+        return arcs
+
+    def flow_of(self, recipe, flow_of_arc):
+        if isinstance(recipe, int):
+            return flow_of_arc(recipe)
+        kind, _, children = recipe
+        if kind == SERIES:
+            return self.flow_of(children[0], flow_of_arc)
+        return sum(self.flow_of(child, flow_of_arc) for child in children)
+
+    def spread(self, recipe, amount, flow_of_arc, changes):
+        """Reparte ``amount`` (negativo = deshacer) entre los arcos originales"""
+        stack = [(recipe, amount)]
+        while stack:
+            recipe, amount = stack.pop()
+            if isinstance(recipe, int):
+                changes[recipe] = changes.get(recipe, 0) + amount
+                continue
+            kind, _, children = recipe
+            if kind == SERIES:
+                stack.extend((child, amount) for child in children)
+                continue
+            # Paralelos: se llenan (o vacían) en orden hasta cubrir la cantidad
+            remaining = abs(amount)
+            for child in children:
+                if remaining <= 0:
+                    break
+                current = self.flow_of(child, lambda a: flow_of_arc(a) + changes.get(a, 0))
+                room = self.capacity(child) - current if amount > 0 else current
+                # Con floats, lo que queda para el último hijo puede quedar unos
+                # ulps por debajo de lo que cabe: se llena (o vacía) entero
+                part = room if saturated(room, remaining) <= 0 else remaining
+                if part > 0:
+                    stack.append((child, part if amount > 0 else -part))
+                    remaining -= part
+        return changes
+
+    def expand_step(self, arcs, amount, flow_of_arc):
+        """Cambios ``{arco original: delta}`` de un aumento sobre arcos residuales reducidos.
+
+        ``flow_of_arc(a)`` da el flujo actual del arco original ``a``. Los
+        arcos internos de los nodos con capacidad propia no cambian arcos.
+        """
+        changes = {}
+        limit = 2 * len(self.recipes)
+        for r in arcs:
+            if r >= limit:
+                continue
+            self.spread(self.recipes[r >> 1], -amount if r & 1 else amount, flow_of_arc, changes)
+        return changes
+
+    def expand_flows(self, arc_flows):
+        """Flujo por arco de la red original a partir del de la red reducida.
+
+        Un flujo a unos ulps de la capacidad (sumas de aumentos float) se
+        lleva a la capacidad exacta: si no, el corte armado desde estos
+        flujos vería un residual positivo en un arco saturado.
+        """
+        flows = [0] * self.original.num_arcs
+        changes = {}
+        for recipe, flow in zip(self.recipes, arc_flows):
+            if flow:
+                self.spread(recipe, flow, lambda a: 0, changes)
+        capacities = self.original.capacities
+        for a, flow in changes.items():
+            if saturated(capacities[a], flow) == 0:
+                flow = capacities[a]
+            flows[a] = flow
+        return flows
+
+    def summary_lines(self):
+        original, network = self.original, self.network
+        removed_nodes = original.num_nodes - network.num_nodes
+        removed_arcs = original.num_arcs - network.num_arcs
+        return [f"Nodos: {original.num_nodes} → {network.num_nodes} "
+                f"(-{removed_nodes}, {100 * removed_nodes / max(1, original.num_nodes):.0f}%)",
+                f"Arcos: {original.num_arcs} → {network.num_arcs} "
+                f"(-{removed_arcs}, {100 * removed_arcs / max(1, original.num_arcs):.0f}%)",
+                f"Podados: {self.pruned_nodes} nodos | Contraídos en serie: {self.contracted_nodes} nodos"]
+
+
+def reachable(n, start, arcs_from):
+    seen = bytearray(n)
+    seen[start] = 1
+    queue = deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in arcs_from[u]:
+            if not seen[v]:
+                seen[v] = 1
+                queue.append(v)
+    return seen
+
+
+def combine(kind, first, second, capacity):
+    """Receta que une dos recetas, aplanando las del mismo tipo"""
+    children = []
+    for recipe in (first, second):
+        if not isinstance(recipe, int) and recipe[0] == kind:
+            children.extend(recipe[2])
+        else:
+            children.append(recipe)
+    return (kind, capacity, children)
+
+
+def reduce_network(network):
+    """Poda, funde arcos paralelos y contrae cadenas en serie (ver el módulo)"""
+    n = network.num_nodes
+    s, t = network.source_index, network.sink_index
+    tails, heads, capacities = network.tails, network.heads, network.capacities
+    node_capacities = network.node_capacities or [None] * n
+
+    # --- Poda ---
+    useful = [a for a in range(network.num_arcs)
+              if capacities[a] > 0 and tails[a] != heads[a] and heads[a] != s and tails[a] != t]
+    forward = [[] for _ in range(n)]
+    backward = [[] for _ in range(n)]
+    for a in useful:
+        forward[tails[a]].append(heads[a])
+        backward[heads[a]].append(tails[a])
+    from_source = reachable(n, s, forward)
+    to_sink = reachable(n, t, backward)
+    keep = bytearray(1 if from_source[v] and to_sink[v] else 0 for v in range(n))
+    keep[s] = keep[t] = 1
+    pruned_nodes = n - sum(keep)
+
+    # --- Arcos paralelos (multigrafo con un arco por par u→v) ---
+    arcs = {}          # id -> [u, v, capacidad, receta]
+    by_pair = {}       # (u, v) -> id
+    out_ids = [set() for _ in range(n)]
+    in_ids = [set() for _ in range(n)]
+    next_id = 0
+
+    def add_arc(u, v, capacity, recipe):
+        nonlocal next_id
+        existing = by_pair.get((u, v))
+        if existing is not None:
+            arc = arcs[existing]
+            arc[2] += capacity
+            arc[3] = combine(PARALLEL, arc[3], recipe, arc[2])
+            return
+        arcs[next_id] = [u, v, capacity, recipe]
+        by_pair[(u, v)] = next_id
+        out_ids[u].add(next_id)
+        in_ids[v].add(next_id)
+        next_id += 1
+
+    def remove_arc(i):
+        u, v = arcs[i][0], arcs[i][1]
+        del arcs[i]
+        del by_pair[(u, v)]
+        out_ids[u].discard(i)
+        in_ids[v].discard(i)
+
+    for a in useful:
+        if keep[tails[a]] and keep[heads[a]]:
+            add_arc(tails[a], heads[a], capacities[a], a)
+
+    # --- Cadenas en serie ---
+    removed = bytearray(n)
+    contracted_nodes = 0
+    pending = deque(v for v in range(n) if keep[v] and v != s and v != t)
+    while pending:
+        v = pending.popleft()
+        if removed[v] or len(in_ids[v]) != 1 or len(out_ids[v]) != 1:
+            continue
+        (i,), (o,) = in_ids[v], out_ids[v]
+        u, _, in_capacity, in_recipe = arcs[i]
+        _, w, out_capacity, out_recipe = arcs[o]
+        remove_arc(i)
+        remove_arc(o)
+        removed[v] = 1
+        contracted_nodes += 1
+        if u != w:  # u→v→u es un ciclo que no aporta flujo s-t
+            capacity = min(in_capacity, out_capacity)
+            if node_capacities[v] is not None:
+                capacity = min(capacity, node_capacities[v])
+            add_arc(u, w, capacity, combine(SERIES, in_recipe, out_recipe, capacity))
+        pending.extend(x for x in (u, w) if x != s and x != t)
+
+    # --- Red reducida (mismos IDs, etiquetas y posiciones) ---
+    kept = [v for v in range(n) if keep[v] and not removed[v]]
+    position = {v: i for i, v in enumerate(kept)}
+    node_ids = network.node_ids
+    reduced_tails, reduced_heads, reduced_capacities, recipes = [], [], [], []
+    for u, v, capacity, recipe in arcs.values():
+        reduced_tails.append(position[u])
+        reduced_heads.append(position[v])
+        reduced_capacities.append(capacity)
+        recipes.append(recipe)
+    pick = lambda values: [values[v] for v in kept] if values is not None else None
+    reduced = FlowNetwork([node_ids[v] for v in kept], reduced_tails, reduced_heads, reduced_capacities,
+                          network.source, network.sink, network.labels,
+                          xs=pick(network.xs), ys=pick(network.ys), node_types=pick(network.node_types),
+                          node_counter=network.node_counter, node_capacities=pick(network.node_capacities))
+    return ReducedNetwork(network, reduced, recipes, pruned_nodes, contracted_nodes)
+
+
+def max_flow_reduced(network, algorithm="EDMONDS_KARP_BFS", stats=None, vectorize=None):
+    """Como ``flow_engine.max_flow`` pero resolviendo la red reducida.
+
+    ``arc_flows`` y ``min_cut`` se refieren a la red original; las rutas
+    usan los nodos de la red reducida (las cadenas contraídas no aparecen)
+    y ``reduction`` es el ``ReducedNetwork`` usado.
+    """
+    reduction = reduce_network(network)
+    result = max_flow(reduction.network, algorithm, stats, vectorize)
+    arc_flows = reduction.expand_flows(result['arc_flows'])
+    result.update(arc_flows=arc_flows, min_cut=min_cut_from_flows(network, arc_flows), reduction=reduction)
+    return result
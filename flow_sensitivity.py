@@ -0,0 +1,302 @@
+"""Sensibilidad de los arcos a partir del residual de un flujo máximo.
+
+Para cada arco (y cada nodo con capacidad propia) se calcula, sin volver a
+resolver la red desde cero:
+
+* Si está en algún corte mínimo o en todos. Los cortes mínimos son los
+  conjuntos cerrados del residual que contienen la fuente y no el
+  sumidero: un arco saturado está en todos si su origen es alcanzable
+  desde la fuente y su destino llega al sumidero, y un arco saturado con
+  flujo está en alguno si sus extremos quedan en componentes fuertemente
+  conexas distintas (los de capacidad nula solo cuentan si están en todos).
+* La pérdida si el arco falla (se quita): igual a su capacidad si está en
+  algún corte mínimo, cero si no lleva flujo y, en el resto, lo que no se
+  logra desviar con una re-resolución incremental sobre el mismo residual.
+* Los márgenes: la capacidad puede bajar ``capacidad - pérdida`` sin que
+  cambie el flujo máximo; puede subir sin límite salvo que el arco esté en
+  todos los cortes mínimos (margen 0), y para esos se mide cuánto crecería
+  el flujo con el arco ilimitado.
+
+Cada re-resolución trabaja sobre el residual del flujo máximo y lo
+restaura al terminar; solo se hace para los arcos que la necesitan.
+"""
+from flow_engine import ResidualGraph, find_augmenting_path_bfs
+
+# Pertenencia a los cortes mínimos
+NO_CUT, SOME_CUTS, ALL_CUTS = 0, 1, 2
+CUT_NAMES = {NO_CUT: "—", SOME_CUTS: "alguno", ALL_CUTS: "todos"}
+
+
+class SensitivityReport:
+    """Sensibilidad de cada arco de la red y de cada nodo con capacidad propia.
+
+    Los elementos se indexan como los arcos del ``ResidualGraph``: ``0..m-1``
+    son los arcos de la red y ``m + j`` el nodo ``limited[j]``. ``loss[x]``
+    es la caída del flujo máximo si el elemento falla, ``cut_class[x]`` su
+    pertenencia a los cortes mínimos y ``gain[x]`` cuánto subiría el flujo
+    con capacidad ilimitada (None = sin límite; solo se mide para los que
+    están en todos los cortes, en el resto es 0).
+    """
+
+    def __init__(self, network, flow_value, limited, flows, capacities, cut_class, loss, gain, solves):
+        self.network = network
+        self.flow_value = flow_value
+        self.limited = limited
+        self.flows = flows
+        self.capacities = capacities
+        self.cut_class = cut_class
+        self.loss = loss
+        self.gain = gain
+        self.solves = solves  # re-resoluciones incrementales realizadas
+
+    @property
+    def num_arcs(self):
+        return self.network.num_arcs
+
+    def is_node(self, x):
+        return x >= self.num_arcs
+
+    def lower_slack(self, x):
+        """Cuánto puede bajar la capacidad sin que cambie el flujo máximo"""
+        return self.capacities[x] - self.loss[x]
+
+    def upper_slack(self, x):
+        """Cuánto puede subir la capacidad sin que cambie el flujo máximo (None = sin límite)"""
+        return 0 if self.cut_class[x] == ALL_CUTS else None
+
+    def name(self, x):
+        network = self.network
+        if self.is_node(x):
+            return f"nodo {network.get_label(network.node_ids[self.limited[x - self.num_arcs]])}"
+        node_ids = network.node_ids
+        return (f"{network.get_label(node_ids[network.tails[x]])} → "
+                f"{network.get_label(node_ids[network.heads[x]])}")
+
+    def ranked(self):
+        """Elementos ordenados de más a menos vitales"""
+        return sorted(range(len(self.loss)),
+                      key=lambda x: (-self.loss[x], -self.cut_class[x], -self.flows[x], x))
+
+    def most_vital(self):
+        """Elemento cuya falla más reduce el flujo (None si ninguna lo reduce)"""
+        ranked = self.ranked()
+        return ranked[0] if ranked and self.loss[ranked[0]] > 0 else None
+
+    def in_cuts(self, cut_class):
+        return [x for x, c in enumerate(self.cut_class) if c >= cut_class]
+
+    def format_lines(self, limit=None):
+        """Tabla ordenada por pérdida para el log del editor o la consola"""
+        lines = [f"{'Arco':<22} {'Cap':>7} {'Flujo':>7} {'Pérdida':>8} {'Baja':>7} {'Sube':>6} "
+                 f"{'Cortes':>7} {'Ganancia':>8}"]
+        infinite = lambda value: "∞" if value is None else f"{value:g}"
+        for x in self.ranked()[:limit]:
+            gain = self.gain[x] if self.cut_class[x] == ALL_CUTS else 0
+            lines.append(f"{self.name(x):<22} {self.capacities[x]:>7g} {self.flows[x]:>7g} "
+                         f"{self.loss[x]:>8g} {self.lower_slack(x):>7g} {infinite(self.upper_slack(x)):>6} "
+                         f"{CUT_NAMES[self.cut_class[x]]:>7} {infinite(gain):>8}")
+        return lines
+
+    def summary_lines(self):
+        vital = self.most_vital()
+        lines = [f"Flujo máximo: {self.flow_value} | En todos los cortes: {len(self.in_cuts(ALL_CUTS))} | "
+                 f"En algún corte: {len(self.in_cuts(SOME_CUTS))} | Re-resoluciones: {self.solves}"]
+        if vital is not None:
+            lines.append(f"Más vital: {self.name(vital)} (el flujo baja {self.loss[vital]:g} "
+                         f"a {self.flow_value - self.loss[vital]:g})")
+        return lines
+
+    def to_dict(self):
+        """Representación serializable (JSON), en el orden de ``ranked``"""
+        network, node_ids = self.network, self.network.node_ids
+        rows = []
+        for x in self.ranked():
+            row = {'capacity': self.capacities[x], 'flow': self.flows[x], 'loss': self.loss[x],
+                   'lower_slack': self.lower_slack(x), 'upper_slack': self.upper_slack(x),
+                   'min_cuts': ('none', 'some', 'all')[self.cut_class[x]],
+                   'gain': self.gain[x] if self.cut_class[x] == ALL_CUTS else 0}
+            if self.is_node(x):
+                row = {'node': node_ids[self.limited[x - self.num_arcs]], **row}
+            else:
+                row = {'edge': x, 'u': node_ids[network.tails[x]], 'v': node_ids[network.heads[x]], **row}
+            rows.append(row)
+        return {'max_flow': self.flow_value, 'solves': self.solves, 'elements': rows}
+
+
+def push(res, a, b, amount):
+    """Envía hasta ``amount`` de ``a`` a ``b`` por caminos aumentantes; devuelve lo enviado"""
+    if a == b:
+        return amount
+    sent = 0
+    while sent < amount:
+        arcs, bottleneck = find_augmenting_path_bfs(res, a, b)
+        if not arcs:
+            break
+        step = min(bottleneck, amount - sent)
+        res.augment(arcs, step)
+        sent += step
+    return sent
+
+
+def inflow(res, t):
+    """Flujo neto que llega al nodo ``t`` según el residual"""
+    residual = res.residual
+    total = 0
+    for k in range(res.adj_start[t], res.adj_start[t + 1]):
+        r = res.adj[k]
+        # Un inverso que sale de t es el gemelo de un arco que llega a t
+        total += residual[r] if r & 1 else -residual[r ^ 1]
+    return total
+
+
+def residual_components(res):
+    """Componentes fuertemente conexas del residual (Tarjan iterativo)"""
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    n = res.num_nodes
+    index = [-1] * n
+    low = [0] * n
+    component = [-1] * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = components = 0
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, adj_start[root])]
+        while work:
+            u, k = work[-1]
+            end = adj_start[u + 1]
+            while k < end:
+                r = adj[k]
+                k += 1
+                if residual[r] > 0:
+                    v = head[r]
+                    if index[v] < 0:
+                        work[-1] = (u, k)
+                        index[v] = low[v] = counter
+                        counter += 1
+                        stack.append(v)
+                        on_stack[v] = 1
+                        work.append((v, adj_start[v]))
+                        break
+                    if on_stack[v] and index[v] < low[u]:
+                        low[u] = index[v]
+            else:
+                work.pop()
+                if work and low[u] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[u]
+                if low[u] == index[u]:
+                    while True:
+                        v = stack.pop()
+                        on_stack[v] = 0
+                        component[v] = components
+                        if v == u:
+                            break
+                    components += 1
+    return component
+
+
+def reachable(res, start, forward=True):
+    """Nodos alcanzables desde ``start`` en el residual (o que llegan a él, con ``forward=False``)"""
+    head, residual, adj, adj_start = res.head, res.residual, res.adj, res.adj_start
+    seen = bytearray(res.num_nodes)
+    seen[start] = 1
+    pending = [start]
+    while pending:
+        u = pending.pop()
+        for k in range(adj_start[u], adj_start[u + 1]):
+            r = adj[k]
+            # Hacia atrás: el gemelo de r entra a u y se usa si tiene capacidad
+            if residual[r if forward else r ^ 1] > 0:
+                v = head[r]
+                if not seen[v]:
+                    seen[v] = 1
+                    pending.append(v)
+    return seen
+
+
+def arc_sensitivity(network, flows):
+    """Sensibilidad de todos los arcos para un flujo máximo ``flows`` (por arco).
+
+    El flujo debe ser máximo (de cualquier algoritmo exacto, de GLPK/LP o de
+    un proyecto guardado); si el sumidero sigue alcanzable en el residual se
+    lanza ``ValueError``. Devuelve un ``SensitivityReport``.
+    """
+    res = ResidualGraph(network, vectorize=False)
+    res.load_flows(flows)
+    s, t = network.source_index, network.sink_index
+    residual, head = res.residual, res.head
+    total = len(residual) // 2
+    flow_value = inflow(res, t)
+
+    from_source = reachable(res, s)
+    if from_source[t]:
+        raise ValueError("El flujo no es máximo: el sumidero sigue alcanzable en el residual")
+    to_sink = reachable(res, t, forward=False)
+    component = residual_components(res)
+
+    arc_flows = [residual[2 * x + 1] for x in range(total)]
+    capacities = [residual[2 * x] + residual[2 * x + 1] for x in range(total)]
+    cut_class = bytearray(total)
+    loss = [0] * total
+    gain = [0] * total
+    # "Infinito" acotado: más que cualquier corte que no contenga al arco
+    unbounded = sum(capacities) + 1
+    solves = 0
+    for x in range(total):
+        u, v = head[2 * x + 1], head[2 * x]
+        if residual[2 * x] <= 0:
+            if from_source[u] and to_sink[v]:
+                cut_class[x] = ALL_CUTS
+            elif arc_flows[x] > 0 and component[u] != component[v]:
+                # Con flujo hay un arco inverso v→u: componentes distintas = sin camino u→v
+                cut_class[x] = SOME_CUTS
+        if cut_class[x]:
+            # Un corte mínimo sin el arco vale F - capacidad: se pierde todo
+            loss[x] = capacities[x]
+        elif arc_flows[x] > 0:
+            loss[x] = removal_loss(res, x, s, t, flow_value)
+            solves += 1
+        if cut_class[x] == ALL_CUTS:
+            gain[x] = raise_gain(res, x, s, t, unbounded)
+            solves += 1
+    return SensitivityReport(network, flow_value, res.limited, arc_flows, capacities, cut_class, loss, gain, solves)
+
+
+def removal_loss(res, x, s, t, flow_value):
+    """Caída del flujo máximo al quitar el arco residual ``x``, re-resolviendo en el lugar.
+
+    Se anula el arco, lo que deja un exceso en su origen y un déficit en su
+    destino. Primero se desvía todo lo posible de uno al otro; lo que no
+    pasa vuelve a la fuente y se repone desde el sumidero, y al final se
+    buscan caminos aumentantes nuevos.
+    """
+    residual = res.residual
+    saved = residual[:]
+    u, v = res.head[2 * x + 1], res.head[2 * x]
+    excess = residual[2 * x + 1]
+    residual[2 * x] = residual[2 * x + 1] = 0
+    excess -= push(res, u, v, excess)
+    if excess > 0:
+        if u != s and u != t:
+            push(res, u, s, excess)
+        if v != s and v != t:
+            push(res, t, v, excess)
+    push(res, s, t, float('inf'))
+    loss = flow_value - inflow(res, t)
+    residual[:] = saved
+    return loss
+
+
+def raise_gain(res, x, s, t, unbounded):
+    """Aumento del flujo máximo con el arco ``x`` ilimitado (None si no hay límite)"""
+    residual = res.residual
+    saved = residual[:]
+    residual[2 * x] += unbounded
+    gain = push(res, s, t, float('inf'))
+    residual[:] = saved
+    return None if gain >= unbounded else gain
@@ -0,0 +1,428 @@
+"""Servicio local de resolución: JSON sobre HTTP, por TCP o socket Unix.
+
+Otras herramientas pueden pedir el flujo máximo de una red sin abrir el
+editor. El servicio escucha solo en la máquina local (127.0.0.1, ::1 o un
+socket Unix) y resuelve con el mismo motor que el botón EJECUTAR
+(``flow_engine.max_flow`` y los algoritmos de ``SOLVERS``).
+
+Rutas:
+
+* ``GET /health``: estado y algoritmos disponibles.
+* ``GET /graphs``: redes cargadas en memoria.
+* ``POST /graphs``: carga un proyecto (esquema de ``save_project_json``) y
+  devuelve su identificador.
+* ``POST /solve``: resuelve ``{"project": {...}}``, ``{"graph": id}`` o
+  ``{"graph": id, "delta": {...}}`` con ``"algorithm"`` opcional (con
+  ``"AUTO"`` la respuesta trae ``chosen`` y ``reason``). La red resultante
+  de un delta queda cargada con su propio identificador, así que los
+  deltas se pueden encadenar.
+
+El identificador de una red es el hash de ``result_cache.network_fingerprint``:
+la misma red cargada dos veces (o reconstruida con deltas) es la misma
+entrada. Las redes y los resultados recientes se conservan en memoria.
+
+Los pedidos que llegan juntos se agrupan: se espera ``BATCH_WINDOW``
+segundos, los pedidos idénticos (misma red y algoritmo) comparten una sola
+resolución y los distintos algoritmos sobre una misma red viajan al
+proceso de trabajo en un único envío.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from flow_engine import FlowNetwork, SOLVERS, max_flow
+from project_io import network_from_project
+from result_cache import ResultCache, cache_key, cut_entry, network_fingerprint
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+HOT_GRAPHS = 32       # redes que se conservan en memoria
+RESULT_ENTRIES = 256  # resultados que se conservan en memoria
+BATCH_WINDOW = 0.005  # segundos que se espera para agrupar pedidos
+BATCH_SIZE = 64       # pedidos máximos por grupo
+MAX_BODY = 256 * 1024 * 1024
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Pedido inválido; ``status`` es el código HTTP de la respuesta"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# =========================================
+#    DELTAS
+# =========================================
+
+def edge_indices(network, change):
+    """Arcos a los que se refiere un cambio: ``{"edge": índice}`` o ``{"u": id, "v": id}``"""
+    if "edge" in change:
+        a = change["edge"]
+        if not isinstance(a, int) or not 0 <= a < network.num_arcs:
+            raise RequestError(f"Arco inexistente: {a}")
+        return [a]
+    try:
+        u, v = network.index[change["u"]], network.index[change["v"]]
+    except KeyError:
+        raise RequestError(f"Arco inexistente: {change.get('u')} → {change.get('v')}")
+    arcs = [a for a in range(network.num_arcs) if network.tails[a] == u and network.heads[a] == v]
+    if not arcs:
+        raise RequestError(f"Arco inexistente: {change['u']} → {change['v']}")
+    return arcs
+
+
+def apply_delta(network, delta):
+    """Red nueva con los cambios de ``delta`` (la red cargada no se modifica).
+
+    Claves admitidas, todas opcionales:
+
+    * ``"capacities"``: ``[{"edge": i o "u"/"v", "capacity": c}, ...]``
+    * ``"remove_edges"``: ``[{"edge": i o "u"/"v"}, ...]``
+    * ``"add_nodes"``: ``[{"id": id, "label": texto, "capacity": c}, ...]``
+    * ``"add_edges"``: ``[{"u": id, "v": id, "capacity": c}, ...]``
+    * ``"node_capacities"``: ``[{"id": id, "capacity": c o null}, ...]``
+    * ``"source_id"`` y ``"sink_id"``
+
+    Los índices ``"edge"`` se refieren a la red de partida. Como en el
+    editor, los nodos quedan ordenados por ID y los arcos nuevos van al
+    final, así que la red coincide con la del proyecto equivalente.
+    """
+    capacities = list(network.capacities)
+    for change in delta.get("capacities", ()):
+        for a in edge_indices(network, change):
+            capacities[a] = change["capacity"]
+    removed = set()
+    for change in delta.get("remove_edges", ()):
+        removed.update(edge_indices(network, change))
+
+    labels = dict(network.labels)
+    xs = list(network.xs) if network.xs is not None else [0] * network.num_nodes
+    ys = list(network.ys) if network.ys is not None else [0] * network.num_nodes
+    types = list(network.node_types) if network.node_types is not None else ['transship'] * network.num_nodes
+    node_caps = list(network.node_capacities or [None] * network.num_nodes)
+    for change in delta.get("node_capacities", ()):
+        if change.get("id") not in network.index:
+            raise RequestError(f"Nodo inexistente: {change.get('id')}")
+        node_caps[network.index[change["id"]]] = change.get("capacity")
+    old_ids = list(network.node_ids)
+    for node in delta.get("add_nodes", ()):
+        if node["id"] in network.index:
+            raise RequestError(f"El nodo {node['id']} ya existe")
+        old_ids.append(node["id"])
+        labels[node["id"]] = node.get("label", str(node["id"]))
+        xs.append(node.get("x", 0))
+        ys.append(node.get("y", 0))
+        types.append(node.get("type", 'transship'))
+        node_caps.append(node.get("capacity"))
+
+    order = sorted(range(len(old_ids)), key=old_ids.__getitem__)
+    node_ids = [old_ids[i] for i in order]
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    position = [0] * len(old_ids)
+    for new, old in enumerate(order):
+        position[old] = new
+    tails, heads, caps = [], [], []
+    for a in range(network.num_arcs):
+        if a not in removed:
+            tails.append(position[network.tails[a]])
+            heads.append(position[network.heads[a]])
+            caps.append(capacities[a])
+    for edge in delta.get("add_edges", ()):
+        if edge["u"] not in index or edge["v"] not in index:
+            raise RequestError(f"Arco con nodos inexistentes: {edge['u']} → {edge['v']}")
+        tails.append(index[edge["u"]])
+        heads.append(index[edge["v"]])
+        caps.append(edge["capacity"])
+
+    node_counter = max(network.node_counter or 0, max(node_ids, default=0) + 1) \
+        if all(isinstance(i, int) for i in node_ids) else network.node_counter
+    return FlowNetwork(node_ids, tails, heads, caps,
+                       source=delta.get("source_id", network.source), sink=delta.get("sink_id", network.sink),
+                       labels=labels, xs=[xs[i] for i in order], ys=[ys[i] for i in order],
+                       node_types=[types[i] for i in order], node_counter=node_counter,
+                       node_capacities=[node_caps[i] for i in order]
+                       if any(c is not None for c in node_caps) else None)
+
+
+# =========================================
+#    RESOLUCIÓN Y AGRUPAMIENTO
+# =========================================
+
+def solve_batch(network, algorithms):
+    """Resuelve una red con varios algoritmos (se ejecuta en el pool de trabajo).
+
+    Devuelve entradas serializables en JSON, una por algoritmo.
+    """
+    entries = []
+    for algorithm in algorithms:
+        result = max_flow(network, algorithm)
+        entry = {'algorithm': algorithm, 'max_flow': result['max_flow'],
+                 'arc_flows': list(result['arc_flows']), 'routes': result['routes'],
+                 'cut': cut_entry(result['min_cut'])}
+        if 'reason' in result:
+            # AUTO: el algoritmo elegido y por qué
+            entry.update(chosen=result['algorithm'], reason=result['reason'])
+        entries.append(entry)
+    return entries
+
+
+class SolveBatcher:
+    """Cola de resoluciones que agrupa los pedidos concurrentes.
+
+    ``solve`` devuelve la entrada de la caché si existe; si la misma
+    resolución ya está en curso, espera esa misma; si no, la encola. El
+    despachador junta lo que llega durante ``window`` segundos (hasta
+    ``max_batch`` pedidos) y envía al pool un trabajo por red.
+    """
+
+    def __init__(self, executor, results, window=BATCH_WINDOW, max_batch=BATCH_SIZE):
+        self.executor = executor
+        self.results = results
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.pending = {}  # clave -> Future de la resolución en curso
+        self.counters = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'batches': 0, 'jobs': 0}
+
+    async def solve(self, network, algorithm, key):
+        self.counters['requests'] += 1
+        entry = self.results.get(key)
+        if entry is not None:
+            self.counters['cache_hits'] += 1
+            return entry, True
+        future = self.pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[key] = future
+            self.queue.put_nowait((key, network, algorithm))
+        else:
+            self.counters['coalesced'] += 1
+        return await asyncio.shield(future), False
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self.counters['batches'] += 1
+            groups = OrderedDict()  # huella de la red -> (red, [(clave, algoritmo)])
+            for key, network, algorithm in batch:
+                fingerprint = key.split(":", 1)[1]
+                groups.setdefault(fingerprint, (network, []))[1].append((key, algorithm))
+            for network, jobs in groups.values():
+                self.counters['jobs'] += 1
+                loop.create_task(self.dispatch(network, jobs))
+
+    async def dispatch(self, network, jobs):
+        loop = asyncio.get_running_loop()
+        try:
+            entries = await loop.run_in_executor(self.executor, solve_batch, network,
+                                                 [algorithm for _, algorithm in jobs])
+        except Exception as e:
+            for key, _ in jobs:
+                self.pending.pop(key).set_exception(e)
+            return
+        for (key, _), entry in zip(jobs, entries):
+            self.results.remember(key, entry)
+            self.pending.pop(key).set_result(entry)
+
+
+# =========================================
+#    SERVICIO
+# =========================================
+
+def decode_body(raw):
+    if not raw:
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError as e:
+        raise RequestError(f"JSON inválido: {e}")
+    if not isinstance(body, dict):
+        raise RequestError("El cuerpo debe ser un objeto JSON")
+    return body
+
+
+class FlowService:
+    """Estado del servicio: redes cargadas, resultados y el agrupador"""
+
+    def __init__(self, workers=None, threads=False, hot_graphs=HOT_GRAPHS):
+        workers = workers or os.cpu_count() or 1
+        if threads:
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            # 'spawn': los procesos no heredan el socket de escucha (con 'fork' lo
+            # mantendrían abierto aunque el servicio termine)
+            self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.graphs = OrderedDict()  # id -> FlowNetwork (LRU)
+        self.hot_graphs = hot_graphs
+        self.batcher = SolveBatcher(self.executor, ResultCache(RESULT_ENTRIES))
+
+    def add_graph(self, network):
+        graph_id = network_fingerprint(network)
+        self.graphs[graph_id] = network
+        self.graphs.move_to_end(graph_id)
+        while len(self.graphs) > self.hot_graphs:
+            self.graphs.popitem(last=False)
+        return graph_id
+
+    def graph(self, graph_id):
+        network = self.graphs.get(graph_id)
+        if network is None:
+            raise RequestError(f"Red no cargada: {graph_id}", 404)
+        self.graphs.move_to_end(graph_id)
+        return network
+
+    def network_for(self, body):
+        """Red de un pedido: proyecto completo, red cargada o red cargada + delta"""
+        if "project" in body:
+            try:
+                network = network_from_project(body["project"])
+            except (KeyError, TypeError, AttributeError) as e:
+                raise RequestError(f"Proyecto inválido: {e}")
+        elif "graph" in body:
+            network = self.graph(body["graph"])
+            if body.get("delta"):
+                try:
+                    network = apply_delta(network, body["delta"])
+                except (KeyError, TypeError) as e:
+                    raise RequestError(f"Delta inválido: {e}")
+        else:
+            raise RequestError("Falta 'project' o 'graph'")
+        return network, self.add_graph(network)
+
+    async def handle(self, method, path, body):
+        """Atiende un pedido ya decodificado y devuelve el diccionario de respuesta"""
+        if path == "/health" and method == "GET":
+            return {'status': 'ok', 'algorithms': list(SOLVERS), 'graphs': len(self.graphs),
+                    **self.batcher.counters}
+        if path == "/graphs" and method == "GET":
+            return {'graphs': [{'graph': graph_id, 'nodes': net.num_nodes, 'arcs': net.num_arcs}
+                               for graph_id, net in self.graphs.items()]}
+        if path == "/graphs" and method == "POST":
+            network, graph_id = self.network_for(body)
+            return {'graph': graph_id, 'nodes': network.num_nodes, 'arcs': network.num_arcs}
+        if path == "/solve" and method == "POST":
+            return await self.solve(body)
+        if path in ("/health", "/graphs", "/solve"):
+            raise RequestError(f"Método no permitido: {method} {path}", 405)
+        raise RequestError(f"Ruta desconocida: {path}", 404)
+
+    async def solve(self, body):
+        algorithm = body.get("algorithm", "EDMONDS_KARP_BFS")
+        if algorithm not in SOLVERS:
+            raise RequestError(f"Algoritmo desconocido: {algorithm}")
+        network, graph_id = self.network_for(body)
+        if network.source not in network.index or network.sink not in network.index:
+            raise RequestError("La red no define fuente y sumidero")
+        entry, cached = await self.batcher.solve(network, algorithm, cache_key(network, algorithm))
+        response = {'graph': graph_id, 'algorithm': algorithm, 'max_flow': entry['max_flow'], 'cached': cached}
+        if 'chosen' in entry:
+            response.update(chosen=entry['chosen'], reason=entry['reason'])
+        include = body.get("include", ("arc_flows", "cut"))
+        for field in ("arc_flows", "cut", "routes"):
+            if field in include:
+                response[field] = entry[field]
+        return response
+
+    async def serve_connection(self, reader, writer):
+        """HTTP/1.1 mínimo con conexiones persistentes"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, _ = request_line.decode('latin-1').split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode('latin-1').partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                status, response = 200, None
+                if length > MAX_BODY:
+                    status, response = 413, {'error': "Pedido demasiado grande"}
+                    await reader.readexactly(length)
+                else:
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        response = await self.handle(method, path.split("?", 1)[0], decode_body(raw))
+                    except RequestError as e:
+                        status, response = e.status, {'error': str(e)}
+                    except Exception as e:
+                        status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+                payload = json.dumps(response).encode('utf-8')
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                             + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass  # conexión cortada o línea de pedido inválida: se cierra sin responder
+        except asyncio.CancelledError:
+            pass  # el servicio se está cerrando
+        finally:
+            writer.close()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None, workers=None, threads=False,
+                ready=None):
+    """Corre el servicio hasta que se cancela.
+
+    Con ``unix_path`` escucha en ese socket Unix en lugar de TCP. Solo se
+    aceptan direcciones locales. ``ready(descripción)`` se llama al empezar
+    a escuchar.
+    """
+    if unix_path is None and host not in LOCAL_HOSTS:
+        raise ValueError(f"El servicio solo escucha en la máquina local, no en {host}")
+    service = FlowService(workers, threads)
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.serve_connection, path=unix_path)
+        where = f"unix:{unix_path}"
+    else:
+        server = await asyncio.start_server(service.serve_connection, host, port)
+        where = "http://{}:{}".format(*server.sockets[0].getsockname()[:2])
+    loop = asyncio.get_running_loop()
+    dispatcher = loop.create_task(service.batcher.run())
+    try:
+        # SIGTERM cierra ordenadamente (y con él los procesos de trabajo)
+        loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):
+        pass  # Windows: solo Ctrl+C
+    if ready:
+        ready(where)
+    try:
+        async with server:
+            await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        dispatcher.cancel()
+        service.close()
+        if unix_path is not None and os.path.exists(unix_path):
+            os.remove(unix_path)
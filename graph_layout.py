@@ -0,0 +1,293 @@
+"""Distribución automática de nodos para redes importadas o generadas.
+
+Las funciones reciben una ``FlowNetwork`` y devuelven las coordenadas
+``(xs, ys)`` alineadas con sus índices de nodo, en píxeles del canvas. No
+dependen de tkinter, así que pueden ejecutarse en un hilo de fondo o desde
+la línea de comandos.
+
+- ``layered_layout``: capas tipo Sugiyama en el sentido fuente → sumidero,
+  con barridos de baricentro para reducir cruces.
+- ``force_layout``: dirigido por fuerzas (Fruchterman-Reingold) con la
+  repulsión aproximada por los centros de masa de una grilla de celdas;
+  usa NumPy si está instalado y cae a Python puro si no.
+"""
+import math
+import random
+from array import array
+from collections import deque
+
+LAYER_GAP = 160  # separación horizontal entre capas (px)
+NODE_GAP = 90    # separación vertical entre nodos de una capa (px)
+MARGIN = 60
+
+
+def grid_layout(network, spacing=NODE_GAP, margin=MARGIN):
+    """Grilla cuadrada en orden de índice (respaldo para redes sin posiciones)"""
+    n = network.num_nodes
+    columns = max(1, math.ceil(math.sqrt(n)))
+    xs = array('d', (margin + (i % columns) * spacing for i in range(n)))
+    ys = array('d', (margin + (i // columns) * spacing for i in range(n)))
+    return xs, ys
+
+
+def undirected_neighbors(network):
+    """Vecinos de cada nodo sin importar el sentido del arco (formato CSR)"""
+    out_start, out_arcs, in_start, in_arcs = network.arcs_by_node()
+    tails, heads = network.tails, network.heads
+
+    def neighbors(v):
+        for k in range(out_start[v], out_start[v + 1]):
+            yield heads[out_arcs[k]], 1
+        for k in range(in_start[v], in_start[v + 1]):
+            yield tails[in_arcs[k]], -1
+
+    return neighbors
+
+
+def assign_layers(network, neighbors):
+    """Capa de cada nodo: distancia BFS desde la fuente por arcos hacia adelante.
+
+    Los nodos que la fuente no alcanza se cuelgan de un vecino ya ubicado
+    (una capa después si el arco sale de él, una antes si entra) y las
+    componentes aisladas empiezan en la capa 0. El sumidero va a la última.
+    """
+    n = network.num_nodes
+    layer = [-1] * n
+    start = network.source_index
+    # Raíces: la fuente y luego los nodos sin arcos de entrada
+    roots = [start] if start is not None else []
+    roots += sorted(range(n), key=lambda v: any(d < 0 for _, d in neighbors(v)))
+
+    for root in roots:
+        if layer[root] >= 0:
+            continue
+        layer[root] = 0
+        placed = [root]
+        # Primero solo hacia adelante, luego en ambos sentidos para lo que falte
+        for forward_only in (True, False):
+            queue = deque(placed)
+            while queue:
+                u = queue.popleft()
+                for v, direction in neighbors(u):
+                    if layer[v] < 0 and (direction > 0 or not forward_only):
+                        layer[v] = max(0, layer[u] + direction)
+                        placed.append(v)
+                        queue.append(v)
+
+    sink = network.sink_index
+    if sink is not None:
+        others = max((layer[v] for v in range(n) if v != sink), default=-1)
+        if others >= layer[sink]:
+            layer[sink] = others + 1
+    return layer
+
+
+def layered_layout(network, layer_gap=LAYER_GAP, node_gap=NODE_GAP, margin=MARGIN, sweeps=4):
+    """Distribución por capas de izquierda (fuente) a derecha (sumidero)"""
+    n = network.num_nodes
+    if n == 0:
+        return array('d'), array('d')
+    neighbors = undirected_neighbors(network)
+    layer = assign_layers(network, neighbors)
+
+    layers = [[] for _ in range(max(layer) + 1)]
+    for v in range(n):
+        layers[layer[v]].append(v)
+    position = [0.0] * n
+    for members in layers:
+        for i, v in enumerate(members):
+            position[v] = i
+
+    # Barridos de baricentro: cada nodo se ordena por la posición media de
+    # sus vecinos en capas anteriores (bajando) o posteriores (subiendo).
+    for sweep in range(sweeps):
+        downward = sweep % 2 == 0
+        order = layers[1:] if downward else layers[-2::-1]
+        for members in order:
+            keys = {}
+            for v in members:
+                total = count = 0
+                for w, _ in neighbors(v):
+                    if (layer[w] < layer[v]) if downward else (layer[w] > layer[v]):
+                        total += position[w]
+                        count += 1
+                keys[v] = total / count if count else position[v]
+            members.sort(key=keys.__getitem__)
+            for i, v in enumerate(members):
+                position[v] = i
+
+    tallest = max(len(members) for members in layers)
+    xs = array('d', [0.0]) * n
+    ys = array('d', [0.0]) * n
+    for l, members in enumerate(layers):
+        offset = (tallest - len(members)) / 2
+        for i, v in enumerate(members):
+            xs[v] = margin + l * layer_gap
+            ys[v] = margin + (offset + i) * node_gap
+    return xs, ys
+
+
+def initial_positions(network, seed):
+    """Posiciones de partida en unidades de la distancia ideal (k = 1)"""
+    n = network.num_nodes
+    side = math.sqrt(n)
+    rng = random.Random(seed)
+    xs, ys = network.xs, network.ys
+    if xs is not None and ys is not None and n > 1 and len(set(zip(xs, ys))) == n:
+        # Se parte de la distribución actual normalizada al área ideal
+        min_x, min_y = min(xs), min(ys)
+        span = max(max(xs) - min_x, max(ys) - min_y) or 1.0
+        return ([(x - min_x) / span * side for x in xs], [(y - min_y) / span * side for y in ys])
+    return [rng.random() * side for _ in range(n)], [rng.random() * side for _ in range(n)]
+
+
+def fit_to_canvas(px, py, node_gap, margin):
+    """Traslada y escala las posiciones (k = 1) a píxeles con margen"""
+    min_x = min(px, default=0.0)
+    min_y = min(py, default=0.0)
+    xs = array('d', (margin + (x - min_x) * node_gap for x in px))
+    ys = array('d', (margin + (y - min_y) * node_gap for y in py))
+    return xs, ys
+
+
+def force_layout(network, iterations=60, node_gap=NODE_GAP, margin=MARGIN, seed=0):
+    """Distribución dirigida por fuerzas con repulsión aproximada por grilla.
+
+    El plano se divide en celdas de lado 2k y cada nodo es repelido por el
+    centro de masa de su celda y de las 8 vecinas (con peso igual a la
+    cantidad de nodos), como un Barnes-Hut de un solo nivel: cada iteración
+    cuesta O(V + E) aunque los nodos se amontonen.
+    """
+    n = network.num_nodes
+    if n == 0:
+        return array('d'), array('d')
+    px, py = initial_positions(network, seed)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        px, py = force_iterations_numpy(np, network, px, py, iterations)
+    else:
+        force_iterations_python(network, px, py, iterations)
+    return fit_to_canvas(px, py, node_gap, margin)
+
+
+NEIGHBOR_CELLS = [(ox, oy) for ox in (-1, 0, 1) for oy in (-1, 0, 1)]
+
+
+def force_iterations_python(network, px, py, iterations):
+    n, m = network.num_nodes, network.num_arcs
+    tails, heads = network.tails, network.heads
+    temperature = math.sqrt(n) / 10 + 1.0
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        dx = [0.0] * n
+        dy = [0.0] * n
+        # Repulsión: masa y suma de posiciones de cada celda
+        cells = {}
+        node_cell = []
+        for v in range(n):
+            key = (int(px[v] // 2), int(py[v] // 2))
+            node_cell.append(key)
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [1, px[v], py[v]]
+            else:
+                cell[0] += 1
+                cell[1] += px[v]
+                cell[2] += py[v]
+        for v in range(n):
+            cx, cy = node_cell[v]
+            for ox, oy in NEIGHBOR_CELLS:
+                cell = cells.get((cx + ox, cy + oy))
+                if cell is None:
+                    continue
+                count, sx, sy = cell
+                if ox == 0 and oy == 0:  # el propio nodo no se repele a sí mismo
+                    count, sx, sy = count - 1, sx - px[v], sy - py[v]
+                    if not count:
+                        continue
+                ddx, ddy = px[v] - sx / count, py[v] - sy / count
+                push = count / (ddx * ddx + ddy * ddy or 1e-4)
+                dx[v] += ddx * push
+                dy[v] += ddy * push
+        # Atracción a lo largo de los arcos (sin importar el sentido)
+        for a in range(m):
+            u, v = tails[a], heads[a]
+            ddx, ddy = px[v] - px[u], py[v] - py[u]
+            d = math.sqrt(ddx * ddx + ddy * ddy)
+            dx[u] += ddx * d
+            dy[u] += ddy * d
+            dx[v] -= ddx * d
+            dy[v] -= ddy * d
+        for v in range(n):
+            length = math.sqrt(dx[v] * dx[v] + dy[v] * dy[v])
+            if length > 0:
+                step = min(length, temperature) / length
+                px[v] += dx[v] * step
+                py[v] += dy[v] * step
+        temperature -= cooling
+
+
+def force_iterations_numpy(np, network, px, py, iterations):
+    n = network.num_nodes
+    pos = np.column_stack((np.asarray(px, dtype=float), np.asarray(py, dtype=float)))
+    tails = np.asarray(network.tails, dtype=np.int64)
+    heads = np.asarray(network.heads, dtype=np.int64)
+    temperature = math.sqrt(n) / 10 + 1.0
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+
+        # Repulsión: masa y suma de posiciones por celda (celdas ordenadas)
+        cell = np.floor(pos / 2.0).astype(np.int64)
+        cell -= cell.min(axis=0) - 1
+        stride = int(cell[:, 1].max()) + 2
+        key = cell[:, 0] * stride + cell[:, 1]
+        keys, slot_of = np.unique(key, return_inverse=True)
+        mass = np.bincount(slot_of).astype(float)
+        sum_x = np.bincount(slot_of, weights=pos[:, 0])
+        sum_y = np.bincount(slot_of, weights=pos[:, 1])
+        for ox, oy in NEIGHBOR_CELLS:
+            target = key + ox * stride + oy
+            slot = np.minimum(np.searchsorted(keys, target), len(keys) - 1)
+            count = np.where(keys[slot] == target, mass[slot], 0.0)
+            sx, sy = sum_x[slot], sum_y[slot]
+            if ox == 0 and oy == 0:  # el propio nodo no se repele a sí mismo
+                count = count - 1
+                sx, sy = sx - pos[:, 0], sy - pos[:, 1]
+            valid = count > 0
+            safe = np.where(valid, count, 1.0)
+            delta = pos - np.column_stack((sx / safe, sy / safe))
+            d2 = np.maximum((delta * delta).sum(axis=1), 1e-4)
+            disp += delta * np.where(valid, count / d2, 0.0)[:, None]
+
+        # Atracción a lo largo de los arcos (sin importar el sentido)
+        delta = pos[heads] - pos[tails]
+        pull = delta * np.sqrt((delta * delta).sum(axis=1))[:, None]
+        for axis in (0, 1):
+            disp[:, axis] += np.bincount(tails, weights=pull[:, axis], minlength=n)
+            disp[:, axis] -= np.bincount(heads, weights=pull[:, axis], minlength=n)
+
+        length = np.sqrt((disp * disp).sum(axis=1))
+        step = np.where(length > 0, np.minimum(length, temperature) / np.maximum(length, 1e-12), 0.0)
+        pos += disp * step[:, None]
+        temperature -= cooling
+    return pos[:, 0].tolist(), pos[:, 1].tolist()
+
+
+# Distribuciones disponibles: nombre -> función(network) -> (xs, ys)
+LAYOUTS = {
+    "CAPAS": layered_layout,
+    "FUERZAS": force_layout,
+    "GRILLA": grid_layout,
+}
+
+
+def apply_layout(network, name="CAPAS"):
+    """Calcula la distribución ``name`` y la guarda en ``network.xs/ys``"""
+    if name not in LAYOUTS:
+        raise ValueError(f"Distribución desconocida: {name}")
+    network.xs, network.ys = LAYOUTS[name](network)
+    return network
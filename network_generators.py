@@ -0,0 +1,226 @@
+"""Generadores de redes de flujo sintéticas con semilla (reproducibles).
+
+Cada generador recibe un tamaño aproximado en nodos y una semilla y
+devuelve una ``FlowNetwork`` con fuente y sumidero definidos. Se usan en
+las pruebas de rendimiento y sirven para armar instancias de ejemplo.
+"""
+import math
+import random
+from array import array
+
+from flow_engine import FlowNetwork
+
+
+def build_network(n, arcs, capacities, source, sink):
+    """Arma la red con IDs 1..n a partir de pares (origen, destino) por índice"""
+    tails = array('q', (u for u, _ in arcs))
+    heads = array('q', (v for _, v in arcs))
+    types = ['transship'] * n
+    types[source] = 'source'
+    types[sink] = 'sink'
+    return FlowNetwork(range(1, n + 1), tails, heads, capacities, source=source + 1, sink=sink + 1,
+                       node_types=types, node_counter=n + 1)
+
+
+def layered_grid(size, seed=0, max_capacity=100):
+    """Grilla por capas: cada nodo conecta con hasta 3 vecinos de la capa siguiente"""
+    rng = random.Random(seed)
+    side = max(2, int(math.sqrt(max(size - 2, 4))))
+    n = side * side + 2
+    s, t = 0, n - 1
+
+    def node(layer, row):
+        return 1 + layer * side + row
+
+    arcs = [(s, node(0, row)) for row in range(side)]
+    for layer in range(side - 1):
+        for row in range(side):
+            for other in (row - 1, row, row + 1):
+                if 0 <= other < side:
+                    arcs.append((node(layer, row), node(layer + 1, other)))
+    arcs += [(node(side - 1, row), t) for row in range(side)]
+    capacities = array('q', (rng.randint(1, max_capacity) for _ in arcs))
+    return build_network(n, arcs, capacities, s, t)
+
+
+def random_graph(size, arcs_per_node, seed=0, max_capacity=100):
+    """Grafo aleatorio con ``arcs_per_node`` arcos por nodo en promedio (sin lazos)"""
+    rng = random.Random(seed)
+    n = max(2, size)
+    m = int(n * arcs_per_node)
+    arcs = []
+    while len(arcs) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            arcs.append((u, v))
+    capacities = array('q', (rng.randint(1, max_capacity) for _ in arcs))
+    return build_network(n, arcs, capacities, 0, n - 1)
+
+
+def random_sparse(size, seed=0):
+    return random_graph(size, 4, seed)
+
+
+def random_dense(size, seed=0):
+    """Aproximadamente la cuarta parte de todos los pares posibles"""
+    return random_graph(size, max(1, (size - 1) / 4), seed)
+
+
+def ak_network(size, seed=0):
+    """Familia tipo AK, difícil para caminos aumentantes.
+
+    Una cadena s → v1 → … → vk con un arco de capacidad 1 desde cada vi al
+    sumidero: Edmonds-Karp necesita k aumentos de largo 2, 3, …, k+1, lo
+    que da trabajo cuadrático aunque la red sea lineal. La semilla no se
+    usa (la instancia es determinista).
+    """
+    k = max(1, size - 2)
+    n = k + 2
+    s, t = 0, n - 1
+    arcs = [(s, 1)]
+    capacities = array('q', [k])
+    for i in range(1, k + 1):
+        arcs.append((i, t))
+        capacities.append(1)
+        if i < k:
+            arcs.append((i, i + 1))
+            capacities.append(k - i)
+    return build_network(n, arcs, capacities, s, t)
+
+
+def bipartite_matching(size, seed=0, degree=3):
+    """Emparejamiento bipartito: s → L → R → t con capacidades unitarias"""
+    rng = random.Random(seed)
+    half = max(1, (size - 2) // 2)
+    n = 2 * half + 2
+    s, t = 0, n - 1
+    arcs = [(s, 1 + i) for i in range(half)]
+    for i in range(half):
+        for j in rng.sample(range(half), min(degree, half)):
+            arcs.append((1 + i, 1 + half + j))
+    arcs += [(1 + half + j, t) for j in range(half)]
+    return build_network(n, arcs, array('q', [1]) * len(arcs), s, t)
+
+
+def grid_network(source_caps, sink_caps, horizontal, vertical):
+    """Red de grilla tipo segmentación de imágenes a partir de arreglos 2-D.
+
+    Cada celda (i, j) de una imagen h×w es un nodo. ``source_caps[i][j]`` y
+    ``sink_caps[i][j]`` son las capacidades de los arcos fuente → celda y
+    celda → sumidero (0 = sin arco). ``horizontal`` (h×(w-1)) y
+    ``vertical`` ((h-1)×w) dan la capacidad entre celdas vecinas, en ambos
+    sentidos; un número vale para todas. Acepta listas de listas o arreglos
+    NumPy y arma la red de una vez, sin pasar por el editor. Los IDs son
+    1 + i·w + j para las celdas, h·w+1 para la fuente y h·w+2 para el
+    sumidero.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        h, w = np.shape(source_caps)
+        tails, heads, capacities = grid_arcs_numpy(np, h, w, source_caps, sink_caps, horizontal, vertical)
+    else:
+        h, w = len(source_caps), len(source_caps[0]) if source_caps else 0
+        tails, heads, capacities = grid_arcs_python(h, w, source_caps, sink_caps, horizontal, vertical)
+    n = h * w + 2
+    types = ['transship'] * n
+    types[h * w] = 'source'
+    types[h * w + 1] = 'sink'
+    return FlowNetwork(range(1, n + 1), tails, heads, capacities, source=h * w + 1, sink=h * w + 2,
+                       node_types=types, node_counter=n + 1)
+
+
+def grid_arcs_numpy(np, h, w, source_caps, sink_caps, horizontal, vertical):
+    cells = np.arange(h * w, dtype=np.int64).reshape(h, w)
+    s, t = h * w, h * w + 1
+    pieces = []  # (colas, cabezas, capacidades) por tipo de arco
+
+    def add(tails, heads, caps):
+        tails, heads, caps = np.broadcast_arrays(tails, heads, np.asarray(caps))
+        keep = caps > 0
+        pieces.append((tails[keep], heads[keep], caps[keep]))
+
+    add(np.int64(s), cells, source_caps)
+    add(cells, np.int64(t), sink_caps)
+    for a, b, caps in ((cells[:, :-1], cells[:, 1:], horizontal), (cells[:-1, :], cells[1:, :], vertical)):
+        add(a, b, caps)
+        add(b, a, caps)
+    tails = np.concatenate([p[0] for p in pieces])
+    heads = np.concatenate([p[1] for p in pieces])
+    capacities = np.concatenate([p[2] for p in pieces])
+    # Se devuelven arrays de la biblioteca estándar (el motor los indexa elemento a elemento)
+    integral = np.issubdtype(capacities.dtype, np.integer)
+    return to_array(np, tails, 'q'), to_array(np, heads, 'q'), to_array(np, capacities, 'q' if integral else 'd')
+
+
+def to_array(np, values, typecode):
+    """Copia un arreglo NumPy a un ``array`` de enteros de 64 bits ('q') o dobles ('d')"""
+    result = array(typecode)
+    result.frombytes(values.astype(np.int64 if typecode == 'q' else np.float64).tobytes())
+    return result
+
+
+def grid_arcs_python(h, w, source_caps, sink_caps, horizontal, vertical):
+    s, t = h * w, h * w + 1
+    tails, heads, capacities = [], [], []
+
+    def cap(values, i, j):
+        return values if isinstance(values, (int, float)) else values[i][j]
+
+    def add(u, v, c):
+        if c > 0:
+            tails.append(u)
+            heads.append(v)
+            capacities.append(c)
+
+    for i in range(h):
+        for j in range(w):
+            add(s, i * w + j, source_caps[i][j])
+    for i in range(h):
+        for j in range(w):
+            add(i * w + j, t, sink_caps[i][j])
+    # Mismo orden que la versión NumPy: cada dirección en bloque, ida y luego vuelta
+    for values, di, dj in ((horizontal, 0, 1), (vertical, 1, 0)):
+        pairs = [(i * w + j, (i + di) * w + j + dj, cap(values, i, j))
+                 for i in range(h - di) for j in range(w - dj)]
+        for u, v, c in pairs:
+            add(u, v, c)
+        for u, v, c in pairs:
+            add(v, u, c)
+    typecode = 'q' if all(isinstance(c, int) for c in capacities) else 'd'
+    return array('q', tails), array('q', heads), array(typecode, capacities)
+
+
+def segmentation_grid(size, seed=0, smoothness=20):
+    """Grilla de segmentación con una "imagen" aleatoria de ~``size`` píxeles.
+
+    Una región central clara sobre fondo oscuro, con ruido: los píxeles
+    claros se ligan a la fuente y los oscuros al sumidero, y los vecinos
+    se unen con capacidad ``smoothness``.
+    """
+    rng = random.Random(seed)
+    side = max(2, int(math.sqrt(max(size - 2, 4))))
+    image = [[(200 if side / 4 <= i < 3 * side / 4 and side / 4 <= j < 3 * side / 4 else 50)
+              + rng.randint(-40, 40) for j in range(side)] for i in range(side)]
+    source_caps = [[value for value in row] for row in image]
+    sink_caps = [[255 - value for value in row] for row in image]
+    return grid_network(source_caps, sink_caps, smoothness, smoothness)
+
+
+# Generadores disponibles: nombre -> función(tamaño, semilla) -> FlowNetwork
+GENERATORS = {
+    "layered_grid": layered_grid,
+    "random_sparse": random_sparse,
+    "random_dense": random_dense,
+    "ak": ak_network,
+    "bipartite": bipartite_matching,
+    "grid": segmentation_grid,
+}
+
+
+def generate_network(name, size, seed=0):
+    if name not in GENERATORS:
+        raise ValueError(f"Generador desconocido: {name}")
+    return GENERATORS[name](size, seed)
@@ -0,0 +1,698 @@
+"""Lectura y escritura de proyectos sin pasar por el canvas.
+
+Los proyectos JSON del editor se leen en streaming: los arreglos ``nodes`` y
+``edges`` se recorren elemento a elemento y se vuelcan directo a las
+columnas de una ``FlowNetwork``, sin armar el documento completo en memoria.
+
+Para redes muy grandes existe además un formato binario compacto (``.rdfb``):
+una cabecera fija seguida de los arreglos crudos de nodos y arcos, que se
+abren con ``mmap`` y se entregan al motor como vistas de memoria sin copiar.
+El formato se detecta automáticamente por la cabecera del archivo.
+
+También se importan y exportan los formatos estándar de instancias grandes:
+DIMACS max-flow (``p max`` / ``n ... s|t`` / ``a u v cap``) y listas de arcos
+en CSV. Ambos se leen línea por línea directo a arreglos compactos. Las
+capacidades de nodo, que esos formatos no contemplan, viajan en líneas de
+extensión: ``c nodecap ID CAP`` en DIMACS y ``# node_capacity=ID:CAP`` en
+CSV (otras herramientas las ignoran como comentarios).
+"""
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+
+from flow_engine import FlowNetwork
+from graph_layout import grid_layout
+from result_log import write_chunked
+
+READ_CHUNK = 1 << 16  # caracteres leídos por bloque
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JsonStreamReader:
+    """Lector incremental de JSON sobre un archivo de texto.
+
+    Usa ``JSONDecoder.raw_decode`` sobre un buffer que se rellena a medida
+    que hace falta, de modo que cada valor se decodifica con el escáner en C
+    sin cargar el archivo entero.
+    """
+
+    def __init__(self, f, chunk_size=READ_CHUNK):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Descarta lo ya consumido y agrega un bloque; False al final del archivo"""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Devuelve el próximo carácter significativo ('' al final)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON inválido: se esperaba '{char}' y se encontró '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decodifica el próximo valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # Un número al borde del buffer podría continuar en el próximo bloque
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_project(f, stream_keys=("nodes", "edges")):
+    """Recorre un proyecto JSON produciendo pares ``(clave, valor)``.
+
+    Para las claves de ``stream_keys`` se produce un par por cada elemento
+    del arreglo; el resto de las claves se produce con su valor completo.
+    """
+    reader = JsonStreamReader(f)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key in stream_keys and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, reader.value()
+                    sep = reader.peek()
+                    reader.pos += 1
+                    if sep == ']':
+                        break
+                    if sep != ',':
+                        raise ValueError(f"JSON inválido en '{key}': se encontró '{sep}'")
+        else:
+            yield key, reader.value()
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == '}':
+            return
+        if sep != ',':
+            raise ValueError(f"JSON inválido: se encontró '{sep}'")
+
+
+def read_project_json(file_path):
+    """Lee un proyecto del editor como FlowNetwork (con coordenadas y tipos).
+
+    Los nodos quedan ordenados por ID, igual que en ``FlowNetwork.from_editor``;
+    los arcos conservan el orden del archivo y se descartan los que apuntan a
+    nodos inexistentes, como hacía el cargador del editor.
+    """
+    with open(file_path, 'r') as f:
+        return network_from_items(iter_json_project(f))
+
+
+def network_from_project(data):
+    """Como ``read_project_json`` pero a partir del diccionario ya decodificado"""
+    items = [(key, value) for key, value in data.items() if key not in ("nodes", "edges")]
+    items += [(key, value) for key in ("nodes", "edges") for value in data.get(key, ())]
+    return network_from_items(items)
+
+
+def network_from_items(items):
+    """Arma la FlowNetwork a partir de pares (clave, valor) de un proyecto JSON"""
+    node_ids, labels, xs, ys, types, node_caps = [], {}, [], [], [], []
+    edge_u, edge_v, capacities = [], [], []
+    meta = {}
+    for key, value in items:
+        if key == "nodes":
+            node_ids.append(value['id'])
+            labels[value['id']] = value.get('label', str(value['id']))
+            xs.append(value.get('x', 0))
+            ys.append(value.get('y', 0))
+            types.append(value.get('type', 'transship'))
+            node_caps.append(value.get('capacity'))
+        elif key == "edges":
+            edge_u.append(value['u'])
+            edge_v.append(value['v'])
+            capacities.append(value['capacity'])
+        else:
+            meta[key] = value
+
+    order = sorted(range(len(node_ids)), key=node_ids.__getitem__)
+    sorted_ids = [node_ids[i] for i in order]
+    index = {node_id: i for i, node_id in enumerate(sorted_ids)}
+    tails, heads, caps = [], [], []
+    for u, v, cap in zip(edge_u, edge_v, capacities):
+        if u in index and v in index:
+            tails.append(index[u])
+            heads.append(index[v])
+            caps.append(cap)
+
+    return FlowNetwork(sorted_ids, tails, heads, caps,
+                       source=meta.get("source_id"), sink=meta.get("sink_id"), labels=labels,
+                       xs=[xs[i] for i in order], ys=[ys[i] for i in order],
+                       node_types=[types[i] for i in order],
+                       node_counter=meta.get("node_counter"),
+                       node_capacities=[node_caps[i] for i in order]
+                       if any(c is not None for c in node_caps) else None)
+
+
+def load_project_network(file_path):
+    """Carga un proyecto sin interfaz gráfica.
+
+    El binario se detecta por cabecera; DIMACS y CSV por extensión; el
+    resto se lee como JSON del editor.
+    """
+    if detect_project_format(file_path) == 'binary':
+        return read_project_binary(file_path)
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in DIMACS_EXTENSIONS:
+        return read_dimacs(file_path)
+    if extension == CSV_EXTENSION:
+        return read_edge_list_csv(file_path)
+    return read_project_json(file_path)
+
+
+# =========================================
+#    FORMATO BINARIO (.rdfb)
+# =========================================
+
+BINARY_MAGIC = b"RDFLUJO\x01"
+BINARY_EXTENSION = ".rdfb"
+# magic, versión, flags, n, m, índice fuente, índice sumidero, node_counter, largo de metadatos
+BINARY_HEADER = struct.Struct('<8sIIqqqqqQ')
+BINARY_VERSION = 1
+FLAG_FLOAT_CAPACITY = 1  # capacidades/flujos como float64 (si no, int64)
+FLAG_HAS_FLOWS = 2       # incluye el flujo actual de cada arco
+FLAG_HAS_COORDS = 4      # incluye coordenadas x/y de los nodos
+
+
+def detect_project_format(file_path):
+    """Devuelve 'binary' o 'json' según la cabecera del archivo"""
+    with open(file_path, 'rb') as f:
+        return 'binary' if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC else 'json'
+
+
+def write_array(f, typecode, values):
+    """Escribe un arreglo en little-endian, el orden que usa el formato binario"""
+    data = array(typecode, values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    data.tofile(f)
+
+
+def write_project_binary(network, file_path):
+    """Guarda la red en el formato binario compacto.
+
+    Secciones (todas de 8 bytes por elemento, en este orden): IDs de nodo,
+    origen y destino de cada arco (índices), capacidades, flujos (opcional),
+    x e y (opcional) y al final un JSON pequeño con las etiquetas y tipos
+    que difieren del valor por defecto y las capacidades de nodo.
+
+    Se escribe en un temporal de la misma carpeta que luego reemplaza al
+    destino: si la red vino de ese mismo archivo, su mmap sigue apuntando al
+    contenido anterior en lugar de quedar truncado.
+    """
+    n, m = network.num_nodes, network.num_arcs
+    float_values = any(isinstance(c, float) for c in network.capacities)
+    flows = network.flows
+    if flows is not None and not any(flows):
+        flows = None
+    if flows is not None and any(isinstance(x, float) for x in flows):
+        float_values = True
+    flags = FLAG_FLOAT_CAPACITY if float_values else 0
+    if flows is not None:
+        flags |= FLAG_HAS_FLOWS
+    if network.xs is not None and network.ys is not None:
+        flags |= FLAG_HAS_COORDS
+    value_code = 'd' if float_values else 'q'
+
+    labels = {str(nid): label for nid, label in network.labels.items()
+              if str(label) != str(nid) and nid in network.index}
+    types = {}
+    if network.node_types is not None:
+        types = {str(network.node_ids[i]): t for i, t in enumerate(network.node_types) if t != 'transship'}
+    meta = {"labels": labels, "types": types}
+    if network.limited_nodes():
+        meta["capacities"] = {str(network.node_ids[i]): network.node_capacities[i]
+                              for i in network.limited_nodes()}
+    meta = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    source_idx = network.index.get(network.source, -1)
+    sink_idx = network.index.get(network.sink, -1)
+    node_counter = network.node_counter if network.node_counter is not None else -1
+
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags, n, m,
+                                       source_idx, sink_idx, node_counter, len(meta)))
+            write_array(f, 'q', network.node_ids)
+            write_array(f, 'q', network.tails)
+            write_array(f, 'q', network.heads)
+            write_array(f, value_code, network.capacities)
+            if flows is not None:
+                write_array(f, value_code, flows)
+            if flags & FLAG_HAS_COORDS:
+                write_array(f, 'd', network.xs)
+                write_array(f, 'd', network.ys)
+            f.write(meta)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_project_binary(file_path):
+    """Abre un proyecto binario con mmap; los arreglos de arcos no se copian.
+
+    ``tails``, ``heads``, ``capacities`` (y ``flows``/``xs``/``ys``) quedan
+    como ``memoryview`` sobre el archivo mapeado, que permanece abierto
+    mientras la red esté en uso.
+    """
+    with open(file_path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapping) < BINARY_HEADER.size:
+        raise ValueError("Archivo binario truncado")
+    (magic, version, flags, n, m, source_idx, sink_idx,
+     node_counter, meta_len) = BINARY_HEADER.unpack_from(mapping, 0)
+    if magic != BINARY_MAGIC:
+        raise ValueError("No es un proyecto binario de redes de flujo")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Versión de formato binario no soportada: {version}")
+
+    view = memoryview(mapping)
+    offset = BINARY_HEADER.size
+
+    def take(typecode, count):
+        nonlocal offset
+        end = offset + 8 * count
+        if end > len(mapping):
+            raise ValueError("Archivo binario truncado")
+        section = view[offset:end].cast(typecode)
+        if sys.byteorder != 'little':
+            section = array(typecode, section.tobytes())
+            section.byteswap()
+        offset = end
+        return section
+
+    value_code = 'd' if flags & FLAG_FLOAT_CAPACITY else 'q'
+    node_ids = take('q', n).tolist()
+    tails = take('q', m)
+    heads = take('q', m)
+    capacities = take(value_code, m)
+    flows = take(value_code, m) if flags & FLAG_HAS_FLOWS else None
+    xs = ys = None
+    if flags & FLAG_HAS_COORDS:
+        xs = take('d', n)
+        ys = take('d', n)
+    meta = json.loads(bytes(view[offset:offset + meta_len]).decode('utf-8')) if meta_len else {}
+
+    labels = {node_id: str(node_id) for node_id in node_ids}
+    labels.update({int(k): v for k, v in meta.get("labels", {}).items()})
+    type_overrides = {int(k): v for k, v in meta.get("types", {}).items()}
+    node_types = [type_overrides.get(node_id, 'transship') for node_id in node_ids]
+    node_caps = {int(k): v for k, v in meta.get("capacities", {}).items()}
+
+    network = FlowNetwork(node_ids, tails, heads, capacities,
+                          source=node_ids[source_idx] if source_idx >= 0 else None,
+                          sink=node_ids[sink_idx] if sink_idx >= 0 else None,
+                          labels=labels, xs=xs, ys=ys, node_types=node_types,
+                          node_counter=node_counter if node_counter >= 0 else None,
+                          flows=flows,
+                          node_capacities=[node_caps.get(node_id) for node_id in node_ids] if node_caps else None)
+    network.mapping = mapping  # mantiene vivo el mmap que respalda las vistas
+    return network
+
+
+def iter_json_array(key, items, last=False):
+    """Genera un arreglo JSON elemento por elemento (formato de ``indent=4``)"""
+    yield f'    "{key}": ['
+    separator = "\n        "
+    for item in items:
+        yield separator + json.dumps(item, indent=4).replace("\n", "\n        ")
+        separator = ",\n        "
+    yield ("]" if separator == "\n        " else "\n    ]") + ("\n" if last else ",\n")
+
+
+def iter_project_json(network):
+    """Genera el JSON del editor por partes, sin armar el documento en memoria.
+
+    El texto es el mismo que produce ``json.dump(..., indent=4)``.
+    """
+    if network.xs is None or network.ys is None:
+        xs, ys = grid_layout(network)  # p. ej. una instancia DIMACS importada
+    else:
+        xs, ys = network.xs, network.ys
+    types = network.node_types or ['transship'] * network.num_nodes
+    node_ids, tails, heads, capacities = network.node_ids, network.tails, network.heads, network.capacities
+    node_counter = network.node_counter if network.node_counter is not None else max(node_ids, default=0) + 1
+    yield "{\n"
+    yield f'    "node_counter": {json.dumps(node_counter)},\n'
+    yield f'    "source_id": {json.dumps(network.source)},\n'
+    yield f'    "sink_id": {json.dumps(network.sink)},\n'
+    node_caps = network.node_capacities or [None] * network.num_nodes
+
+    def node_entry(i, nid):
+        entry = {"id": nid, "label": network.get_label(nid), "x": xs[i], "y": ys[i], "type": types[i]}
+        if node_caps[i] is not None:
+            entry["capacity"] = node_caps[i]  # solo los nodos con capacidad propia
+        return entry
+
+    yield from iter_json_array("nodes", (node_entry(i, nid) for i, nid in enumerate(node_ids)))
+    yield from iter_json_array("edges", ({"u": node_ids[tails[a]], "v": node_ids[heads[a]], "capacity": capacities[a]}
+                                         for a in range(network.num_arcs)), last=True)
+    yield "}"
+
+
+def write_project_json(network, file_path):
+    """Guarda la red con el esquema JSON del editor, escribiendo por bloques"""
+    with open(file_path, 'w') as f:
+        write_chunked(f, iter_project_json(network))
+
+
+def save_project(network, file_path):
+    """Guarda según la extensión: .rdfb, DIMACS (.max), CSV o JSON"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == BINARY_EXTENSION:
+        write_project_binary(network, file_path)
+    elif extension in DIMACS_EXTENSIONS:
+        write_dimacs(network, file_path)
+    elif extension == CSV_EXTENSION:
+        write_edge_list_csv(network, file_path)
+    else:
+        write_project_json(network, file_path)
+
+
+# =========================================
+#    FORMATOS ESTÁNDAR (DIMACS, CSV)
+# =========================================
+
+DIMACS_EXTENSIONS = (".max", ".dimacs", ".dmx")
+CSV_EXTENSION = ".csv"
+DIMACS_NODE_CAPACITY = "c nodecap"    # extensión: c nodecap ID CAPACIDAD
+CSV_NODE_CAPACITY = "node_capacity"   # extensión: # node_capacity=ID:CAPACIDAD
+# Extensiones que ``load_project_network`` sabe abrir (para recorrer carpetas)
+PROJECT_EXTENSIONS = (".json", BINARY_EXTENSION) + DIMACS_EXTENSIONS + (CSV_EXTENSION,)
+
+
+def parse_capacity(text):
+    """Capacidad entera si es posible; si no, real"""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+class ArcColumns:
+    """Acumula arcos en arreglos compactos mientras se lee un archivo"""
+
+    def __init__(self):
+        self.tails = array('q')
+        self.heads = array('q')
+        self.capacities = array('q')
+
+    def append(self, tail, head, capacity):
+        if isinstance(capacity, float) and self.capacities.typecode == 'q':
+            self.capacities = array('d', self.capacities)
+        self.tails.append(tail)
+        self.heads.append(head)
+        self.capacities.append(capacity)
+
+
+def node_types_for(n, source_idx, sink_idx):
+    types = ['transship'] * n
+    if source_idx is not None:
+        types[source_idx] = 'source'
+    if sink_idx is not None:
+        types[sink_idx] = 'sink'
+    return types
+
+
+def read_dimacs(file_path):
+    """Importa una instancia DIMACS de flujo máximo leyendo línea por línea.
+
+    Los nodos se numeran 1..n como en el archivo y los arcos quedan en
+    arreglos compactos. El archivo no trae posiciones (``xs``/``ys`` quedan
+    en None): se calculan con ``graph_layout`` cuando hace falta dibujar.
+    """
+    n = None
+    source = sink = None
+    columns = ArcColumns()
+    node_capacities = {}
+    with open(file_path, 'r') as f:
+        for line_no, line in enumerate(f, 1):
+            kind = line[:1]
+            if kind == 'a':
+                parts = line.split()
+                if len(parts) < 4:
+                    raise ValueError(f"Línea {line_no}: arco incompleto")
+                try:
+                    u, v = int(parts[1]), int(parts[2])
+                except ValueError:
+                    raise ValueError(f"Línea {line_no}: extremos del arco inválidos")
+                if n is None or not (1 <= u <= n and 1 <= v <= n):
+                    raise ValueError(f"Línea {line_no}: nodo fuera de rango")
+                columns.append(u - 1, v - 1, parse_capacity(parts[3]))
+            elif kind == 'p':
+                parts = line.split()
+                if len(parts) < 4 or parts[1] != 'max':
+                    raise ValueError(f"Línea {line_no}: se esperaba 'p max NODOS ARCOS'")
+                n = int(parts[2])
+            elif kind == 'n':
+                parts = line.split()
+                if len(parts) < 3:
+                    raise ValueError(f"Línea {line_no}: descriptor de nodo incompleto")
+                try:
+                    node = int(parts[1])
+                except ValueError:
+                    raise ValueError(f"Línea {line_no}: nodo inválido '{parts[1]}'")
+                if n is None or not 1 <= node <= n:
+                    raise ValueError(f"Línea {line_no}: nodo fuera de rango")
+                if parts[2] == 's':
+                    source = node
+                elif parts[2] == 't':
+                    sink = node
+                else:
+                    raise ValueError(f"Línea {line_no}: se esperaba 's' o 't', no '{parts[2]}'")
+            elif line.startswith(DIMACS_NODE_CAPACITY):
+                parts = line.split()
+                if len(parts) < 4:
+                    raise ValueError(f"Línea {line_no}: capacidad de nodo incompleta")
+                node = int(parts[2])
+                if n is None or not 1 <= node <= n:
+                    raise ValueError(f"Línea {line_no}: nodo fuera de rango")
+                node_capacities[node - 1] = parse_capacity(parts[3])
+            # Los demás comentarios ('c') y las líneas vacías se ignoran
+    if n is None:
+        raise ValueError("Falta la línea 'p max' del formato DIMACS")
+
+    return FlowNetwork(range(1, n + 1), columns.tails, columns.heads, columns.capacities,
+                       source=source, sink=sink,
+                       node_types=node_types_for(n, source - 1 if source else None, sink - 1 if sink else None),
+                       node_counter=n + 1, node_capacities=capacity_list(n, node_capacities))
+
+
+def capacity_list(n, node_capacities):
+    """Capacidades de nodo alineadas con los índices (None si ninguno tiene)"""
+    if not node_capacities:
+        return None
+    return [node_capacities.get(i) for i in range(n)]
+
+
+def write_dimacs(network, file_path):
+    """Exporta la red en formato DIMACS (nodos renumerados 1..n por índice)"""
+    with open(file_path, 'w') as f:
+        f.write("c Red exportada desde el editor de redes de flujo\n")
+        f.write(f"p max {network.num_nodes} {network.num_arcs}\n")
+        if network.source in network.index:
+            f.write(f"n {network.source_index + 1} s\n")
+        if network.sink in network.index:
+            f.write(f"n {network.sink_index + 1} t\n")
+        for i in network.limited_nodes():
+            f.write(f"{DIMACS_NODE_CAPACITY} {i + 1} {network.node_capacities[i]}\n")
+        tails, heads, capacities = network.tails, network.heads, network.capacities
+        write_chunked(f, (f"a {tails[a] + 1} {heads[a] + 1} {capacities[a]}\n" for a in range(network.num_arcs)))
+
+
+def read_edge_list_csv(file_path, source=None, sink=None):
+    """Importa una lista de arcos CSV (``origen,destino,capacidad``).
+
+    Los nodos pueden ser números o nombres; los nombres (o números que
+    chocan al convertirlos, como "01" y "1") pasan a ser etiquetas y reciben
+    IDs 1..n en orden de aparición. La fuente y el sumidero se leen de
+    líneas ``# source=X`` / ``# sink=Y`` o de los argumentos y las
+    capacidades de nodo de líneas ``# node_capacity=X:CAP``. Los nodos
+    nombrados en esas líneas existen aunque no tengan arcos (una fuente
+    aislada, por ejemplo). Una primera fila no numérica se toma como
+    encabezado.
+    """
+    ids = {}
+    columns = ArcColumns()
+    directives = {}
+    capacity_lines = []  # (nombre, capacidad)
+    header_allowed = True
+
+    def node_index(name):
+        index = ids.get(name)
+        if index is None:
+            index = ids[name] = len(ids)
+        return index
+
+    with open(file_path, 'r', newline='') as f:
+        for line_no, row in enumerate(csv.reader(f), 1):
+            if not row or not row[0].strip():
+                continue
+            first = row[0].strip()
+            if first.startswith('#'):
+                key, _, value = first.lstrip('#').partition('=')
+                if key.strip() in ('source', 'sink'):
+                    directives[key.strip()] = value.strip()
+                elif key.strip() == CSV_NODE_CAPACITY:
+                    name, _, capacity = value.strip().rpartition(':')
+                    try:
+                        capacity_lines.append((name.strip(), parse_capacity(capacity.strip())))
+                    except ValueError:
+                        raise ValueError(f"Línea {line_no}: capacidad de nodo inválida '{value.strip()}'")
+                continue
+            if len(row) < 3:
+                raise ValueError(f"Línea {line_no}: se esperaban origen, destino y capacidad")
+            try:
+                capacity = parse_capacity(row[2].strip())
+            except ValueError:
+                if header_allowed:
+                    header_allowed = False
+                    continue  # encabezado
+                raise ValueError(f"Línea {line_no}: capacidad inválida '{row[2]}'")
+            header_allowed = False
+            columns.append(node_index(first), node_index(row[1].strip()), capacity)
+
+    # Las directivas también declaran nodos: así vuelve una fuente o un sumidero sin arcos
+    for name in [directives.get('source'), directives.get('sink')] + [name for name, _ in capacity_lines]:
+        if name is not None:
+            node_index(name)
+
+    names = list(ids)
+    node_ids = list(range(1, len(names) + 1))
+    if all(name.lstrip('-').isdigit() for name in names):
+        numbers = [int(name) for name in names]
+        # "01" y "1" son nodos distintos: solo se usan los números si no chocan
+        if len(set(numbers)) == len(numbers):
+            node_ids = numbers
+    labels = {node_id: name for node_id, name in zip(node_ids, names)}
+
+    def resolve(name):
+        if name is None:
+            return None
+        name = str(name)
+        if name not in ids:
+            raise ValueError(f"El nodo '{name}' no aparece en la lista de arcos")
+        return node_ids[ids[name]]
+
+    source_id = resolve(source if source is not None else directives.get('source'))
+    sink_id = resolve(sink if sink is not None else directives.get('sink'))
+    capacity_ids = {resolve(name): capacity for name, capacity in capacity_lines}
+
+    # FlowNetwork espera los nodos ordenados por ID: se reordenan los índices
+    order = sorted(range(len(node_ids)), key=node_ids.__getitem__)
+    if order != list(range(len(order))):
+        new_index = array('q', [0]) * len(order)
+        for new, old in enumerate(order):
+            new_index[old] = new
+        columns.tails = array('q', (new_index[u] for u in columns.tails))
+        columns.heads = array('q', (new_index[v] for v in columns.heads))
+        node_ids = [node_ids[i] for i in order]
+
+    n = len(node_ids)
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    node_capacities = {index[node_id]: capacity for node_id, capacity in capacity_ids.items()}
+    return FlowNetwork(node_ids, columns.tails, columns.heads, columns.capacities,
+                       source=source_id, sink=sink_id, labels=labels,
+                       node_types=node_types_for(n, index.get(source_id), index.get(sink_id)),
+                       node_counter=max(node_ids, default=0) + 1,
+                       node_capacities=capacity_list(n, node_capacities))
+
+
+def write_edge_list_csv(network, file_path):
+    """Exporta la red como lista de arcos CSV con la fuente y el sumidero"""
+    node_ids = network.node_ids
+    with open(file_path, 'w', newline='') as f:
+        if network.source is not None:
+            f.write(f"# source={network.source}\n")
+        if network.sink is not None:
+            f.write(f"# sink={network.sink}\n")
+        for i in network.limited_nodes():
+            f.write(f"# {CSV_NODE_CAPACITY}={node_ids[i]}:{network.node_capacities[i]}\n")
+        writer = csv.writer(f)
+        writer.writerow(["u", "v", "capacity"])
+        tails, heads, capacities = network.tails, network.heads, network.capacities
+        writer.writerows((node_ids[tails[a]], node_ids[heads[a]], capacities[a]) for a in range(network.num_arcs))
+
+
+# =========================================
+#    MATRIZ DE INCIDENCIA DISPERSA
+# =========================================
+
+MATRIX_MARKET_EXTENSION = ".mtx"
+
+
+def write_matrix_market(matrix, file_path):
+    """Exporta una ``IncidenceMatrix`` en Matrix Market (coordinate, 1-based)"""
+    network = matrix.network
+    rows, cols = matrix.shape
+    with open(file_path, 'w') as f:
+        f.write("%%MatrixMarket matrix coordinate integer general\n")
+        f.write("% Matriz de incidencia: -1 en el nodo de salida, 1 en el de llegada\n")
+        f.write("% Filas: nodos ordenados por ID; columnas: arcos en el orden del proyecto\n")
+        f.write(f"% Fuente: {network.source}  Sumidero: {network.sink}\n")
+        f.write(f"{rows} {cols} {matrix.nnz}\n")
+        write_chunked(f, (f"{i + 1} {j + 1} {v}\n" for i, j, v in matrix.iter_triplets()))
+
+
+def write_incidence_triplets_csv(matrix, file_path):
+    """Exporta una ``IncidenceMatrix`` como tripletas CSV (nodo, arco, valor)"""
+    network = matrix.network
+    node_ids, tails, heads = network.node_ids, network.tails, network.heads
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["nodo", "arco", "desde", "hasta", "valor"])
+        writer.writerows((node_ids[i], j + 1, node_ids[tails[j]], node_ids[heads[j]], v)
+                         for i, j, v in matrix.iter_triplets())
+
+
+def write_incidence_matrix(matrix, file_path):
+    """Exporta en CSV de tripletas si la extensión es .csv; si no, en Matrix Market"""
+    if os.path.splitext(file_path)[1].lower() == CSV_EXTENSION:
+        write_incidence_triplets_csv(matrix, file_path)
+    else:
+        write_matrix_market(matrix, file_path)
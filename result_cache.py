@@ -0,0 +1,156 @@
+"""Caché de resultados direccionada por contenido.
+
+La clave de cada resultado es un hash canónico de la red (IDs de nodo,
+arcos en orden, capacidades, fuente y sumidero) más el nombre del
+algoritmo o backend. Las etiquetas y posiciones no cuentan: mover o
+renombrar nodos no cambia el resultado. Cualquier otro cambio en la red
+produce otra clave, así que una entrada vieja nunca se devuelve para una
+red modificada.
+
+``ResultCache`` guarda en memoria las últimas entradas (LRU) y,
+opcionalmente, las persiste en un JSON junto al proyecto para que al
+reabrirlo los resultados estén disponibles sin recalcular.
+"""
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict
+
+from flow_engine import MinCut
+
+CACHE_ENTRIES = 16           # entradas que se conservan en memoria
+CACHE_SUFFIX = ".cache.json"  # archivo de caché junto al proyecto
+
+
+def packed(values):
+    """Bytes de una secuencia numérica: enteros de 64 bits o, si hay decimales, dobles"""
+    try:
+        return array('q', values).tobytes()
+    except TypeError:
+        return b'd' + array('d', values).tobytes()
+
+
+def network_fingerprint(network):
+    """Hash SHA-256 (hex) del contenido que determina el flujo máximo.
+
+    Las capacidades de nodo entran solo si la red las tiene, así que las
+    claves de las redes sin ellas no cambian.
+    """
+    digest = hashlib.sha256()
+    node_ids = network.node_ids
+    digest.update(repr((network.num_nodes, network.num_arcs, network.source, network.sink)).encode())
+    digest.update(packed(node_ids) if all(isinstance(i, int) for i in node_ids)
+                  else repr(node_ids).encode())
+    digest.update(packed(network.tails))
+    digest.update(packed(network.heads))
+    digest.update(packed(network.capacities))
+    limited = network.limited_nodes()
+    if limited:
+        digest.update(b'nodes' + packed(limited) + packed([network.node_capacities[i] for i in limited]))
+    return digest.hexdigest()
+
+
+def cache_key(network, solver):
+    return f"{solver}:{network_fingerprint(network)}"
+
+
+def cache_path_for(project_path):
+    """Archivo de caché de un proyecto: ``red.json`` → ``red.cache.json``"""
+    return os.path.splitext(project_path)[0] + CACHE_SUFFIX
+
+
+def cut_entry(cut):
+    """Representación serializable de un ``MinCut`` (por índices de nodo y arco)"""
+    return {'source_side': [i for i, side in enumerate(cut.source_side) if side],
+            'cut_arcs': list(cut.cut_arcs), 'cut_nodes': list(cut.cut_nodes), 'capacity': cut.capacity}
+
+
+def cut_from_entry(network, data):
+    source_side = bytearray(network.num_nodes)
+    for i in data['source_side']:
+        source_side[i] = 1
+    return MinCut(network, source_side, array('l', data['cut_arcs']), data['capacity'],
+                  array('l', data.get('cut_nodes', ())))
+
+
+class ResultCache:
+    """LRU en memoria con almacenamiento opcional en disco.
+
+    Las entradas son diccionarios serializables en JSON (flujo por arco,
+    rutas, corte, líneas del registro...). ``bind_file`` asocia un archivo
+    de proyecto: sus entradas se leen al buscarlas y cada ``put`` lo
+    reescribe.
+    """
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.file_path = None
+        self.stored = None  # entradas del archivo asociado (se leen al primer uso)
+
+    def bind_file(self, file_path, network=None):
+        """Asocia el archivo de caché de un proyecto.
+
+        Con ``network`` se copian al archivo las entradas en memoria de esa
+        red (por ejemplo, al guardar un proyecto ya resuelto).
+        """
+        self.file_path = file_path
+        self.stored = None
+        if network is not None:
+            fingerprint = network_fingerprint(network)
+            for key, entry in list(self.entries.items()):
+                if key.endswith(":" + fingerprint):
+                    self.put(key, entry)
+
+    def unbind_file(self):
+        self.file_path = None
+        self.stored = None
+
+    def load_stored(self):
+        if self.stored is None:
+            self.stored = {}
+            if self.file_path and os.path.exists(self.file_path):
+                try:
+                    with open(self.file_path, 'r', encoding='utf-8') as f:
+                        self.stored = json.load(f)
+                except (OSError, ValueError):
+                    # Una caché ilegible equivale a una vacía: se reescribe en el próximo put
+                    self.stored = {}
+        return self.stored
+
+    def get(self, key):
+        """Entrada para ``key`` (la marca como usada) o None"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+        if self.file_path:
+            entry = self.load_stored().get(key)
+            if entry is not None:
+                self.remember(key, entry)
+        return entry
+
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def put(self, key, entry):
+        """Guarda la entrada en memoria y, si hay archivo asociado, en disco.
+
+        El archivo también conserva solo las ``max_entries`` más recientes.
+        """
+        self.remember(key, entry)
+        if self.file_path:
+            stored = self.load_stored()
+            stored.pop(key, None)
+            stored[key] = entry
+            while len(stored) > self.max_entries:
+                del stored[next(iter(stored))]
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                json.dump(stored, f)
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,101 @@
+"""Registro de resultados con buffer y escritura de texto por bloques.
+
+``ResultLog`` separa producir mensajes de mostrarlos: cada línea va a un
+archivo opcional (con buffer) y a una cola acotada con las últimas líneas;
+la interfaz toma las pendientes de a lotes y solo conserva esa cola, de
+modo que ejecuciones con decenas de miles de pasos no hacen crecer el
+widget ni lo actualizan línea por línea.
+"""
+from collections import deque
+
+WRITE_CHUNK = 4096   # líneas acumuladas antes de cada escritura
+TAIL_LINES = 2000    # líneas que conserva la vista de resultados
+FILE_BUFFER = 1 << 16
+
+
+def write_chunked(out, pieces, chunk_size=WRITE_CHUNK):
+    """Escribe las piezas de texto en bloques de ``chunk_size`` líneas"""
+    buffer = []
+    for piece in pieces:
+        buffer.append(piece)
+        if len(buffer) >= chunk_size:
+            out.write("".join(buffer))
+            buffer.clear()
+    if buffer:
+        out.write("".join(buffer))
+
+
+class ResultLog:
+    """Registro de líneas con archivo opcional y cola de las últimas ``tail_lines``"""
+
+    def __init__(self, tail_lines=TAIL_LINES, file_path=None):
+        self.tail = deque(maxlen=tail_lines)
+        self.pending = deque(maxlen=tail_lines)
+        self.dropped = 0  # líneas pendientes que ya no caben en la cola
+        self.total_lines = 0
+        self.file = None
+        self.file_path = None
+        self.capture = None  # líneas de la ejecución en curso (ver start_capture)
+        if file_path:
+            self.open_file(file_path)
+
+    @property
+    def tail_lines(self):
+        return self.tail.maxlen
+
+    def write(self, message):
+        """Registra un mensaje (puede tener varias líneas)"""
+        for line in str(message).split("\n"):
+            if len(self.pending) == self.pending.maxlen:
+                self.dropped += 1
+            self.tail.append(line)
+            self.pending.append(line)
+            self.total_lines += 1
+            if self.capture is not None:
+                self.capture.append(line)
+            if self.file is not None:
+                self.file.write(line + "\n")
+
+    def take_pending(self):
+        """Devuelve ``(líneas, reiniciar)`` con lo registrado desde la última llamada.
+
+        ``reiniciar`` es True si se descartaron líneas intermedias: la vista
+        debe reemplazar su contenido por ``líneas`` en vez de agregarlas.
+        """
+        lines = list(self.pending)
+        reset = self.dropped > 0
+        self.pending.clear()
+        self.dropped = 0
+        return lines, reset
+
+    def start_capture(self):
+        """Empieza a juntar todas las líneas (sin límite) hasta ``stop_capture``"""
+        self.capture = []
+
+    def stop_capture(self):
+        lines, self.capture = self.capture, None
+        return lines
+
+    def open_file(self, file_path, include_tail=True):
+        """Empieza a volcar el registro a un archivo (con las líneas en memoria)"""
+        self.close_file()
+        self.file = open(file_path, 'w', encoding='utf-8', buffering=FILE_BUFFER)
+        self.file_path = file_path
+        if include_tail:
+            write_chunked(self.file, (line + "\n" for line in self.tail))
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    def close_file(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.file_path = None
+
+    def clear(self):
+        """Vacía la cola en memoria (el archivo, si hay, sigue abierto)"""
+        self.tail.clear()
+        self.pending.clear()
+        self.dropped = 0
@@ -0,0 +1,140 @@
+"""Instrumentación del motor de flujo: contadores, tiempos, hooks y perfilado.
+
+Un ``SolverStats`` se pasa al ``ResidualGraph`` (``ResidualGraph(red,
+stats=...)``) y el motor lo va llenando: búsquedas, nodos visitados, arcos
+examinados, aumentos, actualizaciones del residual y tiempo por fase. Los
+hooks permiten observar cada evento sin modificar los algoritmos.
+
+``Profiler`` activa opcionalmente cProfile y tracemalloc; se puede pausar y
+reanudar, de modo que en el editor solo mide los pasos del algoritmo y no
+la espera entre animaciones. Ambos se importan recién al crear un
+``Profiler`` (pstats solo es costoso de importar).
+"""
+import time
+from collections import defaultdict
+
+
+class SolverStats:
+    """Contadores y cronómetros de una ejecución"""
+
+    COUNTERS = ('searches', 'node_visits', 'arc_scans', 'augmentations', 'residual_updates')
+
+    def __init__(self):
+        self.counters = dict.fromkeys(self.COUNTERS, 0)
+        self.phase_seconds = defaultdict(float)
+        self.hooks = defaultdict(list)
+
+    def add_hook(self, event, callback):
+        """Registra ``callback(**datos)`` para 'search', 'augment' o 'phase'"""
+        self.hooks[event].append(callback)
+
+    def emit(self, event, **data):
+        for callback in self.hooks.get(event, ()):
+            callback(**data)
+
+    def record_search(self, visits, scans, found):
+        self.counters['searches'] += 1
+        self.counters['node_visits'] += visits
+        self.counters['arc_scans'] += scans
+        if self.hooks:
+            self.emit('search', visits=visits, scans=scans, found=found)
+
+    def record_augment(self, arcs, amount):
+        self.counters['augmentations'] += 1
+        self.counters['residual_updates'] += 2 * len(arcs)
+        if self.hooks:
+            self.emit('augment', arcs=arcs, amount=amount)
+
+    def add_time(self, phase, seconds):
+        self.phase_seconds[phase] += seconds
+        if self.hooks:
+            self.emit('phase', phase=phase, seconds=seconds)
+
+    def timer(self, phase):
+        """Contexto que suma el tiempo transcurrido a ``phase``"""
+        return PhaseTimer(self, phase)
+
+    def as_dict(self):
+        return {**self.counters, 'phase_seconds': {k: round(v, 6) for k, v in self.phase_seconds.items()}}
+
+    def format_lines(self):
+        """Líneas de resumen para el log del editor o la consola"""
+        c = self.counters
+        lines = [f"Búsquedas: {c['searches']} | Aumentos: {c['augmentations']}",
+                 f"Nodos visitados: {c['node_visits']} | Arcos examinados: {c['arc_scans']}",
+                 f"Actualizaciones del residual: {c['residual_updates']}"]
+        if self.phase_seconds:
+            lines.append("Tiempo por fase: " + ", ".join(
+                f"{phase} {seconds * 1000:.1f} ms" for phase, seconds in self.phase_seconds.items()))
+        return lines
+
+
+class PhaseTimer:
+    def __init__(self, stats, phase):
+        self.stats = stats
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add_time(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """cProfile y/o tracemalloc con pausa y reanudación"""
+
+    def __init__(self, cpu=True, memory=True):
+        import cProfile
+        self.cpu = cProfile.Profile() if cpu else None
+        self.memory = memory
+        self.peak_kb = None
+        self.started_tracemalloc = False
+
+    def start(self):
+        import tracemalloc
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.resume()
+        return self
+
+    def resume(self):
+        if self.cpu is not None:
+            self.cpu.enable()
+
+    def pause(self):
+        if self.cpu is not None:
+            self.cpu.disable()
+
+    def stop(self):
+        import tracemalloc
+        self.pause()
+        if self.memory and tracemalloc.is_tracing():
+            self.peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+                self.started_tracemalloc = False
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def format_lines(self, limit=10):
+        """Pico de memoria y las funciones con más tiempo acumulado"""
+        import io
+        import pstats
+        lines = []
+        if self.peak_kb is not None:
+            lines.append(f"Pico de memoria: {self.peak_kb:.1f} KiB")
+        if self.cpu is not None:
+            out = io.StringIO()
+            pstats.Stats(self.cpu, stream=out).sort_stats('cumulative').print_stats(limit)
+            lines.extend(line for line in out.getvalue().splitlines() if line.strip())
+        return lines
@@ -0,0 +1,47 @@
+"""Configuración común de las pruebas.
+
+Los módulos del proyecto viven en la raíz del repositorio (no es un
+paquete instalable): se agrega al ``sys.path`` para poder importarlos.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flow_engine import FlowNetwork  # noqa: E402
+
+
+def random_network(rng, max_nodes=10, max_arcs=25, max_capacity=10, node_capacities=False):
+    """Red chica al azar con fuente 1 y sumidero n (puede tener lazos y arcos paralelos)"""
+    n = rng.randint(2, max_nodes)
+    m = rng.randint(1, max_arcs)
+    tails = [rng.randrange(n) for _ in range(m)]
+    heads = [rng.randrange(n) for _ in range(m)]
+    capacities = [rng.randint(0, max_capacity) for _ in range(m)]
+    caps = None
+    if node_capacities:
+        caps = [rng.choice([None, None, rng.randint(0, max_capacity)]) for _ in range(n)]
+    return FlowNetwork(range(1, n + 1), tails, heads, capacities, source=1, sink=n, node_capacities=caps)
+
+
+def seeded_networks(count, seed=0, **options):
+    rng = random.Random(seed)
+    return [random_network(rng, **options) for _ in range(count)]
+
+
+def assert_feasible(network, arc_flows):
+    """Cotas de capacidad, conservación y capacidades de nodo; devuelve el valor del flujo"""
+    n = network.num_nodes
+    out, into = [0] * n, [0] * n
+    for a, flow in enumerate(arc_flows):
+        assert 0 <= flow <= network.capacities[a]
+        out[network.tails[a]] += flow
+        into[network.heads[a]] += flow
+    s, t = network.source_index, network.sink_index
+    for v in range(n):
+        if v not in (s, t):
+            assert out[v] == into[v]
+    for v in network.limited_nodes():
+        assert (into[v] if v == t else out[v]) <= network.node_capacities[v]
+    return out[s] - into[s]
@@ -0,0 +1,23 @@
+"""Backends LP en proceso comparados con el motor propio"""
+import pytest
+
+from conftest import seeded_networks
+from flow_engine import FlowNetwork, max_flow
+from lp_backends import get_lp_backend
+
+
+@pytest.fixture
+def highs():
+    pytest.importorskip("scipy")
+    return get_lp_backend("highs")
+
+
+def test_highs_matches_the_engine(highs):
+    for network in seeded_networks(30, seed=13, node_capacities=True):
+        expected = max_flow(network, "DINIC")['max_flow']
+        assert highs.solve(network)['max_flow'] == pytest.approx(expected, abs=1e-6)
+
+
+def test_highs_solves_a_network_without_arcs(highs):
+    network = FlowNetwork([1, 2], [], [], [], source=1, sink=2)
+    assert highs.solve(network)['max_flow'] == 0
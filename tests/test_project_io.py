@@ -0,0 +1,116 @@
+"""Ida y vuelta por los formatos de proyecto, con capacidades de nodo"""
+import pytest
+
+from conftest import seeded_networks
+from flow_cli import expand_project_paths
+from flow_engine import FlowNetwork, max_flow
+from network_generators import GENERATORS
+from project_io import load_project_network, read_dimacs, save_project
+from result_cache import CACHE_SUFFIX
+
+FORMATS = [".json", ".rdfb", ".max", ".csv"]
+
+
+def capped_network():
+    # 1 → {2, 3} → 4 con el nodo 2 limitado a 3 y el sumidero a 6
+    return FlowNetwork([1, 2, 3, 4], [0, 0, 1, 2], [1, 2, 3, 3], [5, 4, 5, 2], source=1, sink=4,
+                       node_capacities=[None, 3, None, 6])
+
+
+def node_capacity_map(network):
+    return {network.node_ids[v]: network.node_capacities[v] for v in network.limited_nodes()}
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_round_trip_keeps_node_capacities(tmp_path, extension):
+    network = capped_network()
+    path = str(tmp_path / f"red{extension}")
+    save_project(network, path)
+    loaded = load_project_network(path)
+    assert node_capacity_map(loaded) == {2: 3, 4: 6}
+    assert (loaded.source, loaded.sink) == (1, 4)
+    assert max_flow(loaded)['max_flow'] == max_flow(network)['max_flow'] == 5
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_round_trip_preserves_arcs_and_max_flow(tmp_path, extension):
+    for i, network in enumerate(seeded_networks(25, seed=9, node_capacities=True)):
+        path = str(tmp_path / f"red{i}{extension}")
+        save_project(network, path)
+        loaded = load_project_network(path)
+        assert max_flow(loaded)['max_flow'] == max_flow(network)['max_flow']
+        if extension != ".csv":  # la lista de arcos no conserva los nodos aislados
+            assert list(loaded.node_ids) == list(network.node_ids)
+            assert list(loaded.tails) == list(network.tails)
+            assert list(loaded.heads) == list(network.heads)
+            assert list(loaded.capacities) == list(network.capacities)
+            assert node_capacity_map(loaded) == node_capacity_map(network)
+
+
+def test_overwriting_a_mapped_binary_keeps_the_loaded_network(tmp_path):
+    network = GENERATORS["random_sparse"](2000, 1)
+    path = str(tmp_path / "red.rdfb")
+    save_project(network, path)
+    loaded = load_project_network(path)
+    expected = max_flow(loaded)['max_flow']
+    # Guardar sobre el archivo que respalda el mmap (y después una red más chica)
+    save_project(loaded, path)
+    save_project(capped_network(), path)
+    assert list(loaded.capacities) == list(network.capacities)
+    assert max_flow(loaded)['max_flow'] == expected
+    assert max_flow(load_project_network(path))['max_flow'] == 5
+    assert [p.name for p in tmp_path.iterdir()] == ["red.rdfb"]
+
+
+def test_csv_with_named_nodes(tmp_path):
+    path = tmp_path / "nombres.csv"
+    path.write_text("# source=a\n# sink=c\n# node_capacity=b:2\nu,v,capacity\na,b,5\nb,c,5\na,c,1\n")
+    network = load_project_network(str(path))
+    assert [network.get_label(nid) for nid in network.node_ids] == ["a", "b", "c"]
+    assert max_flow(network)['max_flow'] == 3
+
+
+def test_csv_numbers_that_collide_become_labels(tmp_path):
+    path = tmp_path / "ceros.csv"
+    path.write_text("# source=01\n# sink=2\n01,1,4\n1,2,3\n01,2,1\n")
+    network = load_project_network(str(path))
+    assert list(network.node_ids) == [1, 2, 3]
+    assert [network.get_label(nid) for nid in network.node_ids] == ["01", "1", "2"]
+    assert (network.get_label(network.source), network.get_label(network.sink)) == ("01", "2")
+    assert max_flow(network)['max_flow'] == 4
+
+
+def test_csv_unique_numbers_keep_their_ids(tmp_path):
+    path = tmp_path / "numeros.csv"
+    path.write_text("# source=10\n# sink=30\n10,20,4\n20,30,3\n")
+    network = load_project_network(str(path))
+    assert list(network.node_ids) == [10, 20, 30]
+    assert max_flow(network)['max_flow'] == 3
+
+
+@pytest.mark.parametrize("text, message", [
+    ("p max 3 2\nn 7 t\n", "Línea 2: nodo fuera de rango"),
+    ("n 1 s\np max 3 2\n", "Línea 1: nodo fuera de rango"),
+    ("p max 3 2\nn 1 x\n", "Línea 2: se esperaba 's' o 't'"),
+    ("p max 3 2\nn uno s\n", "Línea 2: nodo inválido"),
+    ("p max 3 1\na 1 4 2\n", "Línea 2: nodo fuera de rango"),
+    ("p max 3 1\nc nodecap 0 2\n", "Línea 2: nodo fuera de rango"),
+    ("c solo comentarios\n", "Falta la línea 'p max'"),
+])
+def test_dimacs_errors_name_the_line(tmp_path, text, message):
+    path = tmp_path / "mala.max"
+    path.write_text(text)
+    with pytest.raises(ValueError, match=message):
+        read_dimacs(str(path))
+
+
+def test_folders_expand_to_every_loadable_format(tmp_path):
+    network = capped_network()
+    for name in ("a.json", "b.rdfb", "c.max", "d.dimacs", "e.csv"):
+        save_project(network, str(tmp_path / name))
+    (tmp_path / f"a{CACHE_SUFFIX}").write_text("{}")
+    (tmp_path / "notas.txt").write_text("")
+    paths = expand_project_paths([str(tmp_path)])
+    assert [p.rsplit("/", 1)[-1].rsplit("\\", 1)[-1] for p in paths] == \
+        ["a.json", "b.rdfb", "c.max", "d.dimacs", "e.csv"]
+    assert all(max_flow(load_project_network(p))['max_flow'] == 5 for p in paths)
@@ -0,0 +1,89 @@
+"""La red reducida conserva el flujo máximo y sus flujos se expanden bien"""
+import random
+
+import pytest
+
+from conftest import assert_feasible, seeded_networks
+from flow_engine import FlowNetwork, ResidualGraph, max_flow, solve_steps
+from flow_reduction import max_flow_reduced, reduce_network
+
+
+@pytest.mark.parametrize("algorithm", ["EDMONDS_KARP_BFS", "DINIC", "BOYKOV_KOLMOGOROV"])
+def test_reduced_solve_matches_full_solve(algorithm):
+    for network in seeded_networks(150, seed=3, max_nodes=12, max_arcs=30, node_capacities=True):
+        reference = max_flow(network, "DINIC")['max_flow']
+        result = max_flow_reduced(network, algorithm)
+        assert result['max_flow'] == reference
+        # Flujo y corte se refieren a la red original
+        assert assert_feasible(network, result['arc_flows']) == reference
+        assert result['min_cut'].verify(reference)
+
+
+def test_reduced_arcs_partition_the_kept_original_arcs():
+    for network in seeded_networks(100, seed=4, max_nodes=12, max_arcs=30):
+        reduction = reduce_network(network)
+        seen = []
+        for a in range(reduction.network.num_arcs):
+            seen.extend(reduction.original_arcs(a))
+        assert len(seen) == len(set(seen))
+        assert all(0 <= a < network.num_arcs for a in seen)
+
+
+def test_expanded_steps_add_up_to_expanded_flows():
+    for network in seeded_networks(100, seed=5, max_nodes=12, max_arcs=30, node_capacities=True):
+        reduction = reduce_network(network)
+        res = ResidualGraph(reduction.network)
+        flows = [0] * network.num_arcs
+        for arcs, amount in solve_steps(res, "EDMONDS_KARP_BFS"):
+            for a, change in reduction.expand_step(arcs, amount, flows.__getitem__).items():
+                flows[a] += change
+        value = assert_feasible(network, flows)
+        assert value == assert_feasible(network, reduction.expand_flows(res.arc_flows()))
+        assert value == max_flow(network, "DINIC")['max_flow']
+
+
+def test_series_chain_and_parallel_arcs_collapse():
+    # 1 → 2 → 3 en serie y dos arcos paralelos 3 → 4
+    network = FlowNetwork([1, 2, 3, 4], [0, 1, 2, 2], [1, 2, 3, 3], [5, 3, 2, 4], source=1, sink=4)
+    reduction = reduce_network(network)
+    assert reduction.network.num_arcs == 1
+    assert sorted(reduction.original_arcs(0)) == [0, 1, 2, 3]
+    assert reduction.network.capacities[0] == 3
+    flows = reduction.expand_flows([3])
+    assert flows[:2] == [3, 3] and sum(flows[2:]) == 3
+    assert assert_feasible(network, flows) == 3
+    assert max_flow_reduced(network)['max_flow'] == 3
+
+
+def test_unreachable_parts_are_pruned():
+    # El nodo 3 no llega al sumidero y el arco 4 → 1 entra a la fuente
+    network = FlowNetwork([1, 2, 3, 4], [0, 0, 1, 3], [1, 2, 3, 0], [4, 7, 6, 9], source=1, sink=4)
+    reduction = reduce_network(network)
+    assert reduction.pruned_nodes == 1
+    assert max_flow_reduced(network)['arc_flows'] == [4, 0, 4, 0]
+
+
+def test_float_parallel_split_certifies_the_cut():
+    network = FlowNetwork([1, 2], [0, 0], [1, 1], [3, 1.2061867318653925], source=1, sink=2)
+    result = max_flow_reduced(network)
+    assert result['arc_flows'] == [3, 1.2061867318653925]
+    assert result['min_cut'].verify(result['max_flow'])
+
+
+def test_float_capacities_keep_the_cut_certified():
+    rng = random.Random(2)
+    for _ in range(300):
+        network = random_float_network(rng)
+        result = max_flow_reduced(network, "DINIC")
+        assert result['max_flow'] == pytest.approx(max_flow(network, "DINIC")['max_flow'])
+        assert result['min_cut'].verify(result['max_flow'])
+
+
+def random_float_network(rng):
+    n, m = rng.randint(2, 10), rng.randint(1, 25)
+    capacities = [rng.choice([rng.randint(0, 5), rng.uniform(0, 5)]) for _ in range(m)]
+    node_capacities = None
+    if rng.random() < 0.3:
+        node_capacities = [rng.choice([None, None, rng.uniform(0, 6)]) for _ in range(n)]
+    return FlowNetwork(range(1, n + 1), [rng.randrange(n) for _ in range(m)], [rng.randrange(n) for _ in range(m)],
+                       capacities, source=1, sink=n, node_capacities=node_capacities)
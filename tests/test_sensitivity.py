@@ -0,0 +1,84 @@
+"""Sensibilidad por arco comparada con volver a resolver la red modificada"""
+import random
+
+import pytest
+
+from conftest import random_network
+from flow_engine import FlowNetwork, max_flow
+from flow_sensitivity import ALL_CUTS, SOME_CUTS, arc_sensitivity
+
+BIG = 10 ** 6
+
+
+def with_capacity(network, x, capacity):
+    """Copia de la red con el elemento ``x`` (arco o nodo limitado) en ``capacity``"""
+    capacities = list(network.capacities)
+    node_capacities = list(network.node_capacities) if network.node_capacities else None
+    if x < network.num_arcs:
+        capacities[x] = capacity
+    else:
+        node_capacities[network.limited_nodes()[x - network.num_arcs]] = capacity
+    return FlowNetwork(network.node_ids, network.tails, network.heads, capacities,
+                       source=network.source, sink=network.sink, node_capacities=node_capacities)
+
+
+def solve(network):
+    return max_flow(network, "DINIC")['max_flow']
+
+
+def in_some_min_cut(network, a, flow_value):
+    """Fuerza bruta: ¿algún corte S/T de capacidad mínima contiene al arco ``a``?"""
+    n, s, t = network.num_nodes, network.source_index, network.sink_index
+    for bits in range(1 << n):
+        if not (bits >> s) & 1 or (bits >> t) & 1:
+            continue
+        crossing = [b for b in range(network.num_arcs)
+                    if (bits >> network.tails[b]) & 1 and not (bits >> network.heads[b]) & 1]
+        if a in crossing and sum(network.capacities[b] for b in crossing) == flow_value:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_report_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        network = random_network(rng, max_nodes=7, max_arcs=14, max_capacity=6,
+                                 node_capacities=rng.random() < 0.4)
+        result = max_flow(network, rng.choice(["DINIC", "EDMONDS_KARP_BFS", "BOYKOV_KOLMOGOROV"]))
+        report = arc_sensitivity(network, result['arc_flows'])
+        flow_value = result['max_flow']
+        assert report.flow_value == flow_value
+        for x, capacity in enumerate(report.capacities):
+            # Pérdida si el elemento falla
+            assert solve(with_capacity(network, x, 0)) == flow_value - report.loss[x]
+            # Hasta dónde se puede bajar la capacidad sin perder flujo
+            low = capacity - report.lower_slack(x)
+            assert solve(with_capacity(network, x, low)) == flow_value
+            if low > 0:
+                assert solve(with_capacity(network, x, low - 1)) < flow_value
+            # Subirla aumenta el flujo solo si el elemento está en todos los cortes mínimos
+            raised = solve(with_capacity(network, x, capacity + 1))
+            assert (raised > flow_value) == (report.cut_class[x] == ALL_CUTS)
+            if report.cut_class[x] == ALL_CUTS:
+                gain = solve(with_capacity(network, x, BIG)) - flow_value
+                assert report.gain[x] == (None if gain >= BIG // 10 else gain)
+            if network.node_capacities is None and network.capacities[x] > 0:
+                assert in_some_min_cut(network, x, flow_value) == (report.cut_class[x] >= SOME_CUTS)
+
+
+def test_most_vital_arc():
+    # Dos caminos 1 → 2 → 4 (cap 5) y 1 → 3 → 4 (cap 2)
+    network = FlowNetwork([1, 2, 3, 4], [0, 1, 0, 2], [1, 3, 2, 3], [5, 8, 2, 2], source=1, sink=4)
+    report = arc_sensitivity(network, max_flow(network)['arc_flows'])
+    assert report.most_vital() == 0
+    assert report.loss == [5, 5, 2, 2]
+    # 1 → 3 → 4 tiene dos arcos de capacidad 2: cada uno está en algún corte mínimo, no en todos
+    assert report.in_cuts(ALL_CUTS) == [0]
+    assert report.in_cuts(SOME_CUTS) == [0, 2, 3]
+
+
+def test_rejects_a_flow_that_is_not_maximum():
+    network = FlowNetwork([1, 2], [0], [1], [3], source=1, sink=2)
+    with pytest.raises(ValueError):
+        arc_sensitivity(network, [1])
@@ -0,0 +1,94 @@
+"""Deltas del servicio: la red resultante es la del proyecto equivalente"""
+import pytest
+
+from flow_engine import max_flow
+from flow_service import RequestError, apply_delta
+from project_io import network_from_project
+from result_cache import network_fingerprint
+
+
+def project():
+    return {
+        "source_id": 1, "sink_id": 4,
+        "nodes": [{"id": 1, "label": "S", "x": 0, "y": 0, "type": "source"},
+                  {"id": 2, "label": "A", "x": 1, "y": 0},
+                  {"id": 3, "label": "B", "x": 1, "y": 1},
+                  {"id": 4, "label": "T", "x": 2, "y": 0, "type": "sink"}],
+        "edges": [{"u": 1, "v": 2, "capacity": 4},
+                  {"u": 1, "v": 3, "capacity": 2},
+                  {"u": 2, "v": 4, "capacity": 3},
+                  {"u": 3, "v": 4, "capacity": 5}],
+    }
+
+
+def same_network(first, second):
+    return network_fingerprint(first) == network_fingerprint(second)
+
+
+def test_empty_delta_keeps_the_network():
+    network = network_from_project(project())
+    assert same_network(apply_delta(network, {}), network)
+
+
+def test_capacity_change_by_index_and_by_endpoints():
+    network = network_from_project(project())
+    changed = apply_delta(network, {"capacities": [{"edge": 0, "capacity": 9},
+                                                   {"u": 3, "v": 4, "capacity": 1}]})
+    expected = project()
+    expected["edges"][0]["capacity"] = 9
+    expected["edges"][3]["capacity"] = 1
+    assert same_network(changed, network_from_project(expected))
+    assert max_flow(changed)['max_flow'] == 4
+    # La red de partida no cambia
+    assert list(network.capacities) == [4, 2, 3, 5]
+
+
+def test_added_nodes_are_sorted_and_edges_go_last():
+    network = network_from_project(project())
+    delta = {"add_nodes": [{"id": 0, "label": "Z"}],
+             "add_edges": [{"u": 0, "v": 4, "capacity": 7}],
+             "remove_edges": [{"edge": 1}],
+             "source_id": 0}
+    changed = apply_delta(network, delta)
+    expected = project()
+    expected["nodes"].append({"id": 0, "label": "Z"})
+    del expected["edges"][1]
+    expected["edges"].append({"u": 0, "v": 4, "capacity": 7})
+    expected["source_id"] = 0
+    assert list(changed.node_ids) == [0, 1, 2, 3, 4]
+    assert same_network(changed, network_from_project(expected))
+    assert changed.get_label(0) == "Z"
+    assert max_flow(changed)['max_flow'] == 7
+
+
+def test_node_capacities_can_be_set_and_cleared():
+    network = network_from_project(project())
+    limited = apply_delta(network, {"node_capacities": [{"id": 2, "capacity": 1}]})
+    assert max_flow(limited)['max_flow'] == 3
+    expected = project()
+    expected["nodes"][1]["capacity"] = 1
+    assert same_network(limited, network_from_project(expected))
+    cleared = apply_delta(limited, {"node_capacities": [{"id": 2, "capacity": None}]})
+    assert same_network(cleared, network)
+
+
+def test_deltas_chain_like_a_single_delta():
+    network = network_from_project(project())
+    step = apply_delta(apply_delta(network, {"capacities": [{"edge": 2, "capacity": 1}]}),
+                       {"add_edges": [{"u": 2, "v": 3, "capacity": 2}]})
+    once = apply_delta(network, {"capacities": [{"edge": 2, "capacity": 1}],
+                                 "add_edges": [{"u": 2, "v": 3, "capacity": 2}]})
+    assert same_network(step, once)
+
+
+@pytest.mark.parametrize("delta", [
+    {"capacities": [{"edge": 9, "capacity": 1}]},
+    {"capacities": [{"edge": "0", "capacity": 1}]},
+    {"remove_edges": [{"u": 4, "v": 1}]},
+    {"node_capacities": [{"id": 8, "capacity": 1}]},
+    {"add_nodes": [{"id": 2}]},
+    {"add_edges": [{"u": 1, "v": 8, "capacity": 1}]},
+])
+def test_invalid_deltas_are_request_errors(delta):
+    with pytest.raises(RequestError):
+        apply_delta(network_from_project(project()), delta)
@@ -0,0 +1,60 @@
+"""Todos los algoritmos registrados llegan al mismo flujo máximo"""
+import pytest
+
+from conftest import assert_feasible, seeded_networks
+from flow_engine import AUTO_SOLVER, SOLVERS, ResidualGraph, find_augmenting_path_bfs, max_flow
+from network_generators import GENERATORS
+
+EXACT = [name for name, solver in SOLVERS.items() if solver['exact']]
+HEURISTIC = [name for name, solver in SOLVERS.items() if not solver['exact']]
+
+
+@pytest.mark.parametrize("node_capacities", [False, True])
+def test_exact_solvers_agree_on_random_networks(node_capacities):
+    for network in seeded_networks(150, seed=7, node_capacities=node_capacities):
+        reference = max_flow(network, "DINIC")['max_flow']
+        for name in EXACT:
+            result = max_flow(network, name)
+            assert result['max_flow'] == reference, name
+            assert assert_feasible(network, result['arc_flows']) == reference, name
+            assert result['min_cut'].verify(reference), name
+
+
+def test_heuristics_stay_feasible_and_below_the_optimum():
+    for network in seeded_networks(100, seed=11, node_capacities=True):
+        reference = max_flow(network, "DINIC")['max_flow']
+        for name in HEURISTIC:
+            result = max_flow(network, name)
+            assert assert_feasible(network, result['arc_flows']) == result['max_flow'] <= reference
+
+
+@pytest.mark.parametrize("generator", sorted(GENERATORS))
+def test_exact_solvers_agree_on_generated_networks(generator):
+    network = GENERATORS[generator](60, 3)
+    values = {name: max_flow(network, name)['max_flow'] for name in EXACT}
+    assert len(set(values.values())) == 1, values
+
+
+def test_auto_reports_the_chosen_solver():
+    network = GENERATORS["bipartite"](60, 1)
+    result = max_flow(network, AUTO_SOLVER)
+    assert result['algorithm'] == "HOPCROFT_KARP"
+    assert result['reason']
+    assert result['max_flow'] == max_flow(network, "DINIC")['max_flow']
+
+
+def test_vectorized_bfs_matches_python():
+    pytest.importorskip("numpy")
+    for network in seeded_networks(60, seed=5, node_capacities=True):
+        for name in ("EDMONDS_KARP_BFS", "DINIC"):
+            plain = max_flow(network, name, vectorize=False)['max_flow']
+            assert max_flow(network, name, vectorize=True)['max_flow'] == plain
+
+
+def test_numpy_copy_is_built_on_first_bfs():
+    pytest.importorskip("numpy")
+    network = GENERATORS["random_sparse"](40, 2)
+    res = ResidualGraph(network, vectorize=True)
+    assert res.vector is None
+    find_augmenting_path_bfs(res, network.source_index, network.sink_index)
+    assert res.vector is not None